@@ -0,0 +1,73 @@
+"""
+Client disconnect and compute deadline handling for batch endpoints.
+
+Batch work runs in the threadpool with a ``CancelToken`` that expires after
+``BATCH_DEADLINE_SECONDS`` (or the budget in the ``BATCH_DEADLINE_HEADER``
+request header, capped at ``BATCH_DEADLINE_MAX_SECONDS``). While it runs the
+connection is polled, and the token is cancelled as soon as the client goes
+away.
+
+Responses report whether the batch finished:
+
+- ``X-Result-Status``: ``complete`` or ``partial``
+- ``X-Result-Reason``: why a partial batch stopped (``deadline_exceeded``)
+- ``X-Items-Completed``: number of leading inputs that have results
+"""
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from backend.core.cancellation import CancelToken
+from backend.core.config import settings
+
+
+def request_timeout(request: Request) -> Optional[float]:
+    """Compute budget in seconds for a request, or None for no deadline."""
+    value = request.headers.get(settings.BATCH_DEADLINE_HEADER)
+    if value is None:
+        return settings.BATCH_DEADLINE_SECONDS or None
+    try:
+        timeout = float(value)
+    except ValueError:
+        timeout = 0.0
+    if not timeout > 0:
+        raise HTTPException(
+            status_code=400, detail=f"{settings.BATCH_DEADLINE_HEADER} must be a positive number of seconds"
+        )
+    return min(timeout, settings.BATCH_DEADLINE_MAX_SECONDS)
+
+
+async def _watch_disconnect(request: Request, cancel: CancelToken) -> None:
+    while not cancel.stopped():
+        if await request.is_disconnected():
+            cancel.cancel()
+            return
+        await asyncio.sleep(settings.DISCONNECT_POLL_SECONDS)
+
+
+async def run_cancellable(request: Request, fn: Callable, *args) -> Tuple[Any, CancelToken]:
+    """
+    Run ``fn(*args, cancel=token)`` in the threadpool, cancelling on disconnect.
+
+    Returns:
+        Tuple of (return value of ``fn``, the token)
+    """
+    cancel = CancelToken(request_timeout(request))
+    watcher = asyncio.ensure_future(_watch_disconnect(request, cancel))
+    try:
+        return await run_in_threadpool(fn, *args, cancel=cancel), cancel
+    finally:
+        watcher.cancel()
+
+
+def result_status(cancel: CancelToken, completed: int, total: int) -> Dict[str, str]:
+    """Headers describing whether a batch finished."""
+    if completed >= total:
+        return {"X-Result-Status": "complete", "X-Items-Completed": str(completed)}
+    return {
+        "X-Result-Status": "partial",
+        "X-Result-Reason": cancel.reason or "",
+        "X-Items-Completed": str(completed)
+    }
@@ -0,0 +1,122 @@
+"""
+Compact response shapes for batch endpoints.
+
+Batch endpoints accept ``?format=``:
+
+- ``full`` (default): one validated object per item, including the input
+  text and (for fake news) the nested ``details``
+- ``columnar``: one array per scalar field, ``{"count", "columns": {...}}``
+- ``ids``: one row per item holding only its id, label and score,
+  ``{"count", "fields", "rows": [[id, label, score], ...]}``
+
+Compact bodies also carry the batch metadata (e.g. ``dedup_ratio``) that full
+responses report in headers.
+
+Compact shapes skip per-item pydantic validation and are encoded with orjson
+when it is installed.
+"""
+import json
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+ResponseFormat = Literal["full", "columnar", "ids"]
+
+# Per result kind: (id field, columnar fields, ids-format fields after the id)
+COMPACT_FIELDS: Dict[str, tuple] = {
+    "sentiment": (
+        None,
+        ("sentiment", "polarity", "subjectivity", "confidence", "notes"),
+        ("sentiment", "confidence"),
+    ),
+    "fakenews": (
+        None,
+        ("source", "is_fake_news", "fake_news_probability", "credibility_score",
+         "clickbait_score", "hate_score", "warnings"),
+        ("is_fake_news", "fake_news_probability"),
+    ),
+    "resume_rank": (
+        "resume_id",
+        ("rank", "match_score", "skills_count", "experience_years", "recommendation", "notes"),
+        ("rank", "match_score"),
+    ),
+}
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON with orjson if available, else the standard library."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with ``dumps`` and no pretty-printing."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def compact_results(
+    kind: str,
+    results: List[Dict],
+    response_format: ResponseFormat,
+    ids: Optional[Sequence] = None,
+    meta: Optional[Dict] = None
+) -> Dict:
+    """
+    Reshape analyzer results into a compact format.
+
+    Args:
+        kind: Key of ``COMPACT_FIELDS``
+        results: Analyzer result dictionaries
+        response_format: ``columnar`` or ``ids``
+        ids: Item ids for kinds whose results carry none (defaults to positions)
+        meta: Extra top-level fields, e.g. dedup figures
+
+    Returns:
+        JSON-ready dictionary
+    """
+    id_field, columns, id_columns = COMPACT_FIELDS[kind]
+    if id_field is not None:
+        ids = [r[id_field] for r in results]
+    elif ids is None:
+        ids = list(range(len(results)))
+
+    meta = meta or {}
+    if response_format == "columnar":
+        return {
+            "format": "columnar",
+            "count": len(results),
+            **meta,
+            "columns": {
+                "id": list(ids),
+                **{field: [r.get(field) for r in results] for field in columns}
+            }
+        }
+    columns = [[r.get(field) for r in results] for field in id_columns]
+    return {
+        "format": "ids",
+        "count": len(results),
+        **meta,
+        "fields": ["id", *id_columns],
+        "rows": list(map(list, zip(ids, *columns)))
+    }
+
+
+def compact_response(
+    kind: str,
+    results: List[Dict],
+    response_format: ResponseFormat,
+    ids: Optional[Sequence] = None,
+    meta: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> FastJSONResponse:
+    """Build a ``FastJSONResponse`` for a compact format (see ``compact_results``)."""
+    return FastJSONResponse(compact_results(kind, results, response_format, ids, meta), headers=headers)
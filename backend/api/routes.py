@@ -1,61 +1,270 @@
 """
 FastAPI routes for NLP Business Intelligence API.
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+import glob
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
 
+from fastapi import APIRouter, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
+
+from backend.api.deadlines import request_timeout, result_status, run_cancellable
+from backend.api.responses import ResponseFormat, compact_response
+from backend.api.streaming import sse_response, stream_batch
+from backend.api.tracing import TracedRoute
+from backend.core.cache import ResultCache
+from backend.core.cancellation import CancelToken
+from backend.core.config import settings
+from backend.core.memory import memory_stage
 from backend.models.schemas import (
     SentimentRequest, SentimentBatchRequest, SentimentResponse, SentimentStatistics,
+    SentimentIngestRequest, SentimentIngestResponse, SentimentTrendResponse,
     ResumeRequest, ResumeBatchRequest, ResumeResponse, ResumeRankingResponse,
-    FakeNewsRequest, FakeNewsResponse
+    ResumeIndexRequest, ResumeIndexResponse, ResumeSearchRequest, ResumeSearchResponse,
+    FakeNewsRequest, FakeNewsBatchRequest, FakeNewsResponse,
+    FileUploadResponse, DatasetResponse, JobRequest, JobResponse, JobResultsResponse,
+    AnalyzerReport, AnalyzerRouting, AnalyzerRoutingRequest, AnalyzerPromoteRequest
 )
+from backend.services.analyzer_registry import AnalyzerRegistry, AnalyzerVersion
 from backend.services.sentiment_service import SentimentAnalyzer
 from backend.services.resume_service import ResumeScreener
+from backend.services.resume_index import ResumeIndex
 from backend.services.fake_news_service import FakeNewsDetector
+from backend.services.batch_tasks import FILE_FORMATS, iter_file_chunks
+from backend.services.dataset_service import Dataset, DatasetStore, result_key
+from backend.services.job_service import JobManager, JobStore
+from backend.services.rollup_service import RollupStore
+
+
+router = APIRouter(route_class=TracedRoute)
+
+FORMAT_QUERY = Query(
+    "full", alias="format",
+    description="Response shape: full objects, columnar arrays, or ids with label and score only"
+)
+CHUNK_SIZE_QUERY = Query(None, ge=1, le=10000, description="Items per streamed chunk (default: SSE_CHUNK_SIZE)")
+
+
+def _dedup_headers(stats: dict) -> dict:
+    """Headers reporting the share of batch items that were duplicates."""
+    return {"X-Dedup-Ratio": str(stats["dedup_ratio"])}
+
+
+def _batch_headers(stats: dict, cancel: CancelToken, completed: int) -> dict:
+    """Dedup and result status headers; the status is also added to ``stats`` for compact bodies."""
+    headers = {**_dedup_headers(stats), **result_status(cancel, completed, stats["items"])}
+    stats["status"] = headers["X-Result-Status"]
+    stats["completed"] = completed
+    return headers
+
+
+def _version_header(version: AnalyzerVersion) -> dict:
+    return {"X-Analyzer-Version": version.name}
+
+
+def _get_dataset(dataset_id: str) -> Dataset:
+    dataset = dataset_store.get(dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' not found")
+    return dataset
 
 
-router = APIRouter()
+def _batch_source(inline: Optional[list], dataset_id: Optional[str], field: str) -> Optional[Dataset]:
+    """The dataset a batch request refers to, or None for inline items."""
+    if (inline is None) == (dataset_id is None):
+        raise HTTPException(status_code=400, detail=f"Provide either {field} or a dataset_id")
+    return _get_dataset(dataset_id) if dataset_id is not None else None
+
+
+async def _run_batch(http_request: Request, dataset: Optional[Dataset], key: str, fn, items, *args):
+    """
+    Run a batch analysis with ``run_cancellable``; dataset analyses reuse stored results.
+
+    Returns:
+        Tuple of (results, dedup stats, cancel token)
+    """
+    if dataset is not None:
+        stored = await run_in_threadpool(dataset.load_results, key)
+        if stored is not None:
+            return stored["results"], stored["stats"], CancelToken()
+        # Decode the memory-mapped column in one pass
+        items = await run_in_threadpool(items.__getitem__, slice(None))
+    stats = {}
+    results, cancel = await run_cancellable(http_request, fn, items, *args, stats)
+    if dataset is not None and len(results) == len(items):
+        await run_in_threadpool(dataset.save_results, key, {"results": results, "stats": stats})
+    return results, stats, cancel
 
 # Initialize services
-sentiment_analyzer = SentimentAnalyzer()
-resume_screener = ResumeScreener()
-fake_news_detector = FakeNewsDetector()
+result_cache = ResultCache(
+    settings.RESULT_CACHE_MEMORY_ITEMS,
+    settings.RESULT_CACHE_DISK_PATH,
+    settings.RESULT_CACHE_DISK_MAX_BYTES
+)
+sentiment_analyzers = AnalyzerRegistry("sentiment", SentimentAnalyzer, cache=result_cache)
+resume_screener = ResumeScreener(cache=result_cache)
+fake_news_detectors = AnalyzerRegistry("fakenews", FakeNewsDetector, cache=result_cache)
+analyzer_registries = {"sentiment": sentiment_analyzers, "fakenews": fake_news_detectors}
+
+os.makedirs(os.path.dirname(settings.JOB_DB_PATH) or ".", exist_ok=True)
+job_manager = JobManager(
+    JobStore(settings.JOB_DB_PATH, settings.JOB_CHUNK_LEASE_SECONDS),
+    workers=settings.JOB_WORKERS,
+    chunk_size=settings.JOB_CHUNK_SIZE,
+    retention_seconds=settings.JOB_RETENTION_SECONDS
+)
+
+os.makedirs(os.path.dirname(settings.ROLLUP_DB_PATH) or ".", exist_ok=True)
+rollup_store = RollupStore(settings.ROLLUP_DB_PATH)
+
+resume_index = ResumeIndex(settings.RESUME_INDEX_DIR, screener=resume_screener)
+
+dataset_store = DatasetStore(os.path.join(settings.UPLOAD_DIR, "datasets"))
 
 
 # Sentiment Analysis Endpoints
-@router.post("/sentiment/analyze", response_model=SentimentResponse, tags=["Sentiment Analysis"])
-async def analyze_sentiment(request: SentimentRequest):
+@router.post("/sentiment/analyze", response_model=SentimentResponse, response_model_exclude_none=True,
+              tags=["Sentiment Analysis"])
+async def analyze_sentiment(request: SentimentRequest, response: Response):
     """Analyze sentiment of a single text."""
+    analyzer = sentiment_analyzers.choose()
+    response.headers.update(_version_header(analyzer))
     try:
-        result = sentiment_analyzer.analyze_text(request.text)
+        result = sentiment_analyzers.tracked(analyzer, "analyze_text", batch=False)(request.text)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/sentiment/batch", response_model=List[SentimentResponse], tags=["Sentiment Analysis"])
-async def analyze_sentiment_batch(request: SentimentBatchRequest):
-    """Analyze sentiment of multiple texts."""
+@router.post("/sentiment/batch", response_model=List[SentimentResponse], response_model_exclude_none=True,
+              tags=["Sentiment Analysis"])
+async def analyze_sentiment_batch(
+    request: SentimentBatchRequest,
+    http_request: Request,
+    response: Response,
+    response_format: ResponseFormat = FORMAT_QUERY
+):
+    """Analyze sentiment of multiple texts; stops early with partial results past the deadline."""
+    dataset = _batch_source(request.texts, request.dataset_id, "texts")
+    texts = dataset.texts() if dataset else request.texts
+    analyzer = sentiment_analyzers.choose()
     try:
-        results = sentiment_analyzer.analyze_batch(request.texts)
+        memory_stage("analyze_batch", items=len(texts))
+        results, stats, cancel = await _run_batch(
+            http_request, dataset, result_key("sentiment", analyzer.version),
+            sentiment_analyzers.tracked(analyzer, "analyze_batch"), texts
+        )
+        headers = {**_batch_headers(stats, cancel, len(results)), **_version_header(analyzer)}
+        memory_stage("response_serialization")
+        if response_format != "full":
+            return compact_response("sentiment", results, response_format, meta=stats, headers=headers)
+        response.headers.update(headers)
         return results
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/sentiment/batch/stream", tags=["Sentiment Analysis"])
+async def stream_sentiment_batch(
+    request: SentimentBatchRequest, http_request: Request, chunk_size: Optional[int] = CHUNK_SIZE_QUERY
+):
+    """Analyze sentiment of multiple texts, streaming results per chunk as Server-Sent Events."""
+    dataset = _batch_source(request.texts, request.dataset_id, "texts")
+    texts = dataset.texts() if dataset else request.texts
+    cancel = CancelToken(request_timeout(http_request))
+    score = sentiment_analyzers.tracked(sentiment_analyzers.choose(), "analyze_batch")
+    return sse_response(stream_batch(texts, score, cancel, chunk_size))
+
+
 @router.post("/sentiment/statistics", response_model=SentimentStatistics, tags=["Sentiment Analysis"])
-async def get_sentiment_statistics(request: SentimentBatchRequest):
-    """Get aggregate statistics from sentiment analysis."""
+async def get_sentiment_statistics(request: SentimentBatchRequest, http_request: Request, response: Response):
+    """Get aggregate statistics from sentiment analysis; past the deadline, of the texts scored so far."""
+    dataset = _batch_source(request.texts, request.dataset_id, "texts")
+    texts = dataset.texts() if dataset else request.texts
+    analyzer = sentiment_analyzers.choose()
     try:
-        results = sentiment_analyzer.analyze_batch(request.texts)
-        stats = sentiment_analyzer.get_statistics(results)
+        memory_stage("analyze_batch", items=len(texts))
+        results, stats, cancel = await _run_batch(
+            http_request, dataset, result_key("sentiment", analyzer.version),
+            sentiment_analyzers.tracked(analyzer, "analyze_batch"), texts
+        )
+        response.headers.update({**_batch_headers(stats, cancel, len(results)), **_version_header(analyzer)})
+        memory_stage("get_statistics")
+        stats = analyzer.analyzer.get_statistics(results)
+        memory_stage("response_serialization")
         return stats
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _epoch(value: datetime) -> float:
+    """Epoch seconds of a datetime, treating naive values as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@router.post("/sentiment/ingest", response_model=SentimentIngestResponse, tags=["Sentiment Analysis"])
+async def ingest_sentiment(request: SentimentIngestRequest, http_request: Request, response: Response):
+    """
+    Score timestamped reviews and add them to the time-bucketed rollups.
+
+    Reviews are scored by the stable version, never by a candidate on a
+    traffic split. Past the deadline only the reviews scored so far are stored.
+    """
+    analyzer = sentiment_analyzers.stable()
+    try:
+        results, cancel = await run_cancellable(
+            http_request, sentiment_analyzers.tracked(analyzer, "analyze_batch"),
+            [item.text for item in request.items], {}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    response.headers.update({**result_status(cancel, len(results), len(request.items)), **_version_header(analyzer)})
+
+    records = [
+        {
+            "item_id": item.id or uuid.uuid4().hex,
+            "ts": _epoch(item.timestamp),
+            "product": item.product,
+            "channel": item.channel,
+            **result
+        }
+        for item, result in zip(request.items, results)
+    ]
+    ingested = await run_in_threadpool(rollup_store.add, records)
+    return {"received": len(request.items), "ingested": ingested, "duplicates": len(records) - ingested}
+
+
+@router.get("/sentiment/trends", response_model=SentimentTrendResponse, tags=["Sentiment Analysis"])
+async def get_sentiment_trends(
+    start: Optional[datetime] = Query(None, description="Range start (default: 7 days before end)"),
+    end: Optional[datetime] = Query(None, description="Range end (default: now)"),
+    granularity: Optional[Literal["minute", "hour", "day"]] = Query(
+        None, description="Bucket size (default: picked from the range)"
+    ),
+    product: Optional[str] = Query(None, description="Product key (default: all products)"),
+    channel: Optional[str] = Query(None, description="Channel key (default: all channels)")
+):
+    """Sentiment statistics per time bucket, answered from pre-aggregated rollups."""
+    end_ts = _epoch(end) if end else datetime.now(timezone.utc).timestamp()
+    start_ts = _epoch(start) if start else end_ts - timedelta(days=7).total_seconds()
+    if start_ts >= end_ts:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    trends = await run_in_threadpool(rollup_store.query, start_ts, end_ts, granularity, product, channel)
+    return {"start": start_ts, "end": end_ts, "product": product, "channel": channel, **trends}
 
 
 # Resume Screening Endpoints
-@router.post("/resume/screen", response_model=ResumeResponse, tags=["Resume Screening"])
+@router.post("/resume/screen", response_model=ResumeResponse, response_model_exclude_none=True,
+              tags=["Resume Screening"])
 async def screen_resume(request: ResumeRequest):
     """Screen a single resume against a job description."""
     try:
@@ -65,23 +274,355 @@ async def screen_resume(request: ResumeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/resume/rank", response_model=List[ResumeRankingResponse], tags=["Resume Screening"])
-async def rank_resumes(request: ResumeBatchRequest):
-    """Rank multiple resumes against a job description."""
+@router.post("/resume/rank", response_model=List[ResumeRankingResponse], response_model_exclude_none=True,
+              tags=["Resume Screening"])
+async def rank_resumes(
+    request: ResumeBatchRequest,
+    http_request: Request,
+    response: Response,
+    response_format: ResponseFormat = FORMAT_QUERY
+):
+    """Rank multiple resumes against a job description; past the deadline, only those screened so far."""
+    dataset = _batch_source(request.resumes, request.dataset_id, "resumes")
     try:
-        resumes_data = [{"id": r.id, "text": r.text} for r in request.resumes]
-        results = resume_screener.rank_resumes(resumes_data, request.job_description)
+        if dataset is not None:
+            resumes_data = dataset.records("id", "text")
+        else:
+            resumes_data = [{"id": r.id, "text": r.text} for r in request.resumes]
+        memory_stage("rank_resumes", items=len(resumes_data))
+        results, stats, cancel = await _run_batch(
+            http_request, dataset, result_key("resume_rank", resume_screener.VERSION, request.job_description),
+            resume_screener.rank_resumes, resumes_data, request.job_description
+        )
+        headers = _batch_headers(stats, cancel, len(results))
+        memory_stage("response_serialization")
+        if response_format != "full":
+            return compact_response("resume_rank", results, response_format, meta=stats, headers=headers)
+        response.headers.update(headers)
         return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/resume/rank/stream", tags=["Resume Screening"])
+async def stream_rank_resumes(
+    request: ResumeBatchRequest,
+    http_request: Request,
+    chunk_size: Optional[int] = CHUNK_SIZE_QUERY,
+    top_k: int = Query(10, ge=1, le=1000, description="Number of ranked resumes in each top_k event")
+):
+    """
+    Rank multiple resumes, streaming as Server-Sent Events.
+
+    Each chunk event carries screening results in input order; the top_k event
+    after it holds the best resumes so far, ranked. The last top_k event is the
+    final ranking of the top resumes.
+    """
+    dataset = _batch_source(request.resumes, request.dataset_id, "resumes")
+    cancel = CancelToken(request_timeout(http_request))
+    if dataset is not None:
+        resumes_data = dataset.records("id", "text")
+    else:
+        resumes_data = [{"id": r.id, "text": r.text} for r in request.resumes]
+
+    def score(chunk, stats, cancel):
+        return resume_screener.screen_batch(chunk, request.job_description, stats, cancel)
+
+    return sse_response(stream_batch(resumes_data, score, cancel, chunk_size, rank_by="match_score", top_k=top_k))
+
+
+def _index_state(meta: dict) -> dict:
+    return {"documents": meta["documents"], "generation": meta["generation"], "shards": meta["shards"]}
+
+
+@router.post("/resume/index", response_model=ResumeIndexResponse, response_model_exclude_none=True,
+              tags=["Resume Screening"])
+async def index_resumes(request: ResumeIndexRequest):
+    """Add resumes to the sharded search index."""
+    added = await run_in_threadpool(resume_index.add, [r.model_dump() for r in request.resumes])
+    return {**_index_state(resume_index.meta()), **added}
+
+
+@router.get("/resume/index", response_model=ResumeIndexResponse, response_model_exclude_none=True,
+             tags=["Resume Screening"])
+async def get_resume_index():
+    """Size and generation of the resume search index."""
+    return _index_state(resume_index.meta())
+
+
+@router.delete("/resume/index", response_model=ResumeIndexResponse, response_model_exclude_none=True,
+                tags=["Resume Screening"])
+async def clear_resume_index():
+    """Remove every resume from the search index."""
+    return _index_state(await run_in_threadpool(resume_index.clear))
+
+
+@router.post("/resume/search", response_model=ResumeSearchResponse, response_model_exclude_none=True,
+              tags=["Resume Screening"])
+async def search_resumes(request: ResumeSearchRequest):
+    """
+    Rank every indexed resume against a job description, searching shards in parallel.
+
+    Rankings are cached per job description and index generation, so paging,
+    filtering and re-sorting the same search does not rescore the pool.
+    Filters and sorts apply to the top ``RESUME_SEARCH_DEPTH`` resumes;
+    ``exhaustive`` tells whether those are the whole pool. With ``explain``,
+    each returned resume lists the job description terms that contributed
+    most to its score.
+    """
+    try:
+        return await run_in_threadpool(
+            resume_index.search,
+            request.job_description,
+            offset=request.offset,
+            limit=request.limit,
+            min_score=request.min_score,
+            min_experience=request.min_experience,
+            skills=request.skills,
+            recommendations=request.recommendations,
+            sort_by=request.sort_by,
+            explain=request.explain
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Fake News Detection Endpoints
 @router.post("/fakenews/detect", response_model=FakeNewsResponse, tags=["Fake News Detection"])
-async def detect_fake_news(request: FakeNewsRequest):
+async def detect_fake_news(request: FakeNewsRequest, response: Response):
     """Detect fake news and harmful content in text."""
+    analyzer = fake_news_detectors.choose()
+    response.headers.update(_version_header(analyzer))
     try:
-        result = fake_news_detector.analyze(request.text, request.source)
+        result = fake_news_detectors.tracked(analyzer, "analyze", inputs=2, batch=False)(request.text, request.source)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/fakenews/batch", response_model=List[FakeNewsResponse], tags=["Fake News Detection"])
+async def detect_fake_news_batch(
+    request: FakeNewsBatchRequest,
+    http_request: Request,
+    response: Response,
+    response_format: ResponseFormat = FORMAT_QUERY
+):
+    """Detect fake news and harmful content in multiple articles; stops early past the deadline."""
+    dataset = _batch_source(request.articles, request.dataset_id, "articles")
+    try:
+        if dataset is not None:
+            articles = dataset.records("text", "source")
+        else:
+            articles = [a.model_dump() for a in request.articles]
+        memory_stage("analyze_batch", items=len(articles))
+        analyzer = fake_news_detectors.choose()
+        results, stats, cancel = await _run_batch(
+            http_request, dataset, result_key("fakenews", analyzer.version),
+            fake_news_detectors.tracked(analyzer, "analyze_batch"), articles
+        )
+        headers = {**_batch_headers(stats, cancel, len(results)), **_version_header(analyzer)}
+        memory_stage("response_serialization")
+        if response_format != "full":
+            return compact_response("fakenews", results, response_format, meta=stats, headers=headers)
+        response.headers.update(headers)
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Analyzer Registry Endpoints
+def _get_registry(kind: str) -> AnalyzerRegistry:
+    registry = analyzer_registries.get(kind)
+    if registry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown analyzer '{kind}'")
+    return registry
+
+
+@router.get("/analyzers", response_model=List[AnalyzerReport], tags=["Analyzers"])
+async def list_analyzers():
+    """
+    Versions of every analyzer with routing weights, per-item latency and,
+    for shadow-scored versions, agreement with the served results.
+
+    Figures are those of the worker process answering the request.
+    """
+    return [registry.report() for registry in analyzer_registries.values()]
+
+
+@router.put("/analyzers/{kind}/routing", response_model=AnalyzerRouting, tags=["Analyzers"])
+async def set_analyzer_routing(kind: str, request: AnalyzerRoutingRequest):
+    """Change traffic weights, the shadow version or the shadow sample rate, for every worker."""
+    registry = _get_registry(kind)
+    changes = {"weights": request.weights, "shadow_rate": request.shadow_rate}
+    if request.shadow is not None:
+        changes["shadow"] = request.shadow or None
+    try:
+        return await run_in_threadpool(registry.set_routing, **changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/analyzers/{kind}/promote", response_model=AnalyzerRouting, tags=["Analyzers"])
+async def promote_analyzer(kind: str, request: AnalyzerPromoteRequest):
+    """Serve all traffic with one version."""
+    registry = _get_registry(kind)
+    try:
+        return await run_in_threadpool(registry.promote, request.version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# File Upload Endpoints
+async def _save_upload(file: UploadFile) -> tuple:
+    """Write an uploaded corpus to ``UPLOAD_DIR``; returns (file_id, path, size in bytes)."""
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    if ext not in FILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type '{ext}', expected one of {FILE_FORMATS}")
+
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    file_id = uuid.uuid4().hex
+    path = os.path.join(settings.UPLOAD_DIR, file_id + ext)
+    size = 0
+    with open(path, "wb") as out:
+        while chunk := await file.read(1024 * 1024):
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE:
+                out.close()
+                os.remove(path)
+                raise HTTPException(status_code=413, detail=f"File exceeds {settings.MAX_UPLOAD_SIZE} bytes")
+            out.write(chunk)
+    return file_id, path, size
+
+
+@router.post("/files", response_model=FileUploadResponse, tags=["Files"])
+async def upload_file(file: UploadFile = File(...)):
+    """Upload a CSV, JSONL or TXT corpus for use by background jobs."""
+    file_id, _, size = await _save_upload(file)
+    return {"file_id": file_id, "filename": file.filename, "size_bytes": size}
+
+
+def _uploaded_file_path(file_id: str) -> str:
+    matches = glob.glob(os.path.join(settings.UPLOAD_DIR, file_id + ".*")) if file_id.isalnum() else []
+    if not matches:
+        raise HTTPException(status_code=404, detail=f"File '{file_id}' not found")
+    return matches[0]
+
+
+# Dataset Endpoints
+@router.post("/datasets", response_model=DatasetResponse, status_code=201, tags=["Datasets"])
+async def create_dataset(file: UploadFile = File(...)):
+    """
+    Upload a CSV, JSONL or TXT corpus once and store it as a dataset.
+
+    Records need a ``text`` field and may carry ``id`` and ``source``. Batch
+    endpoints and jobs then take the returned ``dataset_id`` instead of inline
+    items, and reuse stored results when the same analysis runs again.
+    """
+    _, path, _ = await _save_upload(file)
+    try:
+        return await run_in_threadpool(dataset_store.create, path, file.filename)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid dataset file: {e}")
+    finally:
+        os.remove(path)
+
+
+@router.get("/datasets", response_model=List[DatasetResponse], tags=["Datasets"])
+async def list_datasets():
+    """List stored datasets, newest first."""
+    return await run_in_threadpool(dataset_store.list)
+
+
+@router.get("/datasets/{dataset_id}", response_model=DatasetResponse, tags=["Datasets"])
+async def get_dataset(dataset_id: str):
+    """Get a stored dataset's metadata."""
+    return _get_dataset(dataset_id).meta
+
+
+@router.delete("/datasets/{dataset_id}", status_code=204, tags=["Datasets"])
+async def delete_dataset(dataset_id: str):
+    """Delete a dataset and its stored results."""
+    if not await run_in_threadpool(dataset_store.delete, dataset_id):
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' not found")
+    return Response(status_code=204)
+
+
+def _job_response(job: dict) -> dict:
+    total = job["total_chunks"]
+    return {
+        "job_id": job["id"],
+        "progress": round(job["completed_chunks"] / total, 4) if total else 1.0,
+        **job
+    }
+
+
+# Background Job Endpoints
+@router.post("/jobs", response_model=JobResponse, status_code=202, tags=["Jobs"])
+async def submit_job(request: JobRequest):
+    """Submit a large batch for background processing."""
+    inline = {"sentiment": request.texts, "fakenews": request.articles, "resume_rank": request.resumes}[request.kind]
+    if [inline, request.file_id, request.dataset_id].count(None) != 2:
+        raise HTTPException(
+            status_code=400, detail="Provide exactly one of inline items for the job kind, a file_id or a dataset_id"
+        )
+    if request.kind == "resume_rank" and not request.job_description:
+        raise HTTPException(status_code=400, detail="resume_rank jobs require a job_description")
+
+    chunk_size = request.chunk_size or settings.JOB_CHUNK_SIZE
+    if request.file_id is not None:
+        chunks = iter_file_chunks(_uploaded_file_path(request.file_id), request.kind, chunk_size)
+    elif request.dataset_id is not None:
+        columns = {"sentiment": ("text", "id"), "fakenews": ("text", "source", "id"), "resume_rank": ("id", "text")}
+        records = _get_dataset(request.dataset_id).records(*columns[request.kind])
+        chunks = (records[i:i + chunk_size] for i in range(0, len(records), chunk_size))
+    else:
+        if request.kind == "sentiment":
+            records = [{"text": t} for t in inline]
+        else:
+            records = [item.model_dump() for item in inline]
+        chunks = (records[i:i + chunk_size] for i in range(0, len(records), chunk_size))
+
+    options = {"job_description": request.job_description} if request.kind == "resume_rank" else {}
+    try:
+        job_id = await run_in_threadpool(job_manager.submit, request.kind, chunks, options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _job_response(job_manager.store.get_job(job_id))
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, tags=["Jobs"])
+async def get_job(job_id: str):
+    """Get status and progress of a background job."""
+    job = job_manager.store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}/results", response_model=JobResultsResponse, tags=["Jobs"])
+async def get_job_results(job_id: str, offset: int = 0, limit: int = 1000):
+    """
+    Page through results of a background job.
+
+    While the job runs this returns results of finished chunks in input order;
+    ranking jobs are globally ranked once complete.
+    """
+    job = job_manager.store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    results, available = await run_in_threadpool(job_manager.store.get_results, job_id, offset, limit)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "partial": job["status"] != "completed",
+        "offset": offset,
+        "available": available,
+        "total_items": job["total_items"],
+        "results": results
+    }
@@ -0,0 +1,126 @@
+"""
+Server-Sent Events streaming for batch endpoints.
+
+The ``/stream`` variants of the batch endpoints score their input in chunks of
+``SSE_CHUNK_SIZE`` items and emit each chunk as soon as it is scored:
+
+- ``start``: ``{"total", "chunk_size"}``
+- ``chunk``: ``{"offset", "results"}``, results of the items starting at ``offset``
+- ``top_k`` (ranking only): ``{"results"}``, the best items seen so far, ranked
+- ``done``: dedup figures of the chunks that were scored (``items``,
+  ``unique_items``, ``dedup_ratio``), the number of ``completed`` items and
+  the result ``status``: ``complete``, or ``partial`` with a ``reason`` when the
+  request's compute deadline (see ``deadlines``) cut the batch short
+- ``error``: ``{"detail"}``, after which the stream ends
+
+A comment line is sent every ``SSE_HEARTBEAT_SECONDS`` while a chunk is being
+scored so proxies keep the connection open. The next chunk is only scored once
+the previous event has been handed to the server, so a slow client throttles
+scoring instead of piling up results, and a client that disconnects stops the
+stream at the next event.
+"""
+import asyncio
+import heapq
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from backend.api.responses import dumps
+from backend.core.cancellation import CancelToken
+from backend.core.config import settings
+from backend.services.dedup import record_stats
+
+
+HEARTBEAT = b": heartbeat\n\n"
+
+
+def sse_event(event: str, data) -> bytes:
+    """Encode one Server-Sent Event with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+def _without_none(result: Dict) -> Dict:
+    """Drop unset optional fields, as the non-streaming endpoints do."""
+    return {key: value for key, value in result.items() if value is not None}
+
+
+async def stream_batch(
+    items: Sequence,
+    score: Callable[[List, Dict, CancelToken], List[Dict]],
+    cancel: CancelToken,
+    chunk_size: Optional[int] = None,
+    rank_by: Optional[str] = None,
+    top_k: int = 10
+) -> AsyncIterator[bytes]:
+    """
+    Score ``items`` chunk by chunk and yield Server-Sent Events.
+
+    Args:
+        items: Batch inputs
+        score: Called in the threadpool with a chunk of items, a stats
+            dictionary and ``cancel``; returns one result per finished item.
+            Other requests score on the same analyzers at the same time, so
+            it must not change shared state (e.g. refit a shared vectorizer)
+        cancel: Token checked between chunks; cancelled if the client disconnects
+        chunk_size: Items per chunk (default ``SSE_CHUNK_SIZE``)
+        rank_by: Result field to rank by; emits ``top_k`` events when set
+        top_k: Number of ranked results kept and emitted
+
+    Yields:
+        Encoded events and heartbeat comments
+    """
+    chunk_size = chunk_size or settings.SSE_CHUNK_SIZE
+    yield sse_event("start", {"total": len(items), "chunk_size": chunk_size})
+
+    top: List[Dict] = []
+    scanned = unique = completed = 0
+    for offset in range(0, len(items), chunk_size):
+        if cancel.stopped():
+            break
+        stats = {}
+        task = asyncio.ensure_future(run_in_threadpool(score, items[offset:offset + chunk_size], stats, cancel))
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=settings.SSE_HEARTBEAT_SECONDS)
+                if done:
+                    break
+                yield HEARTBEAT
+            results = [_without_none(result) for result in task.result()]
+        except asyncio.CancelledError:
+            # Client went away: stop the thread at its next item
+            cancel.cancel()
+            task.cancel()
+            raise
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+
+        scanned += stats.get("items", len(results))
+        unique += stats.get("unique_items", len(results))
+        completed += len(results)
+        yield sse_event("chunk", {"offset": offset, "results": results})
+
+        if rank_by is not None:
+            # nlargest is a stable sort, so ties keep input order like the batch endpoint
+            top = heapq.nlargest(top_k, top + results, key=lambda result: result[rank_by])
+            ranked = [{**result, "rank": rank} for rank, result in enumerate(top, 1)]
+            yield sse_event("top_k", {"results": ranked})
+
+    meta = {}
+    record_stats(meta, scanned, unique)
+    meta["completed"] = completed
+    if completed < len(items):
+        meta.update(status="partial", reason=cancel.reason)
+    else:
+        meta["status"] = "complete"
+    yield sse_event("done", meta)
+
+
+def sse_response(events: AsyncIterator[bytes]) -> StreamingResponse:
+    """Wrap an event stream in a response that proxies will not buffer."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,81 @@
+"""
+Request phase spans for traced requests.
+
+FastAPI reads and validates the body, calls the endpoint and encodes its
+return value in one route handler. ``TracedRoute`` wraps both the handler and
+the endpoint, so a traced request (see ``backend.core.tracing``) gets three
+consecutive child spans of its root span:
+
+- ``request.validation``: from the handler start until the endpoint is called
+- ``endpoint``: the endpoint itself, parent of the analyzer stage spans
+- ``response.encoding``: from the endpoint's return until the handler's
+
+Endpoints that return a ``Response`` themselves (the compact batch formats)
+render it inside ``endpoint``. Synchronous endpoints are traced as a whole.
+"""
+import contextvars
+import functools
+import inspect
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+
+from backend.core.tracing import Span, current_span
+
+
+# Open phase span of the current request, shared by the handler and endpoint wrappers
+_phases: contextvars.ContextVar[Optional[Dict[str, Span]]] = contextvars.ContextVar(
+    "nlpb_trace_phases", default=None
+)
+
+
+def _phase(name: Optional[str]) -> None:
+    """End the running request phase, if any, and start ``name`` (None only ends it)."""
+    phases = _phases.get()
+    if phases is None:
+        return
+    running = phases.pop("running", None)
+    if running is not None:
+        running.finish()
+    if name is not None:
+        phases["running"] = phases["parent"].child(name).start()
+
+
+def _traced_endpoint(endpoint: Callable) -> Callable:
+    @functools.wraps(endpoint)
+    async def traced(*args, **kwargs):
+        parent = current_span()
+        if parent is None:
+            return await endpoint(*args, **kwargs)
+        _phase(None)
+        try:
+            with parent.child("endpoint"):
+                return await endpoint(*args, **kwargs)
+        finally:
+            _phase("response.encoding")
+    return traced
+
+
+class TracedRoute(APIRoute):
+    """Route splitting traced requests into validation, endpoint and encoding spans."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = _traced_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            parent = current_span()
+            if parent is None:
+                return await handler(request)
+            token = _phases.set({"parent": parent})
+            _phase("request.validation")
+            try:
+                return await handler(request)
+            finally:
+                _phase(None)
+                _phases.reset(token)
+        return traced_handler
@@ -0,0 +1,400 @@
+"""
+Command-line tools for NLPB.
+
+``bulk`` scores a CSV, JSONL or TXT corpus offline: the input is streamed in
+chunks through a process pool and results are appended to CSV, JSONL or
+Parquet as each chunk finishes. A checkpoint file records how many chunks
+(and output bytes) are complete, so an interrupted run resumes where it
+stopped instead of starting over. ``resume_rank`` output is re-ranked once
+all chunks are in; a run interrupted there resumes with the ranking alone.
+
+``stream`` runs the streaming ingestion daemon (see
+``backend.services.stream_service``) against a tailed NDJSON file or the
+local queue, and ``publish`` feeds NDJSON posts into that queue.
+
+Usage:
+    uv run python main.py bulk sentiment reviews.csv scores.jsonl --workers 8
+    uv run python main.py bulk resume_rank applicants.jsonl ranked.csv \\
+        --job-description-file job.txt
+    uv run python main.py stream posts.jsonl --file incoming.ndjson --metrics-port 9100
+    uv run python main.py publish data/posts.queue incoming.ndjson --max-depth 100000
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from backend.core.config import settings
+from backend.core.metrics import start_http_server
+from backend.core.pool import get_pool, shutdown_pools
+from backend.services.batch_tasks import KINDS, iter_file_chunks, process_chunk, rank_results
+from backend.services.rollup_service import RollupStore
+from backend.services.stream_service import ANALYZERS, FileSource, LocalQueue, QueueSource, StreamDaemon
+
+
+OUTPUT_FORMATS = (".csv", ".jsonl", ".parquet")
+
+
+class ResultWriter:
+    """Appends result chunks to CSV, JSONL or a directory of Parquet parts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower()
+        if self.format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format '{self.format}', expected one of {OUTPUT_FORMATS}")
+        if self.format == ".parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValueError("Parquet output requires pyarrow (uv add pyarrow)")
+
+    def truncate(self, size: int, chunks_done: int) -> None:
+        """Drop anything written after the last checkpoint."""
+        if self.format == ".parquet":
+            os.makedirs(self.path, exist_ok=True)
+            for name in os.listdir(self.path):
+                if name.startswith("part-") and int(name[5:10]) >= chunks_done:
+                    os.remove(os.path.join(self.path, name))
+        elif os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+        elif size:
+            raise ValueError(f"Checkpoint expects {size} bytes in missing output {self.path}")
+
+    def write(self, results: List[Dict], chunk_index: int) -> int:
+        """
+        Append one chunk durably.
+
+        Returns:
+            Output size in bytes after the write (0 for Parquet)
+        """
+        if self.format == ".parquet":
+            frame = pd.DataFrame(_flatten(r) for r in results)
+            frame.to_parquet(os.path.join(self.path, f"part-{chunk_index:05d}.parquet"), index=False)
+            return 0
+
+        with open(self.path, "ab") as f:
+            if self.format == ".jsonl":
+                f.write("".join(json.dumps(r) + "\n" for r in results).encode("utf-8"))
+            else:
+                frame = pd.DataFrame(_flatten(r) for r in results)
+                f.write(frame.to_csv(index=False, header=f.tell() == 0).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def read_all(self) -> pd.DataFrame:
+        # Ids stay strings, so e.g. "007" is not read back as 7
+        if self.format == ".parquet":
+            return pd.read_parquet(self.path)
+        if self.format == ".jsonl":
+            return pd.read_json(self.path, lines=True, dtype={"resume_id": str})
+        return pd.read_csv(self.path, keep_default_na=False, dtype={"resume_id": str})
+
+    def rewrite(self, frame: pd.DataFrame) -> None:
+        """Atomically replace the output with ``frame``."""
+        tmp = self.path + ".tmp"
+        if self.format == ".parquet":
+            self.recover()
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+            frame.to_parquet(os.path.join(tmp, "part-00000.parquet"), index=False)
+            # A directory cannot replace a non-empty one, so the old parts are
+            # moved aside first; recover() completes an interrupted swap
+            os.replace(self.path, self.path + ".old")
+            os.replace(tmp, self.path)
+            shutil.rmtree(self.path + ".old")
+            return
+        if self.format == ".jsonl":
+            frame.to_json(tmp, orient="records", lines=True)
+        else:
+            frame.to_csv(tmp, index=False)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def recover(self) -> None:
+        """Complete or roll back a Parquet ``rewrite`` that was interrupted."""
+        if self.format != ".parquet":
+            return
+        tmp, old = self.path + ".tmp", self.path + ".old"
+        if not os.path.exists(self.path):
+            # Interrupted between the two renames: the new parts are complete
+            if os.path.exists(tmp):
+                os.replace(tmp, self.path)
+            elif os.path.exists(old):
+                os.replace(old, self.path)
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _flatten(result: Dict) -> Dict:
+    """Encode nested values as JSON for tabular formats."""
+    return {k: json.dumps(v) if isinstance(v, (list, dict)) else v for k, v in result.items()}
+
+
+class Checkpoint:
+    """Progress of a bulk run, saved atomically after every chunk."""
+
+    def __init__(self, path: str, params: Dict):
+        self.path = path
+        self.state = {"params": params, "chunks_done": 0, "rows_done": 0, "output_bytes": 0,
+                      "ranking": False, "completed": False}
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            saved = json.load(f)
+        if saved["params"] != self.state["params"]:
+            raise ValueError(
+                f"Checkpoint {self.path} was written for different arguments; "
+                f"use --restart to discard it"
+            )
+        self.state = saved
+        return True
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+def run_bulk(args) -> int:
+    options = {}
+    if args.kind == "resume_rank":
+        job_description = args.job_description
+        if args.job_description_file:
+            with open(args.job_description_file, encoding="utf-8") as f:
+                job_description = f.read()
+        if not job_description:
+            print("resume_rank requires --job-description or --job-description-file", file=sys.stderr)
+            return 2
+        options["job_description"] = job_description
+
+    writer = ResultWriter(args.output)
+    params = {"kind": args.kind, "input": os.path.abspath(args.input), "chunk_size": args.chunk_size,
+              "options": options}
+    checkpoint = Checkpoint(args.checkpoint or args.output + ".ckpt.json", params)
+
+    if args.restart:
+        if os.path.exists(checkpoint.path):
+            os.remove(checkpoint.path)
+        writer.recover()
+        writer.truncate(0, 0)
+    elif checkpoint.load():
+        if checkpoint.state["completed"]:
+            print(f"{args.output} is already complete ({checkpoint.state['rows_done']} rows)")
+            return 0
+        if checkpoint.state.get("ranking"):
+            # All chunks are in; the output may already be re-ranked, so its
+            # size no longer matches output_bytes and must not be truncated
+            print(f"Resuming the ranking of {checkpoint.state['rows_done']} rows", file=sys.stderr)
+            writer.recover()
+            return _finish_bulk(args, writer, checkpoint)
+        print(f"Resuming after {checkpoint.state['chunks_done']} chunks "
+              f"({checkpoint.state['rows_done']} rows)", file=sys.stderr)
+    writer.truncate(checkpoint.state["output_bytes"], checkpoint.state["chunks_done"])
+
+    pool = get_pool("bulk", args.workers)
+    chunks = iter_file_chunks(args.input, args.kind, args.chunk_size, checkpoint.state["chunks_done"])
+    next_index = checkpoint.state["chunks_done"]
+    in_flight: Dict[int, Future] = {}
+    submitted = next_index
+    start = time.perf_counter()
+    rows_at_start = checkpoint.state["rows_done"]
+
+    try:
+        exhausted = False
+        while not exhausted or in_flight:
+            # Keep a bounded window of chunks in flight so memory stays flat
+            while not exhausted and len(in_flight) < args.workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                in_flight[submitted] = pool.submit(process_chunk, args.kind, chunk, options)
+                submitted += 1
+
+            if next_index in in_flight:
+                results = in_flight.pop(next_index).result()
+                size = writer.write(results, next_index)
+                next_index += 1
+                checkpoint.state.update(
+                    chunks_done=next_index,
+                    rows_done=checkpoint.state["rows_done"] + len(results),
+                    output_bytes=size
+                )
+                checkpoint.save()
+
+                elapsed = time.perf_counter() - start
+                rows = checkpoint.state["rows_done"] - rows_at_start
+                print(f"\r{checkpoint.state['rows_done']:>12,} rows  "
+                      f"{rows / elapsed if elapsed else 0:>10,.0f} rows/sec  {elapsed:>8.1f}s",
+                      end="", file=sys.stderr, flush=True)
+    finally:
+        shutdown_pools(wait=False)
+    print(file=sys.stderr)
+    return _finish_bulk(args, writer, checkpoint)
+
+
+def _finish_bulk(args, writer: ResultWriter, checkpoint: Checkpoint) -> int:
+    """Re-rank ``resume_rank`` output once all chunks are written, then mark the run complete."""
+    if args.kind == "resume_rank":
+        checkpoint.state["ranking"] = True
+        checkpoint.save()
+        ranked = rank_results(writer.read_all().to_dict("records"))
+        writer.rewrite(pd.DataFrame(ranked))
+
+    checkpoint.state["completed"] = True
+    checkpoint.save()
+    print(f"Wrote {checkpoint.state['rows_done']} rows to {args.output}")
+    return 0
+
+
+def run_stream(args) -> int:
+    if (args.file is None) == (args.queue is None):
+        print("stream requires exactly one of --file or --queue", file=sys.stderr)
+        return 2
+    analyzers = tuple(a.strip() for a in args.analyzers.split(",") if a.strip())
+    source_path = os.path.abspath(args.file or args.queue)
+    source = FileSource(source_path) if args.file else QueueSource(source_path)
+
+    writer = ResultWriter(args.output)
+    params = {
+        "source": source_path,
+        "source_type": "file" if args.file else "queue",
+        "analyzers": list(analyzers)
+    }
+    checkpoint = Checkpoint(args.checkpoint or args.output + ".ckpt.json", params)
+    if checkpoint.load():
+        print(f"Resuming at offset {checkpoint.state.get('offset', 0)} "
+              f"({checkpoint.state['rows_done']} posts committed)", file=sys.stderr)
+
+    rollups = None
+    if args.rollups:
+        os.makedirs(os.path.dirname(args.rollups) or ".", exist_ok=True)
+        rollups = RollupStore(args.rollups)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+
+    daemon = StreamDaemon(
+        source, writer, checkpoint,
+        analyzers=analyzers,
+        batch_size=args.batch_size,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait,
+        workers=args.workers,
+        rollups=rollups
+    )
+
+    # Finish and commit in-flight batches on Ctrl-C / SIGTERM
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    start = time.perf_counter()
+
+    def progress(rows_done: int, lag: int, unit: str) -> None:
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows_done:>12,} posts  {(rows_done - rows_at_start) / elapsed if elapsed else 0:>8,.0f} posts/sec  "
+              f"lag {lag:>10,} {unit}", end="", file=sys.stderr, flush=True)
+
+    rows_at_start = checkpoint.state["rows_done"]
+    try:
+        committed = daemon.run(stop, follow=not args.once, progress=progress)
+    finally:
+        shutdown_pools(wait=False)
+        source.close()
+    print(file=sys.stderr)
+    print(f"Committed {committed} posts to {args.output}")
+    return 0
+
+
+def run_publish(args) -> int:
+    queue = LocalQueue(args.queue)
+    published = 0
+    batch = []
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        for line in stream:
+            if line.strip():
+                batch.append(line.strip())
+            if len(batch) >= args.batch_size:
+                queue.publish(batch, max_depth=args.max_depth)
+                published += len(batch)
+                batch = []
+        if batch:
+            queue.publish(batch, max_depth=args.max_depth)
+            published += len(batch)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        queue.close()
+    print(f"Published {published} posts to {args.queue}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="nlpb", description="NLP Business Intelligence tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bulk = commands.add_parser("bulk", help="Score a CSV/JSONL/TXT corpus offline")
+    bulk.add_argument("kind", choices=KINDS, help="Analysis to run")
+    bulk.add_argument("input", help="Input file (.csv, .jsonl, .ndjson or .txt)")
+    bulk.add_argument("output", help="Output file (.csv, .jsonl or .parquet)")
+    bulk.add_argument("--chunk-size", type=int, default=1000, help="Rows per chunk")
+    bulk.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    bulk.add_argument("--checkpoint", help="Checkpoint file (default: <output>.ckpt.json)")
+    bulk.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over")
+    bulk.add_argument("--job-description", help="Job description text (resume_rank)")
+    bulk.add_argument("--job-description-file", help="File containing the job description (resume_rank)")
+    bulk.set_defaults(handler=run_bulk)
+
+    stream = commands.add_parser("stream", help="Continuously score posts from an NDJSON file or the local queue")
+    stream.add_argument("output", help="Output file (.csv, .jsonl or .parquet)")
+    stream.add_argument("--file", help="Append-only NDJSON file to tail")
+    stream.add_argument("--queue", help="Local queue database to consume (see 'publish')")
+    stream.add_argument("--analyzers", default=",".join(ANALYZERS), help="Comma-separated analyzers to run")
+    stream.add_argument("--batch-size", type=int, default=256, help="Posts per micro-batch when keeping up")
+    stream.add_argument("--max-batch-size", type=int, default=4096, help="Largest micro-batch when catching up")
+    stream.add_argument("--max-wait", type=float, default=1.0, help="Seconds a partial batch waits for more posts")
+    stream.add_argument("--workers", type=int, default=2, help="Scoring processes")
+    stream.add_argument("--checkpoint", help="Offset checkpoint file (default: <output>.ckpt.json)")
+    stream.add_argument("--rollups", default=settings.ROLLUP_DB_PATH,
+                        help="Sentiment rollup store to update ('' to disable)")
+    stream.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics on this port")
+    stream.add_argument("--once", action="store_true", help="Exit once the source is drained instead of following it")
+    stream.set_defaults(handler=run_stream)
+
+    publish = commands.add_parser("publish", help="Publish NDJSON posts to the local queue")
+    publish.add_argument("queue", help="Local queue database")
+    publish.add_argument("input", help="NDJSON file of posts, or - for stdin")
+    publish.add_argument("--batch-size", type=int, default=500, help="Posts per queue transaction")
+    publish.add_argument("--max-depth", type=int, default=0,
+                         help="Wait while the queue holds this many unconsumed posts (0 = unbounded)")
+    publish.set_defaults(handler=run_publish)
+
+    return parser
+
+
+def run_cli(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run the selected command."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,291 @@
+"""
+Admission control for scoring requests.
+
+Every ``POST /api/...`` request is charged a cost of one unit plus one unit per
+``ADMISSION_BYTES_PER_UNIT`` bytes of body, so a batch of many long texts
+costs far more than a single short one. Three mechanisms then apply, in order:
+
+1. Per-client token buckets. Clients are keyed by the ``ADMISSION_KEY_HEADER``
+   header (the client address without one). Buckets refill at
+   ``ADMISSION_RATE`` units per second up to ``ADMISSION_BURST``. A request is
+   let through while its bucket is not in debt and then deducts its full cost,
+   so one large batch is allowed but pushes its client's next request back.
+   Otherwise the answer is 429 with ``Retry-After``.
+2. Weighted fair queuing. At most ``ADMISSION_MAX_CONCURRENT`` requests run at
+   once. The rest wait in one queue ordered by self-clocked fair queuing
+   finish tags: cost divided by weight, accumulated per client. Interactive
+   single-item routes (``ADMISSION_INTERACTIVE_PATHS``) get
+   ``ADMISSION_INTERACTIVE_WEIGHT`` times the share of bulk requests, and a
+   client sending a large dump only delays its own later requests.
+3. Load shedding. While the recent queue wait is above ``ADMISSION_TARGET_WAIT``,
+   new bulk requests are rejected with 503. Any request still queued after
+   ``ADMISSION_MAX_WAIT`` gives up with 503.
+
+A request gives its slot back as soon as its response starts. Ordinary
+responses start once scoring is done; Server-Sent Events streams start right
+away, so an open stream does not hold a slot for its whole lifetime (its cost
+is still charged to the client's bucket).
+
+State is per worker process, like the metrics registry.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from backend.core.config import settings
+from backend.core.metrics import registry
+
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+ADMISSION_REQUESTS = registry.counter(
+    "nlpb_admission_requests_total",
+    "Scoring requests by priority and admission outcome (admitted/rate_limited/shed/timed_out).",
+    ("priority", "outcome")
+)
+ADMISSION_COST = registry.counter(
+    "nlpb_admission_cost_units_total", "Cost units of admitted requests.", ("priority",)
+)
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "nlpb_admission_queue_depth", "Requests waiting for a processing slot.", ("priority",)
+)
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "nlpb_admission_queue_wait_seconds", "Time requests waited for a processing slot.", ("priority",)
+)
+ADMISSION_ACTIVE = registry.gauge(
+    "nlpb_admission_active_requests", "Scoring requests currently holding a processing slot."
+)
+
+# Buckets and finish tags of idle clients are dropped past this many clients
+_MAX_TRACKED_CLIENTS = 10000
+
+
+class TokenBucket:
+    """Cost budget of one client; may go into debt by one request."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """
+        Charge ``cost`` if the bucket is not in debt.
+
+        Returns:
+            0 if charged, else seconds until the bucket is out of debt
+        """
+        self.refill(now)
+        if self.tokens <= 0:
+            return -self.tokens / self.rate
+        self.tokens -= cost
+        return 0.0
+
+
+class FairScheduler:
+    """Concurrency limit with a self-clocked weighted fair queue in front of it."""
+
+    def __init__(self, max_concurrent: int, weights: Dict[str, float]):
+        self.max_concurrent = max_concurrent
+        self.weights = weights
+        self.active = 0
+        self.virtual_time = 0.0
+        self.finish_tags: Dict[str, float] = {}
+        self.queue: List[Tuple[float, int, asyncio.Future, str]] = []
+        # Live waiters; the heap also holds futures of waiters that gave up
+        self.waiting = 0
+        self.recent_wait = 0.0
+        self._seq = itertools.count()
+
+    def overloaded(self) -> bool:
+        """True while requests queue and recently waited longer than the target."""
+        return self.waiting > 0 and self.recent_wait > settings.ADMISSION_TARGET_WAIT
+
+    def _record_wait(self, priority: str, waited: float) -> None:
+        self.recent_wait = 0.8 * self.recent_wait + 0.2 * waited
+        ADMISSION_QUEUE_WAIT.labels(priority).observe(waited)
+
+    async def acquire(self, client: str, priority: str, cost: float, timeout: float) -> None:
+        """
+        Wait for a processing slot.
+
+        Raises:
+            asyncio.TimeoutError: If no slot was free within ``timeout`` seconds
+        """
+        if self.active < self.max_concurrent and not self.waiting:
+            self.active += 1
+            ADMISSION_ACTIVE.inc()
+            self._record_wait(priority, 0.0)
+            return
+
+        tag = max(self.virtual_time, self.finish_tags.get(client, 0.0)) + cost / self.weights[priority]
+        self.finish_tags[client] = tag
+        if len(self.finish_tags) > _MAX_TRACKED_CLIENTS:
+            self.finish_tags = {c: t for c, t in self.finish_tags.items() if t > self.virtual_time}
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.queue, (tag, next(self._seq), future, priority))
+        self.waiting += 1
+        ADMISSION_QUEUE_DEPTH.labels(priority).inc()
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException:
+            # Timed out or cancelled (e.g. the client disconnected)
+            if future.done() and not future.cancelled():
+                # release() handed over the slot just before; pass it on
+                self.release()
+            else:
+                # The future stays in the heap and is skipped by release()
+                future.cancel()
+                self.waiting -= 1
+                ADMISSION_QUEUE_DEPTH.labels(priority).dec()
+            raise
+        finally:
+            self._record_wait(priority, time.monotonic() - start)
+
+    def release(self) -> None:
+        """Hand the slot to the queued request with the smallest finish tag, or free it."""
+        while self.queue:
+            tag, _, future, priority = heapq.heappop(self.queue)
+            if future.done():
+                # Its waiter gave up and already left the queue counts
+                continue
+            self.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.labels(priority).dec()
+            self.virtual_time = tag
+            future.set_result(None)
+            return
+        self.active -= 1
+        ADMISSION_ACTIVE.dec()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _reject(scope, receive, send, status: int, detail: str, retry_after: Optional[float] = None) -> None:
+    headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after is not None else None
+    response = JSONResponse({"detail": detail}, status_code=status, headers=headers)
+    await response(scope, receive, send)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying per-client rate limits and fair queuing to scoring requests."""
+
+    def __init__(self, app):
+        self.app = app
+        self.key_header = settings.ADMISSION_KEY_HEADER.lower().encode("latin-1")
+        self.interactive_paths = frozenset(settings.ADMISSION_INTERACTIVE_PATHS)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.scheduler = FairScheduler(
+            settings.ADMISSION_MAX_CONCURRENT,
+            {INTERACTIVE: settings.ADMISSION_INTERACTIVE_WEIGHT, BULK: 1.0}
+        )
+
+    def _bucket(self, client: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            if len(self.buckets) >= _MAX_TRACKED_CLIENTS:
+                for idle in self.buckets.values():
+                    idle.refill(now)
+                self.buckets = {c: b for c, b in self.buckets.items() if b.tokens < b.burst}
+            bucket = self.buckets[client] = TokenBucket(settings.ADMISSION_RATE, settings.ADMISSION_BURST)
+        return bucket
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        client = _header(scope, self.key_header)
+        if client is None:
+            client = "addr:" + (scope["client"][0] if scope.get("client") else "unknown")
+        priority = INTERACTIVE if scope["path"] in self.interactive_paths else BULK
+
+        length = _header(scope, b"content-length")
+        if length is None:
+            # No Content-Length (chunked upload): read the body to price it, then replay it
+            body = bytearray()
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                body += message.get("body", b"")
+                if not message.get("more_body", False):
+                    break
+            length = len(body)
+            receive = _replay(bytes(body), receive)
+        else:
+            try:
+                length = int(length)
+            except ValueError:
+                length = -1
+            if length < 0:
+                await _reject(scope, receive, send, 400, "Invalid Content-Length header")
+                return
+        cost = 1 + length / settings.ADMISSION_BYTES_PER_UNIT
+
+        now = time.monotonic()
+        retry_after = self._bucket(client, now).take(cost, now)
+        if retry_after:
+            ADMISSION_REQUESTS.labels(priority, "rate_limited").inc()
+            await _reject(scope, receive, send, 429, "Rate limit exceeded for this client", retry_after)
+            return
+
+        if priority == BULK and self.scheduler.overloaded():
+            ADMISSION_REQUESTS.labels(priority, "shed").inc()
+            await _reject(scope, receive, send, 503, "Server busy, retry later", self.scheduler.recent_wait)
+            return
+
+        try:
+            await self.scheduler.acquire(client, priority, cost, settings.ADMISSION_MAX_WAIT)
+        except asyncio.TimeoutError:
+            ADMISSION_REQUESTS.labels(priority, "timed_out").inc()
+            await _reject(scope, receive, send, 503, "Server busy, retry later", self.scheduler.recent_wait)
+            return
+
+        ADMISSION_REQUESTS.labels(priority, "admitted").inc()
+        ADMISSION_COST.labels(priority).inc(cost)
+        released = False
+
+        async def send_wrapper(message):
+            nonlocal released
+            if message["type"] == "http.response.start" and not released:
+                released = True
+                self.scheduler.release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not released:
+                self.scheduler.release()
+
+
+def _replay(body: bytes, receive):
+    """Receive callable that returns ``body`` once, then defers to ``receive``."""
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
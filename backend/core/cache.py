@@ -0,0 +1,258 @@
+"""
+Two-tier result cache for analyzer outputs.
+
+Lookups go to a per-process LRU first and then to a SQLite database in WAL
+mode that every worker process on the host shares and that survives
+deploys. Keys hash the analyzer name, the analyzer version and the input, so
+bumping an analyzer's ``VERSION`` invalidates its old entries.
+
+The cache is best-effort: disk errors (e.g. a locked database) count as
+misses and never fail a request. Disk writes happen behind the request: new
+entries go to the memory tier at once and are queued for a background thread
+that stores them in batches, one transaction each.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from backend.core.metrics import CACHE_REQUESTS, registry
+
+
+logger = logging.getLogger("nlpb.cache")
+
+CACHE_ERRORS = registry.counter("nlpb_cache_errors_total", "Cache operations that failed.", ("cache",))
+CACHE_ENTRIES = registry.gauge("nlpb_cache_entries", "Entries held by a cache tier.", ("cache",))
+
+# Rewrite an entry's access time at most this often, to keep hits read-only
+TOUCH_INTERVAL = 300.0
+# Check the disk size every N writes
+EVICTION_CHECK_INTERVAL = 200
+# Entries queued for the disk writer; more are dropped (the memory tier keeps them)
+DISK_WRITE_QUEUE = 10000
+# Entries stored per disk transaction
+DISK_WRITE_BATCH = 500
+
+
+def cache_key(namespace: str, version: str, *parts: str) -> str:
+    """Content hash identifying one analyzer result."""
+    digest = hashlib.sha256()
+    for part in (namespace, version, *parts):
+        digest.update(part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU."""
+
+    def __init__(self, max_items: int, name: str = "memory"):
+        self.max_items = max_items
+        self._data: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        CACHE_ENTRIES.labels(name).set_function(lambda: len(self._data))
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache:
+    """Size-bounded SQLite cache safe for concurrent use by many processes."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connect().execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and per process; connections must not
+        # cross a fork (e.g. the pre-fork master opening one before workers).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        conn = self._connect()
+        row = conn.execute("SELECT value, accessed FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > TOUCH_INTERVAL:
+            conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[str, Dict]]) -> None:
+        """Store entries in one transaction."""
+        now = time.time()
+        rows = []
+        for key, value in items:
+            encoded = json.dumps(value)
+            rows.append((key, encoded, len(encoded), now))
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)", rows
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        before = self._writes
+        self._writes += len(rows)
+        if self._writes // EVICTION_CHECK_INTERVAL != before // EVICTION_CHECK_INTERVAL:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache is under 90% of its budget."""
+        conn = self._connect()
+        total, count = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM results").fetchone()
+        if total <= self.max_bytes:
+            return 0
+        average = total / count
+        excess = total - int(self.max_bytes * 0.9)
+        cursor = conn.execute(
+            "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed LIMIT ?)",
+            (int(excess / average) + 1,)
+        )
+        return cursor.rowcount
+
+    def most_recent(self, limit: int):
+        """Yield ``(key, value)`` for the most recently used entries."""
+        rows = self._connect().execute(
+            "SELECT key, value FROM results ORDER BY accessed DESC LIMIT ?", (limit,)
+        ).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+
+
+class ResultCache:
+    """Memory tier in front of an optional shared disk tier."""
+
+    def __init__(self, memory_items: int, disk_path: str = "", disk_max_bytes: int = 0):
+        self.memory = MemoryCache(memory_items) if memory_items > 0 else None
+        self.disk = DiskCache(disk_path, disk_max_bytes) if disk_path else None
+        self._pending: Optional[queue.Queue] = None
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Look up a result; returns a copy the caller may modify."""
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                CACHE_REQUESTS.labels("memory", "hit").inc()
+                return dict(value)
+            CACHE_REQUESTS.labels("memory", "miss").inc()
+
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error:
+                CACHE_ERRORS.labels("disk").inc()
+                value = None
+            if value is not None:
+                CACHE_REQUESTS.labels("disk", "hit").inc()
+                if self.memory is not None:
+                    self.memory.set(key, value)
+                return dict(value)
+            CACHE_REQUESTS.labels("disk", "miss").inc()
+        return None
+
+    def set(self, key: str, value: Dict) -> None:
+        if self.memory is not None:
+            self.memory.set(key, dict(value))
+        if self.disk is not None:
+            try:
+                self._writer().put_nowait((key, dict(value)))
+            except queue.Full:
+                CACHE_ERRORS.labels("disk_queue").inc()
+
+    def _writer(self) -> queue.Queue:
+        """Queue of the disk writer thread, started on first use in each process."""
+        if self._writer_pid != os.getpid():
+            with self._writer_lock:
+                if self._writer_pid != os.getpid():
+                    self._pending = queue.Queue(DISK_WRITE_QUEUE)
+                    threading.Thread(
+                        target=self._write_behind, args=(self._pending,), daemon=True, name="nlpb-cache-writer"
+                    ).start()
+                    self._writer_pid = os.getpid()
+        return self._pending
+
+    def _write_behind(self, pending: queue.Queue) -> None:
+        while True:
+            batch = [pending.get()]
+            while len(batch) < DISK_WRITE_BATCH:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.disk.set_many(batch)
+            except sqlite3.Error:
+                CACHE_ERRORS.labels("disk").inc()
+            finally:
+                for _ in batch:
+                    pending.task_done()
+
+    def flush(self) -> None:
+        """Wait until queued disk writes of this process are stored."""
+        if self._pending is not None and self._writer_pid == os.getpid():
+            self._pending.join()
+
+    def warm_start(self, limit: int) -> int:
+        """
+        Load the most recently used disk entries into the memory tier.
+
+        Returns:
+            Number of entries loaded
+        """
+        if self.memory is None or self.disk is None or limit <= 0:
+            return 0
+        try:
+            entries = list(self.disk.most_recent(min(limit, self.memory.max_items)))
+        except sqlite3.Error:
+            CACHE_ERRORS.labels("disk").inc()
+            return 0
+        # Oldest first, so the most recent entries end up most recently used
+        for key, value in reversed(entries):
+            self.memory.set(key, value)
+        logger.info("Warm-started result cache with %d entries", len(entries))
+        return len(entries)
@@ -0,0 +1,63 @@
+"""
+Cooperative cancellation for batch scoring.
+
+Batch methods of the analyzers accept an optional ``CancelToken`` and check it
+before scoring each unique item. The API cancels the token when the client
+disconnects, and the token expires on its own once the request's compute
+deadline has passed; either way the batch stops scheduling work and returns
+the results finished so far.
+"""
+import time
+from typing import Iterable, List, Optional
+
+from backend.core.metrics import registry
+
+
+BATCHES_STOPPED = registry.counter(
+    "nlpb_batches_stopped_total", "Batch requests stopped before finishing, by reason.", ("reason",)
+)
+
+CLIENT_DISCONNECTED = "client_disconnected"
+DEADLINE_EXCEEDED = "deadline_exceeded"
+
+
+class CancelToken:
+    """Flag shared between a request and the thread scoring its batch."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = CLIENT_DISCONNECTED) -> None:
+        if self.reason is None:
+            self.reason = reason
+            BATCHES_STOPPED.labels(reason).inc()
+
+    def stopped(self) -> bool:
+        """True once cancelled or past the deadline."""
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE_EXCEEDED)
+        return self.reason is not None
+
+
+def take_until_stopped(results: Iterable, cancel: Optional[CancelToken]) -> List:
+    """
+    Consume a lazy iterable of results, checking ``cancel`` before each one.
+
+    Args:
+        results: Generator that scores one item per step
+        cancel: Token to check, or None to consume everything
+
+    Returns:
+        Results produced before the token stopped
+    """
+    if cancel is None:
+        return list(results)
+    done = []
+    iterator = iter(results)
+    while not cancel.stopped():
+        try:
+            done.append(next(iterator))
+        except StopIteration:
+            break
+    return done
@@ -16,13 +16,110 @@ class Settings(BaseModel):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     RELOAD: bool = True
-    
+
+    # Production Launch Settings
+    WORKERS: int = 1
+    PREFORK: bool = False  # Load models once in the master, then fork workers
+    FREEZE_SHARED_OBJECTS: bool = True  # gc.freeze() preloaded objects before forking
+
     # CORS Settings
     CORS_ORIGINS: list[str] = ["http://localhost:8501", "http://localhost:3000"]
     
+    # Admission Control Settings (POST /api/* requests, per worker)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_KEY_HEADER: str = "X-API-Key"  # Clients without it are keyed by address
+    ADMISSION_BYTES_PER_UNIT: int = 1024  # Request cost = 1 + body bytes / this
+    ADMISSION_RATE: float = 1000.0  # Cost units refilled per second per client
+    ADMISSION_BURST: float = 10000.0  # Cost units a client can spend at once
+    ADMISSION_MAX_CONCURRENT: int = 8  # Requests processed at once; the rest queue
+    ADMISSION_INTERACTIVE_WEIGHT: float = 8.0  # Queue share of interactive vs bulk (1) requests
+    ADMISSION_INTERACTIVE_PATHS: list[str] = [
+        "/api/sentiment/analyze", "/api/resume/screen", "/api/fakenews/detect"
+    ]
+    ADMISSION_TARGET_WAIT: float = 0.5  # Seconds; above this recent queue wait, bulk requests are shed
+    ADMISSION_MAX_WAIT: float = 10.0  # Seconds a request may queue before it is rejected
+    
     # File Upload Settings
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "./data/uploads"
+    DATASET_MAX_CACHED_RESULTS: int = 16  # Stored analysis results kept per dataset
+    
+    # Background Job Settings
+    JOB_DB_PATH: str = "./data/jobs.sqlite3"
+    JOB_WORKERS: int = 2  # Processes in the "jobs" pool
+    JOB_CHUNK_SIZE: int = 1000  # Items per checkpointed chunk
+    JOB_RETENTION_SECONDS: int = 24 * 60 * 60  # Finished jobs are deleted after this
+    JOB_CHUNK_LEASE_SECONDS: float = 60.0  # Running chunks whose dispatcher stopped renewing are reclaimed after this
+    
+    # Resume Index Settings (shard count and term space are fixed when the index is created)
+    RESUME_INDEX_DIR: str = "./data/resume_index"
+    RESUME_INDEX_SHARDS: int = 8
+    RESUME_INDEX_FEATURES: int = 2 ** 20  # Hashed term space
+    RESUME_INDEX_MAX_SEGMENTS: int = 16  # Segments per shard before they are compacted into one
+    RESUME_SEARCH_WORKERS: int = 4  # Processes in the "search" pool; 1 searches shards inline
+    RESUME_SEARCH_DEPTH: int = 1000  # Top resumes kept per search; pages, filters and sorts apply to them
+    RESUME_SEARCH_CACHE_ITEMS: int = 128  # Cached searches per process; 0 disables
+    # Minimum index scores for highly_recommended / recommended / maybe. Index scores
+    # use corpus-wide IDF and run lower than /resume/screen scores (thresholds 70/50/30)
+    RESUME_SEARCH_RECOMMENDATION_SCORES: tuple[float, float, float] = (35.0, 25.0, 15.0)
+    
+    # Analyzer Registry Settings (see backend/services/analyzer_registry.py)
+    ANALYZER_VERSIONS: dict[str, dict[str, dict]] = {
+        "sentiment": {"lexicon": {"engine": "lexicon"}},
+        "fakenews": {"strict": {"fake_threshold": 50.0}},
+    }  # Candidate versions per analyzer: constructor options by version name
+    ANALYZER_ROUTING_DIR: str = "./data/analyzer_routing"  # Routing weights and shadow targets, shared by workers
+    SHADOW_SAMPLE_RATE: float = 0.05  # Default share of requests also scored by the shadow version
+    SHADOW_CPU_BUDGET: float = 0.1  # CPU seconds per second shadow scoring may use, per worker
+    SHADOW_MAX_ITEMS: int = 100  # Batch items shadow-scored per sampled request
+    
+    # Sentiment Rollup Settings
+    ROLLUP_DB_PATH: str = "./data/rollups.sqlite3"
+    
+    # Result Cache Settings
+    RESULT_CACHE_MEMORY_ITEMS: int = 10000  # Per-process LRU entries; 0 disables
+    RESULT_CACHE_DISK_PATH: str = "./data/result_cache.sqlite3"  # Shared tier; "" disables
+    RESULT_CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
+    RESULT_CACHE_WARM_START: int = 5000  # Disk entries preloaded into memory at startup
+    
+    # Batch Deadline Settings (batch endpoints stop early and return partial results)
+    BATCH_DEADLINE_SECONDS: float = 120.0  # Compute budget per batch request; 0 disables
+    BATCH_DEADLINE_HEADER: str = "X-Request-Deadline"  # Per-request budget in seconds
+    BATCH_DEADLINE_MAX_SECONDS: float = 600.0  # Cap on budgets requested via the header
+    DISCONNECT_POLL_SECONDS: float = 0.5  # How often a running batch checks for a closed connection
+    
+    # Batch Streaming Settings (Server-Sent Events)
+    SSE_CHUNK_SIZE: int = 100  # Items scored per "chunk" event
+    SSE_HEARTBEAT_SECONDS: float = 15.0  # Comment sent while a chunk is still scoring
+    
+    # Long Document Settings
+    LONG_DOCUMENT_THRESHOLD: int = 20000  # Characters; longer texts are scored in windows
+    LONG_DOCUMENT_WINDOW: int = 5000  # Target characters per sentence-aligned window
+    LONG_DOCUMENT_MAX_LENGTH: int = 500000  # Characters processed; the rest is truncated
+    LONG_DOCUMENT_WORKERS: int = 4  # Processes scoring windows; 1 scores them inline
+    
+    # Profiling Settings (the middleware is not installed unless enabled)
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled automatically
+    PROFILE_HEADER: str = "X-Profile-Token"
+    PROFILE_TOKEN: str = ""  # Header value that forces a profile; empty disables the header
+    PROFILE_DIR: str = "./data/profiles"
+    PROFILE_SAMPLE_INTERVAL: float = 0.001  # Seconds between stack samples
+    
+    # Memory Profiling Settings (batch endpoints only)
+    MEMORY_PROFILING_ENABLED: bool = False
+    MEMORY_PROFILE_HISTORY: int = 200  # Requests kept for /debug/memory
+    MEMORY_PROFILE_TOP_ALLOCATIONS: int = 0  # >0 diffs tracemalloc snapshots per stage (slow)
+    
+    # Tracing Settings (the middleware is not installed unless enabled)
+    TRACING_ENABLED: bool = False
+    TRACE_SAMPLE_RATE: float = 0.01  # Fraction of requests traced; a sampled traceparent header forces it
+    TRACE_SLOW_SECONDS: float = 0.0  # >0 traces every request and also exports unsampled ones this slow
+    TRACE_EXPORTER: str = "jsonl"  # "jsonl" (TRACE_FILE) or "otlp" (OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT)
+    TRACE_FILE: str = "./data/traces/traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://127.0.0.1:4318/v1/traces"
+    TRACE_MAX_SPANS_PER_NAME: int = 50  # Further spans of a name are only counted in the trace summary
+    TRACE_EXPORT_QUEUE: int = 1000  # Finished traces waiting for export; more are dropped
     
     # Model Settings
     MIN_CONFIDENCE_THRESHOLD: float = 0.5
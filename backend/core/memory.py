@@ -0,0 +1,184 @@
+"""
+Per-request, per-stage memory accounting for batch endpoints.
+
+When ``MEMORY_PROFILING_ENABLED`` is set, requests to the batch routes are
+tracked stage by stage (request parsing, scoring, statistics, response
+serialization). Each stage records its tracemalloc peak above the stage's
+starting allocation and its RSS delta. With ``MEMORY_PROFILE_TOP_ALLOCATIONS``
+set, tracemalloc snapshots taken at stage boundaries are diffed to name the
+top allocating lines. Results feed the ``/metrics`` histograms and the
+``/debug/memory`` endpoint.
+
+tracemalloc is process-wide, so stage peaks from overlapping requests can
+include each other's allocations; use a single worker and sequential load
+when establishing batch limits.
+"""
+import contextvars
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from backend.core.config import settings
+from backend.core.metrics import SIZE_BUCKETS, registry
+
+
+MEMORY_BUCKETS = SIZE_BUCKETS + (67108864, 268435456, 1073741824)
+
+STAGE_PEAK_MEMORY = registry.histogram(
+    "nlpb_request_stage_peak_memory_bytes",
+    "Peak traced allocation per request stage.", ("route", "stage"), MEMORY_BUCKETS
+)
+STAGE_RSS_GROWTH = registry.histogram(
+    "nlpb_request_stage_rss_growth_bytes",
+    "RSS growth per request stage.", ("route", "stage"), MEMORY_BUCKETS
+)
+
+MEMORY_PROFILED_ROUTES = {
+    "/api/sentiment/batch", "/api/sentiment/statistics", "/api/resume/rank", "/api/fakenews/batch"
+}
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_current: contextvars.ContextVar[Optional["MemoryTracker"]] = contextvars.ContextVar(
+    "nlpb_memory_tracker", default=None
+)
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (0 if unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class MemoryTracker:
+    """Records peak traced memory and RSS deltas for consecutive stages of one request."""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.items: Optional[int] = None
+        self.stages: List[Dict[str, object]] = []
+        self._stage: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def enter(self, name: str) -> None:
+        """Close the running stage (if any) and start ``name``."""
+        with self._lock:
+            self._close()
+            self._stage = name
+            self._start_time = time.perf_counter()
+            self._start_traced = tracemalloc.get_traced_memory()[0]
+            self._start_rss = current_rss()
+            self._start_snapshot = (
+                tracemalloc.take_snapshot() if settings.MEMORY_PROFILE_TOP_ALLOCATIONS > 0 else None
+            )
+            tracemalloc.reset_peak()
+
+    def _close(self) -> None:
+        if self._stage is None:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        record = {
+            "stage": self._stage,
+            "peak_bytes": max(0, peak - self._start_traced),
+            "rss_delta_bytes": current_rss() - self._start_rss,
+            "duration_seconds": round(time.perf_counter() - self._start_time, 6)
+        }
+        if self._start_snapshot is not None:
+            diff = tracemalloc.take_snapshot().compare_to(self._start_snapshot, "lineno")
+            record["top_allocations"] = [
+                {"location": str(stat.traceback[0]), "size_diff_bytes": stat.size_diff}
+                for stat in diff[:settings.MEMORY_PROFILE_TOP_ALLOCATIONS]
+            ]
+        self.stages.append(record)
+        self._stage = None
+
+    def finish(self) -> Dict[str, object]:
+        """Close the last stage and return the request's record."""
+        with self._lock:
+            self._close()
+        return {
+            "route": self.route,
+            "timestamp": time.time(),
+            "items": self.items,
+            "peak_bytes": max((s["peak_bytes"] for s in self.stages), default=0),
+            "stages": self.stages
+        }
+
+
+def memory_stage(name: str, items: Optional[int] = None) -> None:
+    """
+    Mark the start of a new stage for the current request.
+
+    A no-op unless the request is being memory-profiled.
+
+    Args:
+        name: Stage name, e.g. ``analyze_batch``
+        items: Batch size, recorded so limits can be derived per item
+    """
+    tracker = _current.get()
+    if tracker is None:
+        return
+    if items is not None:
+        tracker.items = items
+    tracker.enter(name)
+
+
+class MemoryProfile:
+    """Recent per-request memory records, kept for the debug endpoint."""
+
+    def __init__(self, history: int):
+        self.records: Deque[Dict[str, object]] = deque(maxlen=history)
+
+    def add(self, record: Dict[str, object]) -> None:
+        self.records.append(record)
+        for stage in record["stages"]:
+            STAGE_PEAK_MEMORY.labels(record["route"], stage["stage"]).observe(stage["peak_bytes"])
+            STAGE_RSS_GROWTH.labels(record["route"], stage["stage"]).observe(max(0, stage["rss_delta_bytes"]))
+
+    def summary(self) -> List[Dict[str, object]]:
+        """Worst observed peak per route and stage, also per item where known."""
+        worst: Dict[tuple, Dict[str, object]] = {}
+        for record in list(self.records):
+            for stage in record["stages"]:
+                key = (record["route"], stage["stage"])
+                entry = worst.setdefault(key, {
+                    "route": key[0], "stage": key[1], "requests": 0,
+                    "max_peak_bytes": 0, "max_peak_bytes_per_item": 0.0
+                })
+                entry["requests"] += 1
+                entry["max_peak_bytes"] = max(entry["max_peak_bytes"], stage["peak_bytes"])
+                if record["items"]:
+                    per_item = stage["peak_bytes"] / record["items"]
+                    entry["max_peak_bytes_per_item"] = round(max(entry["max_peak_bytes_per_item"], per_item), 1)
+        return list(worst.values())
+
+
+memory_profile = MemoryProfile(settings.MEMORY_PROFILE_HISTORY)
+
+
+class MemoryProfilingMiddleware:
+    """ASGI middleware tracking memory by stage for batch routes."""
+
+    def __init__(self, app):
+        self.app = app
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in MEMORY_PROFILED_ROUTES:
+            await self.app(scope, receive, send)
+            return
+
+        tracker = MemoryTracker(scope["path"])
+        token = _current.set(tracker)
+        tracker.enter("request_parsing")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            memory_profile.add(tracker.finish())
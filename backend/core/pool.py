@@ -0,0 +1,122 @@
+"""
+Named process pools shared by the backend.
+
+Pools are created lazily with the ``spawn`` start method, so workers never
+inherit the server's threads or event loop, and report their queue depth to
+``/metrics``. Tasks submitted from a traced request add ``pool.wait`` (queued
+until a worker picked the task up) and ``pool.run`` spans to its trace.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+from backend.core.metrics import POOL_QUEUE_DEPTH
+from backend.core.tracing import Span, current_span
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    """Run ``fn`` in a worker, returning when it started and ended along with its result."""
+    start = time.time_ns()
+    result = fn(*args, **kwargs)
+    return start, time.time_ns(), result
+
+
+class WorkerPool:
+    """A process pool that tracks how many submitted tasks are still outstanding."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Tasks beyond the worker count are waiting in the executor's queue
+        POOL_QUEUE_DEPTH.labels(name).set_function(lambda: max(0, self.pending - self.max_workers))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submit ``fn(*args, **kwargs)`` to a worker process."""
+        parent = current_span()
+        if parent is not None:
+            return self._submit_traced(parent, fn, args, kwargs)
+        return self._submit(fn, *args, **kwargs)
+
+    def _submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+            self.pending += 1
+        future.add_done_callback(self._done)
+        return future
+
+    def _submit_traced(self, parent: Span, fn: Callable, args: tuple, kwargs: dict) -> Future:
+        # The worker reports its start and end times; callers get the plain result
+        submitted = time.time_ns()
+        timed = self._submit(_timed_call, fn, args, kwargs)
+        future = Future()
+
+        def finish(done: Future) -> None:
+            if done.cancelled():
+                future.cancel()
+                return
+            error = done.exception()
+            if error is not None:
+                future.set_exception(error)
+                return
+            start, end, result = done.result()
+            parent.record("pool.wait", submitted, max(submitted, start), pool=self.name)
+            parent.record("pool.run", start, end, pool=self.name, task=getattr(fn, "__name__", str(fn)))
+            future.set_result(result)
+
+        timed.add_done_callback(finish)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+_pools: Dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, max_workers: Optional[int] = None) -> WorkerPool:
+    """
+    Get (or create) the named pool.
+
+    Args:
+        name: Pool name, also used as the metrics label
+        max_workers: Worker processes; defaults to the CPU count
+
+    Returns:
+        The shared WorkerPool
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = WorkerPool(name, max_workers or os.cpu_count() or 1)
+            _pools[name] = pool
+        return pool
+
+
+def shutdown_pools(wait: bool = True) -> None:
+    """Shut down every pool, e.g. on application shutdown."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.shutdown(wait=wait)
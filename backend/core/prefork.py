@@ -0,0 +1,170 @@
+"""
+Pre-fork launcher for multi-worker deployments.
+
+Loads every analyzer in the master process, freezes the resulting objects so
+the garbage collector does not touch their pages, then forks workers that
+share that memory copy-on-write.
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+from backend.core.config import settings
+
+
+logger = logging.getLogger("nlpb.prefork")
+
+# Short inputs that force each analyzer to load its lazy resources
+# (TextBlob lexicon, regex caches, sklearn internals) before forking.
+WARMUP_TEXT = "Shocking study: this great product has 5 years experience with python."
+WARMUP_JOB = "Python developer with docker and aws experience."
+
+
+def preload() -> None:
+    """
+    Load and warm up all analyzers in the current process.
+
+    After warm-up the heap is collected and, if enabled, frozen with
+    ``gc.freeze()`` so forked workers do not dirty shared pages when the
+    cyclic garbage collector walks long-lived objects.
+    """
+    from backend.api import routes
+
+    for version in routes.sentiment_analyzers.versions.values():
+        version.analyzer.analyze_batch([WARMUP_TEXT])
+    routes.resume_screener.screen_resume(WARMUP_TEXT, WARMUP_JOB)
+    for version in routes.fake_news_detectors.versions.values():
+        version.analyzer.analyze(WARMUP_TEXT)
+
+    gc.collect()
+    if settings.FREEZE_SHARED_OBJECTS:
+        gc.freeze()
+
+
+def memory_usage() -> Dict[str, int]:
+    """
+    Report memory usage of the current process.
+
+    Values come from ``/proc/self/smaps_rollup`` and are in bytes. ``shared``
+    counts pages still shared with other processes (e.g. the pre-fork master),
+    ``private`` counts pages owned by this process alone.
+
+    Returns:
+        Dictionary with pid, rss, pss, shared and private byte counts
+    """
+    usage = {"pid": os.getpid(), "rss": 0, "pss": 0, "shared": 0, "private": 0}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        # Not Linux: fall back to peak RSS, which is all we can get portably
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["rss"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+        return usage
+
+    usage["rss"] = fields.get("Rss", 0)
+    usage["pss"] = fields.get("Pss", 0)
+    usage["shared"] = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    usage["private"] = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return usage
+
+
+def _log_memory(prefix: str) -> None:
+    usage = memory_usage()
+    logger.info(
+        "%s pid=%d rss=%.1fMB shared=%.1fMB private=%.1fMB",
+        prefix, usage["pid"], usage["rss"] / 2**20,
+        usage["shared"] / 2**20, usage["private"] / 2**20
+    )
+
+
+def _bind_socket() -> socket.socket:
+    family = socket.AF_INET6 if ":" in settings.HOST else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.HOST, settings.PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket) -> None:
+    import uvicorn
+
+    # Undo the master's handlers; uvicorn installs its own
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(app, log_level="info")
+    server = uvicorn.Server(config)
+    _log_memory("Worker started")
+    server.run(sockets=[sock])
+
+
+def _spawn(app, sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_worker(app, sock)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def serve(app) -> None:
+    """
+    Preload models, bind the listening socket and fork ``settings.WORKERS``
+    uvicorn workers that share it. Dead workers are replaced until the master
+    receives SIGINT or SIGTERM.
+
+    Args:
+        app: ASGI application to serve
+    """
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+
+    preload()
+    _log_memory("Master preloaded")
+
+    sock = _bind_socket()
+    logger.info("Listening on %s:%d with %d workers", settings.HOST, settings.PORT, settings.WORKERS)
+
+    workers: List[int] = [_spawn(app, sock) for _ in range(settings.WORKERS)]
+    stopping = False
+
+    def _shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid in workers:
+            workers.remove(pid)
+        if not stopping:
+            logger.warning("Worker %d exited with status %d, restarting", pid, status)
+            time.sleep(0.5)
+            workers.append(_spawn(app, sock))
+
+    sock.close()
@@ -0,0 +1,148 @@
+"""
+On-demand request profiling.
+
+When ``PROFILING_ENABLED`` is set, requests carrying the privileged profile
+header (or picked by ``PROFILE_SAMPLE_RATE``) run under ``cProfile`` while a
+background thread samples stacks. Each profiled request writes
+``<id>.pstats`` and ``<id>.collapsed`` (flamegraph.pl / speedscope input) to
+``PROFILE_DIR`` and returns the id in the ``X-Profile-Id`` response header.
+
+The middleware is only installed when profiling is enabled, so disabled mode
+adds no per-request work. ``cProfile`` sees the event loop thread only; the
+stack sampler also covers analyzer work running in thread pools.
+
+Both profilers record everything the process does while the request is in
+flight, including other requests interleaving at ``await`` points. A profile
+is only attributable to its request when nothing else ran: profile on an
+otherwise idle worker. Profiles that overlapped other requests are logged as
+such with the number of overlapping requests.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import uuid
+from collections import Counter
+
+from backend.core.config import settings
+
+
+logger = logging.getLogger("nlpb.profiling")
+
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Only frames from the application are interesting in collapsed stacks
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StackSampler(threading.Thread):
+    """Periodically sample the stacks of all threads running application code."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True, name="nlpb-stack-sampler")
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(_PACKAGE_ROOT):
+                        in_app = True
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if in_app:
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def write_collapsed(self, path: str) -> None:
+        """Write samples in Brendan Gregg's collapsed-stack format."""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling selected requests."""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILE_HEADER.lower().encode("latin-1")
+        self.token = settings.PROFILE_TOKEN.encode("latin-1")
+        # cProfile cannot run two profilers on one thread, so profile one
+        # request at a time and let concurrent ones through unprofiled.
+        self._lock = threading.Lock()
+        # Requests in flight, and requests that overlapped the running profile
+        self._active = 0
+        self._overlapped = 0
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+
+    def _requested(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == self.header:
+                    return hmac.compare_digest(value, self.token)
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self._active += 1
+        try:
+            if self._requested(scope) and self._lock.acquire(blocking=False):
+                await self._profile(scope, receive, send)
+            else:
+                if self._lock.locked():
+                    self._overlapped += 1
+                await self.app(scope, receive, send)
+        finally:
+            self._active -= 1
+
+    async def _profile(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex[:16]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self._overlapped = self._active - 1
+        profiler = cProfile.Profile()
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL)
+        sampler.start()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            sampler.stop()
+            overlapped = self._overlapped
+            self._lock.release()
+            self._write(profile_id, profiler, sampler)
+            if overlapped:
+                logger.warning(
+                    "Profile %s overlapped %d other requests and includes their work", profile_id, overlapped
+                )
+
+    @staticmethod
+    def _write(profile_id: str, profiler: cProfile.Profile, sampler: StackSampler) -> None:
+        base = os.path.join(settings.PROFILE_DIR, profile_id)
+        profiler.dump_stats(base + ".pstats")
+        sampler.write_collapsed(base + ".collapsed")
+
@@ -0,0 +1,365 @@
+"""
+Per-request tracing.
+
+When ``TRACING_ENABLED`` is set, sampled requests get a trace id and a tree of
+timed spans:
+
+- the request itself, with its method, path and status
+- ``request.validation``: reading the body and validating it with pydantic
+- ``endpoint``: the route function, and below it every analyzer ``stage()``
+  (``fakenews.clickbait``, ``resume.tfidf``, ``resume.skill_extraction``...)
+  and ``pool.wait`` / ``pool.run`` for tasks sent to a worker pool
+- ``response.encoding``: validating and rendering the returned value
+
+The three request phases are marked by ``backend.api.tracing.TracedRoute``.
+
+Requests are sampled with ``TRACE_SAMPLE_RATE``, or by an incoming W3C
+``traceparent`` header with the sampled flag, whose trace id is then kept.
+Sampled requests return their trace id in ``X-Trace-Id``. With
+``TRACE_SLOW_SECONDS`` set, every request is traced and the unsampled ones are
+exported too if they took at least that long.
+
+Batch requests repeat the same stage once per item, so only the first
+``TRACE_MAX_SPANS_PER_NAME`` spans of each name are kept; every span is still
+counted in the trace's per-name ``summary``.
+
+Finished traces are exported from a background thread, either as one JSON line
+per trace appended to ``TRACE_FILE`` or as OTLP/HTTP JSON posted to
+``TRACE_OTLP_ENDPOINT`` (an OpenTelemetry collector or any stand-in accepting
+that format). Traces arriving while ``TRACE_EXPORT_QUEUE`` traces wait are
+dropped.
+
+Like the profiling middleware, the tracing middleware is only installed when
+enabled; without a current trace, ``span()`` returns a no-op and ``stage()``
+records its metric only.
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import Counter
+from typing import Dict, List, Optional
+
+from backend.core.config import settings
+
+
+logger = logging.getLogger("nlpb.tracing")
+
+TRACE_ID_HEADER = b"x-trace-id"
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("nlpb_trace_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Trace:
+    """Spans recorded for one request."""
+
+    def __init__(self, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.trace_id = trace_id or _new_id(128)
+        self.parent_id = parent_id
+        self.spans: List[Dict] = []
+        self.summary: Dict[str, Dict] = {}
+        self._started = Counter()
+        self._lock = threading.Lock()
+
+    def keep(self, name: str) -> bool:
+        """Whether a new span called ``name`` is recorded in full."""
+        with self._lock:
+            self._started[name] += 1
+            return self._started[name] <= settings.TRACE_MAX_SPANS_PER_NAME
+
+    def add(self, span: "Span") -> None:
+        duration_ms = (span.end_ns - span.start_ns) / 1e6
+        with self._lock:
+            entry = self.summary.setdefault(span.name, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            if span.span_id is not None:
+                self.spans.append({
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "start_ns": span.start_ns,
+                    "duration_ms": round(duration_ms, 3),
+                    "attributes": span.attributes
+                })
+
+    def root(self, name: str, **attributes) -> "Span":
+        """The request's top-level span."""
+        return Span(self, name, self.parent_id, attributes, keep=True)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ns"])
+            summary = {
+                name: {"count": entry["count"], "total_ms": round(entry["total_ms"], 3)}
+                for name, entry in self.summary.items()
+            }
+        root = next((s for s in spans if s["parent_id"] == self.parent_id), None)
+        return {
+            "trace_id": self.trace_id,
+            "root_span_id": root["span_id"] if root else None,
+            "name": root["name"] if root else None,
+            "start_ns": root["start_ns"] if root else None,
+            "duration_ms": root["duration_ms"] if root else None,
+            "spans": spans,
+            "summary": summary,
+            "dropped_spans": sum(e["count"] for e in summary.values()) - len(spans)
+        }
+
+
+class Span:
+    """A timed operation within a trace; a context manager that makes itself current."""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "_token")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict, keep: bool):
+        self.trace = trace
+        self.name = name
+        # Spans beyond the per-name limit only count towards the summary
+        self.span_id = _new_id(64) if keep else None
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self._token = None
+
+    def child(self, name: str, **attributes) -> "Span":
+        return Span(self.trace, name, self.span_id, attributes, self.trace.keep(name))
+
+    def start(self) -> "Span":
+        self.start_ns = time.time_ns()
+        return self
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.attributes["error"] = type(error).__name__
+        self.trace.add(self)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes) -> None:
+        """Add a finished child span timed elsewhere (e.g. in another process)."""
+        child = self.child(name, **attributes)
+        child.start_ns = start_ns
+        child.end_ns = end_ns
+        self.trace.add(child)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.start()
+        if self.span_id is not None:
+            self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        self.finish(exc)
+        return False
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the current request, if it is traced."""
+    return _current.get()
+
+
+class _NoSpan:
+    """Stand-in returned by ``span()`` outside traced requests."""
+
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+def span(name: str, **attributes):
+    """
+    Child span of the current span.
+
+    Usage::
+
+        with span("resume.rerank", candidates=len(hits)):
+            ...
+
+    Returns:
+        A span to use as a context manager; ``NO_SPAN``, which records
+        nothing, when the request is not traced
+    """
+    parent = _current.get()
+    if parent is None:
+        return NO_SPAN
+    return parent.child(name, **attributes)
+
+
+# ==================== Export ====================
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(traces: List[Dict]) -> Dict:
+    """Traces in the OTLP/HTTP JSON ``ExportTraceServiceRequest`` shape."""
+    spans = []
+    for trace in traces:
+        for s in trace["spans"]:
+            attributes = dict(s["attributes"])
+            is_root = s["span_id"] == trace["root_span_id"]
+            if is_root:
+                # Per-name totals (including spans not kept) go on the root span
+                attributes.update({f"summary.{name}.count": e["count"] for name, e in trace["summary"].items()})
+                attributes.update({f"summary.{name}.total_ms": e["total_ms"] for name, e in trace["summary"].items()})
+            record = {
+                "traceId": trace["trace_id"],
+                "spanId": s["span_id"],
+                "name": s["name"],
+                "kind": 2 if is_root else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(s["start_ns"]),
+                "endTimeUnixNano": str(s["start_ns"] + int(s["duration_ms"] * 1e6)),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+                "status": {"code": 2 if "error" in attributes else 0}
+            }
+            if s["parent_id"]:
+                record["parentSpanId"] = s["parent_id"]
+            spans.append(record)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": "nlpb"}},
+            {"key": "process.pid", "value": {"intValue": str(os.getpid())}}
+        ]},
+        "scopeSpans": [{"scope": {"name": "backend.core.tracing"}, "spans": spans}]
+    }]}
+
+
+class TraceExporter:
+    """Background thread writing finished traces to ``TRACE_FILE`` or ``TRACE_OTLP_ENDPOINT``."""
+
+    # Traces sent per OTLP request
+    BATCH = 64
+
+    def __init__(self, exporter: str, max_queued: int):
+        if exporter not in ("jsonl", "otlp"):
+            raise ValueError(f"Unknown trace exporter '{exporter}', expected 'jsonl' or 'otlp'")
+        self.exporter = exporter
+        self.dropped = 0
+        self._queue: "queue.Queue[Dict]" = queue.Queue(max_queued)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="nlpb-trace-exporter")
+        self._thread.start()
+
+    def export(self, trace: Dict) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self.exporter == "otlp":
+                    self._post(batch)
+                else:
+                    self._append(batch)
+            except Exception:
+                logger.exception("Exporting %d trace(s) failed", len(batch))
+
+    @staticmethod
+    def _append(batch: List[Dict]) -> None:
+        os.makedirs(os.path.dirname(settings.TRACE_FILE) or ".", exist_ok=True)
+        data = "".join(json.dumps(trace, separators=(",", ":")) + "\n" for trace in batch).encode("utf-8")
+        # One O_APPEND write per batch, so workers sharing the file never interleave lines
+        fd = os.open(settings.TRACE_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _post(batch: List[Dict]) -> None:
+        request = urllib.request.Request(
+            settings.TRACE_OTLP_ENDPOINT,
+            data=json.dumps(otlp_payload(batch)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            response.read()
+
+
+class TracingMiddleware:
+    """ASGI middleware starting a trace for sampled requests and exporting it when done."""
+
+    def __init__(self, app):
+        self.app = app
+        self.exporter = TraceExporter(settings.TRACE_EXPORTER, settings.TRACE_EXPORT_QUEUE)
+
+    @staticmethod
+    def _traceparent(scope):
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                match = TRACEPARENT_PATTERN.match(value.decode("latin-1").strip().lower())
+                return match.groups() if match else None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = self._traceparent(scope)
+        if incoming is not None:
+            sampled = int(incoming[2], 16) & 1 == 1
+        else:
+            sampled = settings.TRACE_SAMPLE_RATE > 0 and random.random() < settings.TRACE_SAMPLE_RATE
+        if not sampled and settings.TRACE_SLOW_SECONDS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(*incoming[:2]) if incoming is not None else Trace()
+        root = trace.root(f"{scope['method']} {scope['path']}", method=scope["method"], path=scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set(status=message["status"])
+                if sampled:
+                    headers = list(message.get("headers", []))
+                    headers.append((TRACE_ID_HEADER, trace.trace_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with root:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            if sampled or (root.end_ns - root.start_ns) / 1e9 >= settings.TRACE_SLOW_SECONDS:
+                self.exporter.export(trace.to_dict())
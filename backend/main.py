@@ -1,20 +1,45 @@
 """
 Main FastAPI application for NLP Business Intelligence.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from backend.core.config import settings
-from backend.api.routes import router
-from backend.models.schemas import HealthResponse
+from backend.api.routes import job_manager, result_cache, router
+from backend.core.memory import MemoryProfilingMiddleware, memory_profile
+from backend.core.metrics import MetricsMiddleware, registry
+from backend.core.pool import shutdown_pools
+from backend.core.prefork import memory_usage
+from backend.models.schemas import HealthResponse, MemoryDebugResponse, MemoryUsageResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the result cache and start background jobs; flush cache writes, stop jobs and pools on shutdown."""
+    result_cache.warm_start(settings.RESULT_CACHE_WARM_START)
+    job_manager.start()
+    yield
+    job_manager.stop()
+    result_cache.flush()
+    shutdown_pools(wait=False)
 
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
-    description=settings.API_DESCRIPTION
+    description=settings.API_DESCRIPTION,
+    lifespan=lifespan
 )
 
+# Per-client rate limits and fair queuing for scoring requests (innermost, so
+# rejections still carry CORS headers and are counted by MetricsMiddleware)
+if settings.ADMISSION_ENABLED:
+    from backend.core.admission import AdmissionMiddleware
+    app.add_middleware(AdmissionMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +49,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route request metrics
+app.add_middleware(MetricsMiddleware)
+
+# Profile selected requests (not installed at all when disabled)
+if settings.PROFILING_ENABLED:
+    from backend.core.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
+# Per-stage memory accounting for batch routes
+if settings.MEMORY_PROFILING_ENABLED:
+    app.add_middleware(MemoryProfilingMiddleware)
+
+# Trace sampled requests (outermost, so the root span covers every other layer)
+if settings.TRACING_ENABLED:
+    from backend.core.tracing import TracingMiddleware
+    app.add_middleware(TracingMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
@@ -46,11 +88,41 @@ async def health():
     }
 
 
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "backend.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.RELOAD
+@app.get("/health/memory", response_model=MemoryUsageResponse, tags=["Health"])
+async def health_memory():
+    """RSS versus shared memory of the worker serving this request."""
+    return memory_usage()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Monitoring"])
+async def metrics():
+    """Prometheus text-format metrics for this worker."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
     )
+
+
+@app.get("/debug/memory", response_model=MemoryDebugResponse, tags=["Monitoring"])
+async def debug_memory():
+    """Per-stage memory use of recent batch requests on this worker."""
+    return {
+        "enabled": settings.MEMORY_PROFILING_ENABLED,
+        "summary": memory_profile.summary(),
+        "records": list(memory_profile.records)
+    }
+
+
+if __name__ == "__main__":
+    if settings.PREFORK:
+        from backend.core.prefork import serve
+        serve(app)
+    else:
+        import uvicorn
+        uvicorn.run(
+            "backend.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=settings.RELOAD,
+            workers=settings.WORKERS
+        )
@@ -1,8 +1,9 @@
 """
 Pydantic models for API requests and responses.
 """
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import List, Literal, Optional, Dict
 
 
 # Health Check Models
@@ -19,8 +20,9 @@ class SentimentRequest(BaseModel):
 
 
 class SentimentBatchRequest(BaseModel):
-    """Request model for batch sentiment analysis."""
-    texts: List[str] = Field(..., min_items=1, description="List of texts to analyze")
+    """Request model for batch sentiment analysis; give either texts or a dataset_id."""
+    texts: Optional[List[str]] = Field(default=None, min_items=1, description="List of texts to analyze")
+    dataset_id: Optional[str] = Field(default=None, description="Stored dataset to analyze instead of texts")
 
 
 class SentimentResponse(BaseModel):
@@ -30,6 +32,7 @@ class SentimentResponse(BaseModel):
     polarity: float
     subjectivity: float
     confidence: float
+    notes: Optional[List[str]] = None
 
 
 class SentimentStatistics(BaseModel):
@@ -46,6 +49,43 @@ class SentimentStatistics(BaseModel):
     average_confidence: float
 
 
+class SentimentIngestItem(BaseModel):
+    """Single timestamped review for rollup ingestion."""
+    text: str = Field(..., min_length=1, description="Review text")
+    timestamp: datetime = Field(..., description="When the review was posted (ISO 8601 or epoch seconds)")
+    id: Optional[str] = Field(default=None, description="Unique id; re-sent ids are not counted twice")
+    product: Optional[str] = Field(default=None, description="Product key (optional)")
+    channel: Optional[str] = Field(default=None, description="Channel key (optional)")
+
+
+class SentimentIngestRequest(BaseModel):
+    """Request model for ingesting timestamped reviews."""
+    items: List[SentimentIngestItem] = Field(..., min_items=1, description="Reviews to score and store")
+
+
+class SentimentIngestResponse(BaseModel):
+    """Result of a rollup ingestion."""
+    received: int
+    ingested: int
+    duplicates: int
+
+
+class SentimentTrendBucket(SentimentStatistics):
+    """Sentiment statistics of one time bucket."""
+    bucket_start: datetime
+
+
+class SentimentTrendResponse(BaseModel):
+    """Sentiment statistics over a time range, from pre-aggregated rollups."""
+    granularity: str
+    start: datetime
+    end: datetime
+    product: Optional[str] = None
+    channel: Optional[str] = None
+    summary: SentimentStatistics
+    buckets: List[SentimentTrendBucket]
+
+
 # Resume Screening Models
 class ResumeRequest(BaseModel):
     """Request model for single resume screening."""
@@ -60,8 +100,9 @@ class ResumeItem(BaseModel):
 
 
 class ResumeBatchRequest(BaseModel):
-    """Request model for batch resume screening."""
-    resumes: List[ResumeItem] = Field(..., min_items=1, description="List of resumes")
+    """Request model for batch resume screening; give either resumes or a dataset_id."""
+    resumes: Optional[List[ResumeItem]] = Field(default=None, min_items=1, description="List of resumes")
+    dataset_id: Optional[str] = Field(default=None, description="Stored dataset to rank instead of resumes")
     job_description: str = Field(..., min_length=1, description="Job description")
 
 
@@ -72,6 +113,13 @@ class ResumeResponse(BaseModel):
     skills_count: int
     experience_years: int
     recommendation: str
+    notes: Optional[List[str]] = None
+
+
+class TermContribution(BaseModel):
+    """Share of a match score contributed by one job description term."""
+    term: str
+    contribution: float
 
 
 class ResumeRankingResponse(BaseModel):
@@ -83,6 +131,53 @@ class ResumeRankingResponse(BaseModel):
     skills_count: int
     experience_years: int
     recommendation: str
+    notes: Optional[List[str]] = None
+    explanation: Optional[List[TermContribution]] = None
+
+
+class ResumeIndexRequest(BaseModel):
+    """Request model for adding resumes to the search index."""
+    resumes: List[ResumeItem] = Field(..., min_items=1, description="Resumes to index; ids already indexed are skipped")
+
+
+class ResumeIndexResponse(BaseModel):
+    """State of the resume search index."""
+    documents: int
+    generation: int
+    shards: int
+    indexed: Optional[int] = None
+    skipped: Optional[int] = None
+
+
+class ResumeSearchRequest(BaseModel):
+    """Request model for searching the resume index."""
+    job_description: str = Field(..., min_length=1, description="Job description")
+    offset: int = Field(default=0, ge=0, description="Matching resumes to skip")
+    limit: int = Field(default=10, ge=1, le=1000, description="Number of resumes to return")
+    min_score: Optional[float] = Field(default=None, ge=0, le=100, description="Minimum match score")
+    min_experience: Optional[int] = Field(default=None, ge=0, description="Minimum years of experience")
+    skills: Optional[List[str]] = Field(default=None, description="Skills every resume must have")
+    recommendations: Optional[List[Literal["highly_recommended", "recommended", "maybe", "reject"]]] = Field(
+        default=None, description="Recommendations to keep"
+    )
+    sort_by: Literal["match_score", "experience_years", "skills_count"] = Field(
+        default="match_score", description="Field to sort by, descending; ties by match score"
+    )
+    explain: int = Field(
+        default=0, ge=0, le=50, description="Top contributing terms to return per resume (0 for none)"
+    )
+
+
+class ResumeSearchResponse(BaseModel):
+    """A page of indexed resumes ranked against a job description."""
+    generation: int
+    documents: int
+    candidates: int
+    exhaustive: bool
+    total: int
+    offset: int
+    cached: bool
+    results: List[ResumeRankingResponse]
 
 
 # Fake News Detection Models
@@ -92,6 +187,12 @@ class FakeNewsRequest(BaseModel):
     source: Optional[str] = Field(default="", description="Source name (optional)")
 
 
+class FakeNewsBatchRequest(BaseModel):
+    """Request model for batch fake news detection; give either articles or a dataset_id."""
+    articles: Optional[List[FakeNewsRequest]] = Field(default=None, min_items=1, description="List of articles")
+    dataset_id: Optional[str] = Field(default=None, description="Stored dataset to analyze instead of articles")
+
+
 class FakeNewsResponse(BaseModel):
     """Response model for fake news detection."""
     text: str
@@ -105,6 +206,100 @@ class FakeNewsResponse(BaseModel):
     details: Dict
 
 
+# File Upload Models
+class FileUploadResponse(BaseModel):
+    """Response model for an uploaded input file."""
+    file_id: str
+    filename: str
+    size_bytes: int
+
+
+class DatasetResponse(BaseModel):
+    """A stored dataset that analysis endpoints can take by ``dataset_id``."""
+    dataset_id: str
+    filename: str
+    items: int
+    size_bytes: int
+    created_at: float
+
+
+# Analyzer Registry Models
+class AnalyzerRouting(BaseModel):
+    """How requests are routed between versions of an analyzer."""
+    weights: Dict[str, float]
+    shadow: Optional[str] = None
+    shadow_rate: float
+
+
+class AnalyzerRoutingRequest(BaseModel):
+    """Routing change; omitted fields keep their value."""
+    weights: Optional[Dict[str, float]] = Field(default=None, description="Share of requests per version")
+    shadow: Optional[str] = Field(default=None, description="Version to shadow-score with; empty string to stop")
+    shadow_rate: Optional[float] = Field(default=None, ge=0, le=1, description="Share of requests shadow-scored")
+
+
+class AnalyzerPromoteRequest(BaseModel):
+    """Version to serve all requests with."""
+    version: str = Field(..., min_length=1)
+
+
+class AnalyzerVersionReport(BaseModel):
+    """Routing weight, latency and shadow agreement of one analyzer version."""
+    version: str
+    cache_version: str
+    options: Dict
+    weight: float
+    primary: Dict
+    shadow: Dict
+    comparison: Dict
+
+
+class AnalyzerReport(BaseModel):
+    """Versions of one analyzer and how traffic is routed between them."""
+    kind: str
+    routing: AnalyzerRouting
+    versions: List[AnalyzerVersionReport]
+
+
+# Background Job Models
+class JobRequest(BaseModel):
+    """Request model for submitting a background batch job."""
+    kind: Literal["sentiment", "fakenews", "resume_rank"] = Field(..., description="Analysis to run")
+    texts: Optional[List[str]] = Field(default=None, description="Inline texts (sentiment)")
+    articles: Optional[List[FakeNewsRequest]] = Field(default=None, description="Inline articles (fakenews)")
+    resumes: Optional[List[ResumeItem]] = Field(default=None, description="Inline resumes (resume_rank)")
+    file_id: Optional[str] = Field(default=None, description="Uploaded CSV/JSONL/TXT file instead of inline items")
+    dataset_id: Optional[str] = Field(default=None, description="Stored dataset instead of inline items")
+    job_description: Optional[str] = Field(default=None, description="Job description (resume_rank)")
+    chunk_size: Optional[int] = Field(default=None, ge=1, le=100000, description="Items per checkpointed chunk")
+
+
+class JobResponse(BaseModel):
+    """Status and progress of a background job."""
+    job_id: str
+    kind: str
+    status: str
+    total_items: int
+    total_chunks: int
+    completed_chunks: int
+    progress: float
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+    expires_at: Optional[float] = None
+
+
+class JobResultsResponse(BaseModel):
+    """A page of (partial or final) job results."""
+    job_id: str
+    status: str
+    partial: bool
+    offset: int
+    available: int
+    total_items: int
+    results: List[Dict]
+
+
 # Generic Response Models
 class HealthResponse(BaseModel):
     """Health check response."""
@@ -112,6 +307,49 @@ class HealthResponse(BaseModel):
     message: str
 
 
+class MemoryUsageResponse(BaseModel):
+    """Memory usage of a single worker process, in bytes."""
+    pid: int
+    rss: int
+    pss: int
+    shared: int
+    private: int
+
+
+class MemoryStageRecord(BaseModel):
+    """Memory used by one stage of a profiled request."""
+    stage: str
+    peak_bytes: int
+    rss_delta_bytes: int
+    duration_seconds: float
+    top_allocations: Optional[List[Dict]] = None
+
+
+class MemoryRequestRecord(BaseModel):
+    """Per-stage memory record of a profiled batch request."""
+    route: str
+    timestamp: float
+    items: Optional[int] = None
+    peak_bytes: int
+    stages: List[MemoryStageRecord]
+
+
+class MemoryStageSummary(BaseModel):
+    """Worst observed memory use for a route and stage."""
+    route: str
+    stage: str
+    requests: int
+    max_peak_bytes: int
+    max_peak_bytes_per_item: float
+
+
+class MemoryDebugResponse(BaseModel):
+    """Recent batch-request memory profiles."""
+    enabled: bool
+    summary: List[MemoryStageSummary]
+    records: List[MemoryRequestRecord]
+
+
 class ErrorResponse(BaseModel):
     """Error response."""
     error: str
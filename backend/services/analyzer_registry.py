@@ -0,0 +1,377 @@
+"""
+Versioned analyzers with weighted routing and shadow evaluation.
+
+Each analyzer kind (``sentiment``, ``fakenews``) has a ``default`` version and
+the candidates configured in ``ANALYZER_VERSIONS`` (constructor options per
+version name, e.g. ``{"engine": "lexicon"}``). Candidate versions get their
+own cache version (``<VERSION>-<name>``), so their results never mix with
+the default's.
+
+Routing is stored per kind in ``ANALYZER_ROUTING_DIR/<kind>.json`` and
+re-read when the file changes, so every worker process follows a change made
+through any of them:
+
+- ``weights``: share of requests each version serves
+- ``shadow``: version that additionally scores a sample of requests
+- ``shadow_rate``: share of requests sampled for shadow scoring
+
+Shadow scoring runs in one background thread per worker on an uncached copy
+of the shadow version, for at most ``SHADOW_MAX_ITEMS`` items of a request.
+It may use ``SHADOW_CPU_BUDGET`` CPU seconds per second; samples arriving
+while that budget is spent, or while the previous sample is still running,
+are skipped. The shadow results are compared with what was served: share of
+matching labels and mean absolute score difference. Those figures, and the
+per-item latency of every version, are exported as metrics and by
+``report()``, and are per worker process like all metrics.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from backend.core.config import settings
+from backend.core.metrics import registry
+
+
+logger = logging.getLogger("nlpb.analyzers")
+
+DEFAULT_VERSION = "default"
+
+# (label field, score field) compared between served and shadow results
+COMPARE_FIELDS = {
+    "sentiment": ("sentiment", "polarity"),
+    "fakenews": ("is_fake_news", "fake_news_probability"),
+}
+
+ANALYZER_ITEMS = registry.counter(
+    "nlpb_analyzer_items_total", "Items scored per analyzer version and role (primary/shadow).",
+    ("kind", "version", "role")
+)
+ANALYZER_SECONDS = registry.counter(
+    "nlpb_analyzer_seconds_total", "Wall time spent scoring per analyzer version and role.",
+    ("kind", "version", "role")
+)
+SHADOW_SAMPLES = registry.counter(
+    "nlpb_shadow_samples_total", "Sampled requests per shadow outcome (scored/busy/budget/error).",
+    ("kind", "version", "outcome")
+)
+SHADOW_COMPARED = registry.counter(
+    "nlpb_shadow_compared_items_total", "Items scored by both the served and the shadow version.",
+    ("kind", "version")
+)
+SHADOW_AGREEMENTS = registry.counter(
+    "nlpb_shadow_label_agreements_total", "Compared items whose shadow label matched the served one.",
+    ("kind", "version")
+)
+SHADOW_SCORE_DIFF = registry.counter(
+    "nlpb_shadow_score_abs_diff_total", "Sum of absolute score differences over compared items.",
+    ("kind", "version")
+)
+
+
+class ShadowRunner:
+    """Single background thread running shadow work within a CPU-time budget."""
+
+    def __init__(self, cpu_budget: float):
+        self.cpu_budget = cpu_budget
+        self.tokens = cpu_budget
+        self.updated = time.monotonic()
+        self.busy = False
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, work: Callable[[], None]) -> Optional[str]:
+        """
+        Start ``work`` in the background.
+
+        Returns:
+            None if started, else why it was skipped ('busy' or 'budget')
+        """
+        with self._lock:
+            now = time.monotonic()
+            # At most one second of budget is banked
+            self.tokens = min(self.cpu_budget, self.tokens + (now - self.updated) * self.cpu_budget)
+            self.updated = now
+            if self.busy:
+                return "busy"
+            if self.tokens <= 0:
+                return "budget"
+            self.busy = True
+            if self._executor is None:
+                # Created lazily so pre-fork masters do not hand a dead thread to workers
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._executor.submit(self._run, work)
+        return None
+
+    def _run(self, work: Callable[[], None]) -> None:
+        start = time.thread_time()
+        try:
+            work()
+        finally:
+            with self._lock:
+                self.tokens -= time.thread_time() - start
+                self.busy = False
+
+
+_shadow_runner: Optional[ShadowRunner] = None
+
+
+def shadow_runner() -> ShadowRunner:
+    global _shadow_runner
+    if _shadow_runner is None:
+        _shadow_runner = ShadowRunner(settings.SHADOW_CPU_BUDGET)
+    return _shadow_runner
+
+
+class AnalyzerVersion:
+    """One configured version of an analyzer."""
+
+    def __init__(self, kind: str, name: str, factory: Callable, options: Dict, cache=None):
+        self.kind = kind
+        self.name = name
+        self.factory = factory
+        self.options = options
+        self.analyzer = self._create(cache)
+        self._uncached = None
+
+    def _create(self, cache):
+        analyzer = self.factory(cache=cache, **self.options)
+        if self.name != DEFAULT_VERSION:
+            analyzer.VERSION = f"{analyzer.VERSION}-{self.name}"
+        return analyzer
+
+    @property
+    def version(self) -> str:
+        """Cache version of this analyzer version's results."""
+        return self.analyzer.VERSION
+
+    def uncached(self):
+        """Copy without a result cache, so shadow timings measure scoring."""
+        if self._uncached is None:
+            self._uncached = self._create(None)
+        return self._uncached
+
+
+class AnalyzerRegistry:
+    """Versions of one analyzer kind and the routing between them."""
+
+    def __init__(self, kind: str, factory: Callable, cache=None, routing_dir: Optional[str] = None):
+        """
+        Args:
+            kind: Analyzer kind, a key of ``COMPARE_FIELDS``
+            factory: Analyzer class; called with ``cache`` and a version's options
+            cache: Result cache for the served versions
+            routing_dir: Directory of the shared routing files (default ``ANALYZER_ROUTING_DIR``)
+        """
+        self.kind = kind
+        variants = {DEFAULT_VERSION: {}, **settings.ANALYZER_VERSIONS.get(kind, {})}
+        self.versions = {
+            name: AnalyzerVersion(kind, name, factory, options, cache) for name, options in variants.items()
+        }
+        self.path = os.path.join(routing_dir or settings.ANALYZER_ROUTING_DIR, f"{kind}.json")
+        self._routing = self._default_routing()
+        self._routing_stamp = None
+        self._lock = threading.Lock()
+
+    @property
+    def default(self) -> AnalyzerVersion:
+        return self.versions[DEFAULT_VERSION]
+
+    def _default_routing(self) -> Dict:
+        return {"weights": {DEFAULT_VERSION: 1.0}, "shadow": None, "shadow_rate": settings.SHADOW_SAMPLE_RATE}
+
+    def routing(self) -> Dict:
+        """Current routing, re-read when another worker changed it."""
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp != self._routing_stamp:
+            routing = self._default_routing()
+            if stamp is not None:
+                try:
+                    with open(self.path) as f:
+                        routing.update(json.load(f))
+                except (OSError, ValueError):
+                    # Half-written by a concurrent writer: keep the previous routing
+                    return self._routing
+            # Versions removed from the configuration since the file was written are ignored
+            routing["weights"] = {v: w for v, w in routing["weights"].items() if v in self.versions and w > 0}
+            if not routing["weights"]:
+                routing["weights"] = {DEFAULT_VERSION: 1.0}
+            if routing["shadow"] not in self.versions:
+                routing["shadow"] = None
+            self._routing, self._routing_stamp = routing, stamp
+        return self._routing
+
+    def set_routing(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        shadow: Optional[str] = ...,
+        shadow_rate: Optional[float] = None
+    ) -> Dict:
+        """
+        Change the routing for every worker.
+
+        Args:
+            weights: Share of requests per version (relative; need not sum to 1)
+            shadow: Version to shadow-score with, or None to stop (unchanged if omitted)
+            shadow_rate: Share of requests sampled for shadow scoring
+
+        Raises:
+            ValueError: If a version is unknown or the weights are all zero
+        """
+        with self._lock:
+            routing = dict(self.routing())
+            if weights is not None:
+                unknown = [v for v in weights if v not in self.versions]
+                if unknown:
+                    raise ValueError(f"Unknown {self.kind} versions: {', '.join(unknown)}")
+                if any(w < 0 for w in weights.values()) or not any(w > 0 for w in weights.values()):
+                    raise ValueError("Weights must be non-negative and not all zero")
+                routing["weights"] = {v: float(w) for v, w in weights.items() if w > 0}
+            if shadow is not ...:
+                if shadow is not None and shadow not in self.versions:
+                    raise ValueError(f"Unknown {self.kind} version: {shadow}")
+                routing["shadow"] = shadow
+            if shadow_rate is not None:
+                routing["shadow_rate"] = shadow_rate
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(routing, f)
+            os.replace(tmp, self.path)
+            return self.routing()
+
+    def promote(self, name: str) -> Dict:
+        """Serve every request with ``name``; stops shadowing it."""
+        shadow = self.routing()["shadow"]
+        return self.set_routing(weights={name: 1.0}, shadow=None if shadow == name else shadow)
+
+    def stable(self) -> AnalyzerVersion:
+        """
+        The version trusted with results that are kept, such as rollups.
+
+        That is the only version with traffic once one was promoted, else the
+        default version while it still serves, else the most weighted one.
+        Candidates on a partial split are only compared by shadow scoring.
+        """
+        weights = self.routing()["weights"]
+        if len(weights) > 1 and DEFAULT_VERSION in weights:
+            return self.default
+        return self.versions[max(weights, key=weights.get)]
+
+    def choose(self) -> AnalyzerVersion:
+        """Pick the version serving a request, by weight."""
+        weights = self.routing()["weights"]
+        if len(weights) == 1:
+            return self.versions[next(iter(weights))]
+        names = list(weights)
+        return self.versions[random.choices(names, weights=[weights[n] for n in names])[0]]
+
+    def tracked(self, version: AnalyzerVersion, method: str, inputs: int = 1, batch: bool = True) -> Callable:
+        """
+        Wrap a scoring method of ``version`` to record its latency and sample it for shadow scoring.
+
+        Args:
+            version: Serving version
+            method: Method name, e.g. ``analyze_batch``
+            inputs: Leading positional arguments that are scoring inputs (the
+                rest, such as a stats dictionary, are not passed to the shadow)
+            batch: Whether the first input is a list of items and the method
+                returns one result per item, in order
+        """
+        fn = getattr(version.analyzer, method)
+
+        def run(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            items = len(result) if batch else 1
+            ANALYZER_ITEMS.labels(self.kind, version.name, "primary").inc(items)
+            ANALYZER_SECONDS.labels(self.kind, version.name, "primary").inc(time.perf_counter() - start)
+            if items:
+                self._maybe_shadow(version, method, args[:inputs], batch, result)
+            return result
+
+        return run
+
+    def _maybe_shadow(self, served: AnalyzerVersion, method: str, args: Sequence, batch: bool, result) -> None:
+        routing = self.routing()
+        shadow_name = routing["shadow"]
+        if shadow_name is None or shadow_name == served.name or random.random() >= routing["shadow_rate"]:
+            return
+        shadow = self.versions[shadow_name]
+        if batch:
+            # Results may be cut short by a deadline; compare only the scored prefix
+            count = min(len(result), settings.SHADOW_MAX_ITEMS)
+            args = (args[0][:count], *args[1:])
+            served_results = result[:count]
+        else:
+            served_results = [result]
+
+        def work():
+            try:
+                start = time.perf_counter()
+                shadow_result = getattr(shadow.uncached(), method)(*args)
+                elapsed = time.perf_counter() - start
+                shadow_results = shadow_result if batch else [shadow_result]
+                ANALYZER_ITEMS.labels(self.kind, shadow_name, "shadow").inc(len(shadow_results))
+                ANALYZER_SECONDS.labels(self.kind, shadow_name, "shadow").inc(elapsed)
+                self._compare(shadow_name, served_results, shadow_results)
+                SHADOW_SAMPLES.labels(self.kind, shadow_name, "scored").inc()
+            except Exception:
+                logger.exception("Shadow scoring with %s version %s failed", self.kind, shadow_name)
+                SHADOW_SAMPLES.labels(self.kind, shadow_name, "error").inc()
+
+        skipped = shadow_runner().submit(work)
+        if skipped:
+            SHADOW_SAMPLES.labels(self.kind, shadow_name, skipped).inc()
+
+    def _compare(self, shadow_name: str, served: List[Dict], shadow: List[Dict]) -> None:
+        label, score = COMPARE_FIELDS[self.kind]
+        agreements = sum(1 for a, b in zip(served, shadow) if a[label] == b[label])
+        diff = sum(abs(float(a[score]) - float(b[score])) for a, b in zip(served, shadow))
+        SHADOW_COMPARED.labels(self.kind, shadow_name).inc(min(len(served), len(shadow)))
+        SHADOW_AGREEMENTS.labels(self.kind, shadow_name).inc(agreements)
+        SHADOW_SCORE_DIFF.labels(self.kind, shadow_name).inc(diff)
+
+    def report(self) -> Dict:
+        """Routing and per-version latency and agreement figures of this worker."""
+        routing = self.routing()
+
+        def latency(name: str, role: str) -> Dict:
+            items = ANALYZER_ITEMS.labels(self.kind, name, role).value
+            seconds = ANALYZER_SECONDS.labels(self.kind, name, role).value
+            return {"items": int(items), "ms_per_item": round(seconds / items * 1000, 3) if items else None}
+
+        versions = []
+        for name, version in self.versions.items():
+            compared = SHADOW_COMPARED.labels(self.kind, name).value
+            versions.append({
+                "version": name,
+                "cache_version": version.version,
+                "options": version.options,
+                "weight": routing["weights"].get(name, 0.0),
+                "primary": latency(name, "primary"),
+                "shadow": latency(name, "shadow"),
+                "comparison": {
+                    "samples": {
+                        outcome: int(SHADOW_SAMPLES.labels(self.kind, name, outcome).value)
+                        for outcome in ("scored", "busy", "budget", "error")
+                    },
+                    "compared_items": int(compared),
+                    "label_agreement": (
+                        round(SHADOW_AGREEMENTS.labels(self.kind, name).value / compared, 4) if compared else None
+                    ),
+                    "mean_score_diff": (
+                        round(SHADOW_SCORE_DIFF.labels(self.kind, name).value / compared, 4) if compared else None
+                    ),
+                }
+            })
+        return {"kind": self.kind, "routing": routing, "versions": versions}
@@ -0,0 +1,153 @@
+"""
+Chunk-level processing shared by background jobs and bulk runs.
+
+Records are plain dictionaries so chunks can be pickled to worker processes
+and stored as JSON:
+
+- ``sentiment``: ``{"text", "id"?}``
+- ``fakenews``: ``{"text", "source"?, "id"?}``
+- ``resume_rank``: ``{"id", "text"}`` plus ``job_description`` in the options
+"""
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+
+KINDS = ("sentiment", "fakenews", "resume_rank")
+FILE_FORMATS = (".csv", ".jsonl", ".ndjson", ".txt")
+
+# One analyzer instance per kind and constructor options in each worker process, created on first use
+_analyzers: Dict[Tuple, object] = {}
+
+
+def get_analyzer(kind: str, config: Optional[Dict] = None):
+    """
+    Get this process's analyzer for ``kind``, creating it on first use.
+
+    Args:
+        kind: Analyzer kind
+        config: Constructor options, e.g. ``{"engine": "lexicon"}`` for sentiment
+    """
+    config = config or {}
+    key = (kind, tuple(sorted(config.items())))
+    analyzer = _analyzers.get(key)
+    if analyzer is None:
+        if kind == "sentiment":
+            from backend.services.sentiment_service import SentimentAnalyzer
+            analyzer = SentimentAnalyzer(**config)
+        elif kind == "fakenews":
+            from backend.services.fake_news_service import FakeNewsDetector
+            analyzer = FakeNewsDetector(**config)
+        elif kind == "resume_rank":
+            from backend.services.resume_service import ResumeScreener
+            analyzer = ResumeScreener(**config)
+        else:
+            raise ValueError(f"Unknown kind '{kind}', expected one of {KINDS}")
+        _analyzers[key] = analyzer
+    return analyzer
+
+
+def process_chunk(kind: str, records: List[Dict[str, str]], options: Optional[Dict] = None) -> List[Dict]:
+    """
+    Score one chunk of records.
+
+    Args:
+        kind: One of ``KINDS``
+        records: Records in the shape described in the module docstring
+        options: ``job_description`` for ``resume_rank``
+
+    Returns:
+        One result dictionary per record, in input order
+    """
+    options = options or {}
+    analyzer = get_analyzer(kind)
+
+    if kind == "sentiment":
+        results = analyzer.analyze_batch([r["text"] for r in records])
+    elif kind == "fakenews":
+        results = analyzer.analyze_batch(records)
+    else:
+        return analyzer.screen_batch(records, options["job_description"])
+
+    return [
+        {"id": r["id"], **result} if "id" in r else result
+        for r, result in zip(records, results)
+    ]
+
+
+def rank_results(results: List[Dict]) -> List[Dict]:
+    """Sort resume screening results by match score and assign ranks."""
+    results = sorted(results, key=lambda x: x["match_score"], reverse=True)
+    for idx, result in enumerate(results, 1):
+        result["rank"] = idx
+    return results
+
+
+def _normalize(kind: str, row: Dict, position: int) -> Dict[str, str]:
+    text = row.get("text")
+    if text is None:
+        raise ValueError(f"Record {position} has no 'text' field")
+    record = {"text": str(text)}
+    if row.get("id") not in (None, ""):
+        record["id"] = str(row["id"])
+    elif kind == "resume_rank":
+        record["id"] = f"row-{position}"
+    if kind == "fakenews":
+        record["source"] = str(row.get("source") or "")
+    return record
+
+
+def iter_file_chunks(path: str, kind: str, chunk_size: int, skip_chunks: int = 0) -> Iterator[List[Dict[str, str]]]:
+    """
+    Stream a CSV, JSONL/NDJSON or plain-text file as chunks of records.
+
+    CSV and JSONL inputs need a ``text`` column/field and may carry ``id`` and
+    (for fake news) ``source``; plain-text files hold one text per line.
+
+    Args:
+        path: Input file
+        kind: One of ``KINDS``
+        chunk_size: Records per chunk
+        skip_chunks: Leading chunks to skip without normalizing (for resuming)
+
+    Yields:
+        Lists of normalized records
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file format '{ext}', expected one of {FILE_FORMATS}")
+
+    position = 0
+    chunk_index = 0
+
+    if ext == ".csv":
+        reader = pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+        for frame in reader:
+            if chunk_index >= skip_chunks:
+                rows = frame.to_dict("records")
+                yield [_normalize(kind, row, position + i) for i, row in enumerate(rows)]
+            position += len(frame)
+            chunk_index += 1
+        return
+
+    chunk: List[Dict[str, str]] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if chunk_index >= skip_chunks:
+                row = {"text": line} if ext == ".txt" else json.loads(line)
+                chunk.append(_normalize(kind, row, position))
+            else:
+                chunk.append(None)
+            position += 1
+            if len(chunk) == chunk_size:
+                if chunk_index >= skip_chunks:
+                    yield chunk
+                chunk = []
+                chunk_index += 1
+    if chunk and chunk_index >= skip_chunks:
+        yield chunk
@@ -0,0 +1,236 @@
+"""
+Dataset registry: corpora uploaded once and analyzed many times by reference.
+
+An uploaded CSV, JSONL/NDJSON or TXT file is converted into a directory under
+``UPLOAD_DIR/datasets/<dataset_id>/``:
+
+    meta.json                 id, original filename, item count, creation time
+    <column>.bin              UTF-8 values of a column, concatenated
+    <column>_offsets.npy      int64 byte offset of every value, plus the end
+
+for the columns ``text``, ``id`` (``row-<n>`` where the file had none) and
+``source`` (empty where the file had none). Columns are memory-mapped and
+values are decoded on access, so a request touches only the rows it reads.
+
+Datasets are immutable. Complete results of an analysis are stored next to
+them under ``results/``, keyed by analyzer name, analyzer version and any
+options (e.g. the job description), so repeating an analysis on the same
+dataset reads the stored results instead of scoring again. At most
+``DATASET_MAX_CACHED_RESULTS`` result sets are kept per dataset.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from backend.core.cache import cache_key
+from backend.core.config import settings
+from backend.services.batch_tasks import iter_file_chunks
+
+
+COLUMNS = ("text", "id", "source")
+META_FILE = "meta.json"
+RESULTS_DIR = "results"
+
+# Records read from the source file per conversion step
+_CONVERT_CHUNK = 10000
+
+
+class Column(Sequence):
+    """Lazily decoded string column backed by a memory-mapped blob."""
+
+    def __init__(self, path: str):
+        self.offsets = np.load(path + "_offsets.npy", mmap_mode="r")
+        # A zero-byte file cannot be memory-mapped
+        self.blob = np.memmap(path + ".bin", dtype=np.uint8, mode="r") if self.offsets[-1] else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            offsets = self.offsets[start:stop + 1].tolist()
+            data = bytes(self.blob[offsets[0]:offsets[-1]])
+            base = offsets[0]
+            return [data[a - base:b - base].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column index out of range")
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+
+class Records(Sequence):
+    """Rows of selected columns as dictionaries, decoded on access."""
+
+    def __init__(self, columns: Dict[str, Column]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            values = {name: column[index] for name, column in self.columns.items()}
+            return [dict(zip(values, row)) for row in zip(*values.values())]
+        return {name: column[index] for name, column in self.columns.items()}
+
+
+class Dataset:
+    """One stored dataset."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.columns = {name: Column(os.path.join(directory, name)) for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return self.meta["items"]
+
+    def texts(self) -> Column:
+        return self.columns["text"]
+
+    def records(self, *names: str) -> Records:
+        """Rows holding the named columns (default: all)."""
+        return Records({name: self.columns[name] for name in names or COLUMNS})
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self.directory, RESULTS_DIR, key + ".json")
+
+    def load_results(self, key: str) -> Optional[Dict]:
+        """Stored results for ``key``, or None."""
+        try:
+            with open(self._result_path(key), encoding="utf-8") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(self._result_path(key))
+        return json.loads(data)
+
+    def save_results(self, key: str, value: Dict) -> None:
+        """Store results for ``key``, evicting the least recently used result sets past the limit."""
+        path = self._result_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+        results_dir = os.path.dirname(path)
+        stored = [os.path.join(results_dir, name) for name in os.listdir(results_dir) if name.endswith(".json")]
+        stored.sort(key=os.path.getmtime)
+        for old in stored[:max(0, len(stored) - settings.DATASET_MAX_CACHED_RESULTS)]:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+
+
+def result_key(analyzer: str, version: str, *parts: str) -> str:
+    """Key of one analysis of a dataset: analyzer name, version and a hash of its options."""
+    if not parts:
+        return f"{analyzer}-{version}"
+    return f"{analyzer}-{version}-{cache_key(analyzer, version, *parts)[:16]}"
+
+
+class DatasetStore:
+    """Datasets under one directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, dataset_id: str) -> Optional[str]:
+        if not dataset_id.isalnum():
+            return None
+        path = os.path.join(self.directory, dataset_id)
+        return path if os.path.exists(os.path.join(path, META_FILE)) else None
+
+    def get(self, dataset_id: str) -> Optional[Dataset]:
+        path = self._path(dataset_id)
+        return Dataset(path) if path else None
+
+    def list(self) -> List[Dict]:
+        """Metadata of every dataset, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        datasets = [self.get(name) for name in os.listdir(self.directory)]
+        return sorted((d.meta for d in datasets if d), key=lambda meta: meta["created_at"], reverse=True)
+
+    def delete(self, dataset_id: str) -> bool:
+        path = self._path(dataset_id)
+        if path is None:
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    def create(self, source_path: str, filename: str) -> Dict:
+        """
+        Convert an uploaded CSV, JSONL/NDJSON or TXT file into a dataset.
+
+        Args:
+            source_path: Uploaded file; records need a ``text`` field and may
+                carry ``id`` and ``source``
+            filename: Original file name, kept in the metadata
+
+        Returns:
+            Metadata of the new dataset
+
+        Raises:
+            ValueError: If the file format is unsupported, a record has no
+                text, or the file holds no records
+        """
+        dataset_id = uuid.uuid4().hex
+        path = os.path.join(self.directory, dataset_id)
+        tmp_path = path + ".tmp"
+        os.makedirs(tmp_path)
+        try:
+            items = _write_columns(tmp_path, iter_file_chunks(source_path, "fakenews", _CONVERT_CHUNK))
+            if not items:
+                raise ValueError("The file holds no records")
+            size = sum(os.path.getsize(os.path.join(tmp_path, name)) for name in os.listdir(tmp_path))
+            meta = {
+                "dataset_id": dataset_id,
+                "filename": filename,
+                "items": items,
+                "size_bytes": size,
+                "created_at": time.time()
+            }
+            with open(os.path.join(tmp_path, META_FILE), "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        return meta
+
+
+def _write_columns(directory: str, chunks: Iterator[List[Dict[str, str]]]) -> int:
+    """Append every record's columns to their blobs; returns the record count."""
+    files = {name: open(os.path.join(directory, name + ".bin"), "wb") for name in COLUMNS}
+    offsets = {name: [0] for name in COLUMNS}
+    position = 0
+    try:
+        for chunk in chunks:
+            for record in chunk:
+                record.setdefault("id", f"row-{position}")
+                for name in COLUMNS:
+                    value = record.get(name, "").encode("utf-8", "surrogatepass")
+                    files[name].write(value)
+                    offsets[name].append(offsets[name][-1] + len(value))
+                position += 1
+    finally:
+        for f in files.values():
+            f.close()
+    for name in COLUMNS:
+        np.save(os.path.join(directory, name + "_offsets.npy"), np.array(offsets[name], dtype=np.int64))
+    return position
@@ -0,0 +1,56 @@
+"""
+Intra-batch deduplication for the batch scoring paths.
+
+Inputs are grouped by a normalized key (whitespace collapsed and stripped),
+each group is scored once using its first occurrence, and the results are
+fanned back out to every original position.
+"""
+import re
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace and strip the ends."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def dedupe(keys: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    """
+    Group equal keys.
+
+    Args:
+        keys: One normalized key per input
+
+    Returns:
+        Tuple of (index of the first occurrence of each unique key,
+        position of each input's key within that list)
+    """
+    first: Dict[Hashable, int] = {}
+    unique: List[int] = []
+    positions: List[int] = []
+    for i, key in enumerate(keys):
+        slot = first.get(key)
+        if slot is None:
+            slot = first[key] = len(unique)
+            unique.append(i)
+        positions.append(slot)
+    return unique, positions
+
+
+def record_stats(stats: Optional[Dict], total: int, unique: int) -> None:
+    """Fill a caller-supplied stats dictionary with batch dedup figures."""
+    if stats is not None:
+        stats["items"] = total
+        stats["unique_items"] = unique
+        stats["dedup_ratio"] = round(1 - unique / total, 4) if total else 0.0
+
+
+def completed(unique: List[int], scored: int, total: int) -> int:
+    """
+    Number of leading inputs whose results are available when only the first
+    ``scored`` unique keys were scored (e.g. after a batch was cancelled).
+    """
+    return unique[scored] if scored < len(unique) else total
@@ -2,15 +2,33 @@
 Fake News and Hate Speech Detection Service.
 """
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 from textblob import TextBlob
 
+from backend.core.cache import ResultCache, cache_key
+from backend.core.cancellation import CancelToken, take_until_stopped
+from backend.core.metrics import stage
+from backend.services import long_document
+from backend.services.dedup import completed, dedupe, normalize_text, record_stats
+
 
 class FakeNewsDetector:
     """Fake news and hate speech detection system."""
     
-    def __init__(self):
-        """Initialize the detector."""
+    # Bump when scoring changes so cached results are not reused
+    VERSION = "1"
+    
+    def __init__(self, cache: Optional[ResultCache] = None, fake_threshold: float = 60.0):
+        """
+        Initialize the detector.
+        
+        Args:
+            cache: Optional result cache consulted before scoring
+            fake_threshold: Fake news probability above which an article is flagged
+        """
+        self.cache = cache
+        self.fake_threshold = fake_threshold
+        
         # Suspicious indicators for fake news
         self.clickbait_words = [
             'shocking', 'unbelievable', 'you won\'t believe',
@@ -48,6 +66,9 @@ class FakeNewsDetector:
         question_count = text.count('?')
         caps_ratio = sum(1 for c in text if c.isupper()) / (len(text) + 1)
         
+        return self._clickbait_result(found_words, exclamation_count, caps_ratio)
+    
+    def _clickbait_result(self, found_words: List[str], exclamation_count: int, caps_ratio: float) -> Dict[str, any]:
         clickbait_score = (
             len(found_words) * 15 +
             min(exclamation_count * 10, 30) +
@@ -83,6 +104,9 @@ class FakeNewsDetector:
         blob = TextBlob(text)
         polarity = blob.sentiment.polarity
         
+        return self._hate_result(offensive_count, polarity)
+    
+    def _hate_result(self, offensive_count: int, polarity: float) -> Dict[str, any]:
         hate_score = (
             offensive_count * 40 +
             (max(0, -polarity) * 30)
@@ -116,12 +140,17 @@ class FakeNewsDetector:
         has_citations = bool(re.search(r'\[\d+\]|\(\d{4}\)', text))
         has_quotes = text.count('"') >= 2
         
+        return self._credibility_result(credible_mentions, has_citations, has_quotes, len(text))
+    
+    def _credibility_result(
+        self, credible_mentions: int, has_citations: bool, has_quotes: bool, length: int
+    ) -> Dict[str, any]:
         # Calculate credibility score
         credibility_score = (
             credible_mentions * 25 +
             (30 if has_citations else 0) +
             (15 if has_quotes else 0) +
-            min(len(text) / 50, 30)  # Longer, detailed articles are more credible
+            min(length / 50, 30)  # Longer, detailed articles are more credible
         )
         
         return {
@@ -146,16 +175,33 @@ class FakeNewsDetector:
         if not text or not text.strip():
             return {
                 "text": text,
+                "source": source,
                 "is_fake_news": False,
                 "fake_news_probability": 0.0,
+                "credibility_score": 0.0,
+                "clickbait_score": 0.0,
+                "hate_score": 0.0,
                 "warnings": [],
-                "credibility_score": 0.0
+                "details": {}
             }
         
+        if self.cache is not None:
+            key = cache_key("fakenews", self.VERSION, text, source, *long_document.cache_parts(text))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
         # Run all detections
-        clickbait_result = self.detect_clickbait(text)
-        hate_result = self.detect_hate_speech(text)
-        credibility_result = self.check_credibility(text, source)
+        note = None
+        if long_document.is_long(text):
+            clickbait_result, hate_result, credibility_result, note = self._analyze_long(text, source)
+        else:
+            with stage("fakenews.clickbait"):
+                clickbait_result = self.detect_clickbait(text)
+            with stage("fakenews.hate_speech"):
+                hate_result = self.detect_hate_speech(text)
+            with stage("fakenews.credibility"):
+                credibility_result = self.check_credibility(text, source)
         
         # Compile warnings
         warnings = []
@@ -165,6 +211,8 @@ class FakeNewsDetector:
             warnings.append("Contains potential hate speech")
         if not credibility_result['credible']:
             warnings.append("Low credibility score")
+        if note:
+            warnings.append(note)
         
         # Calculate overall fake news probability
         fake_news_prob = (
@@ -173,10 +221,10 @@ class FakeNewsDetector:
             (100 - credibility_result['credibility_score']) * 0.5
         )
         
-        return {
-            "text": text[:200] + "..." if len(text) > 200 else text,
+        result = {
+            "text": self._echo_text(text),
             "source": source,
-            "is_fake_news": fake_news_prob > 60,
+            "is_fake_news": fake_news_prob > self.fake_threshold,
             "fake_news_probability": round(fake_news_prob, 2),
             "credibility_score": credibility_result['credibility_score'],
             "clickbait_score": clickbait_result['clickbait_score'],
@@ -188,3 +236,94 @@ class FakeNewsDetector:
                 "credibility": credibility_result
             }
         }
+        if self.cache is not None:
+            self.cache.set(key, result)
+        return result
+    
+    def window_features(self, text: str) -> Dict[str, any]:
+        """
+        Additive detection features of one long-document window.
+        
+        Args:
+            text: Window text
+            
+        Returns:
+            Dictionary of counts and matches that ``_analyze_long`` combines
+        """
+        text_lower = text.lower()
+        return {
+            "length": len(text),
+            "clickbait_words": [word for word in self.clickbait_words if word in text_lower],
+            "exclamation_count": text.count('!'),
+            "upper_count": sum(1 for c in text if c.isupper()),
+            "offensive_count": sum(len(re.findall(pattern, text_lower)) for pattern in self.offensive_patterns),
+            "polarity": TextBlob(text).sentiment.polarity,
+            "credible_sources": [s for s in self.credible_sources if s in text_lower],
+            "has_citations": bool(re.search(r'\[\d+\]|\(\d{4}\)', text)),
+            "quote_count": text.count('"')
+        }
+    
+    def _analyze_long(self, text: str, source: str):
+        """
+        Run the three detections over sentence-aligned windows of a long text.
+        
+        Returns:
+            Tuple of (clickbait, hate speech, credibility results, truncation note or None)
+        """
+        processed, note = long_document.truncate(text)
+        with stage("fakenews.long_document"):
+            features = long_document.score_windows("fakenews", long_document.split_windows(processed))
+        length = sum(f["length"] for f in features)
+        
+        found_words = set().union(*(f["clickbait_words"] for f in features))
+        clickbait_result = self._clickbait_result(
+            [word for word in self.clickbait_words if word in found_words],
+            sum(f["exclamation_count"] for f in features),
+            sum(f["upper_count"] for f in features) / (length + 1)
+        )
+        hate_result = self._hate_result(
+            sum(f["offensive_count"] for f in features),
+            long_document.weighted_mean(features, "polarity")
+        )
+        found_sources = set().union(*(f["credible_sources"] for f in features))
+        source_lower = source.lower()
+        credibility_result = self._credibility_result(
+            sum(1 for s in self.credible_sources if s in found_sources or s in source_lower),
+            any(f["has_citations"] for f in features),
+            sum(f["quote_count"] for f in features) >= 2,
+            length
+        )
+        return clickbait_result, hate_result, credibility_result, note
+    
+    def analyze_batch(
+        self, articles: List[Dict[str, str]], stats: Optional[Dict] = None, cancel: Optional[CancelToken] = None
+    ) -> List[Dict]:
+        """
+        Analyze multiple articles.
+        
+        Articles with the same source whose texts differ only in whitespace
+        are analyzed once.
+        
+        Args:
+            articles: List of dictionaries with 'text' and optional 'source'
+            stats: Optional dictionary that receives dedup figures
+            cancel: Optional token; once it stops, no further articles are analyzed
+            
+        Returns:
+            List of analysis results, in input order. If ``cancel`` stopped,
+            only the leading results that were finished
+        """
+        sources = [a.get("source") or "" for a in articles]
+        unique, positions = dedupe([(normalize_text(a["text"]), s) for a, s in zip(articles, sources)])
+        record_stats(stats, len(articles), len(unique))
+        scored = take_until_stopped((self.analyze(articles[i]["text"], sources[i]) for i in unique), cancel)
+        done = completed(unique, len(scored), len(articles))
+        return [
+            {**scored[slot], "text": self._echo_text(article["text"])}
+            for article, slot in zip(articles[:done], positions)
+        ]
+    
+    @staticmethod
+    def _echo_text(text: str) -> str:
+        """Input text as echoed in results, truncated to 200 characters."""
+        return text[:200] + "..." if len(text) > 200 else text
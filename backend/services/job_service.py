@@ -0,0 +1,415 @@
+"""
+Asynchronous batch jobs backed by a local SQLite store.
+
+A job's input is split into chunks that are stored with the job, so a
+restarted server picks up unfinished jobs and only reprocesses chunks that
+had not completed. Chunks are scored in the ``jobs`` process pool and each
+result is committed as soon as it arrives.
+
+Every worker process runs a dispatcher on the same store. A claimed chunk
+carries a lease that its dispatcher keeps renewing while the chunk is in
+flight; only chunks whose lease expired (their dispatcher died) are returned
+to the pending state, so a starting worker never takes over chunks a live
+worker is still scoring.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.core.pool import get_pool
+from backend.services.batch_tasks import process_chunk, rank_results
+
+
+logger = logging.getLogger("nlpb.jobs")
+
+# Seconds the dispatcher waits after an error, doubling per consecutive error
+DISPATCH_ERROR_BACKOFF = 1.0
+DISPATCH_ERROR_BACKOFF_MAX = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    options TEXT NOT NULL,
+    total_items INTEGER NOT NULL DEFAULT 0,
+    total_chunks INTEGER NOT NULL DEFAULT 0,
+    completed_chunks INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_chunks (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    input TEXT,
+    result TEXT,
+    lease_until REAL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS job_chunks_status ON job_chunks (status, job_id, idx);
+"""
+
+
+class JobStore:
+    """SQLite persistence for jobs and their chunks."""
+
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(job_chunks)")}
+        if "lease_until" not in columns:
+            # Stores created before chunk leases
+            self._conn.execute("ALTER TABLE job_chunks ADD COLUMN lease_until REAL")
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _rollback_on_error(self):
+        """Roll back an open transaction on errors, so the connection stays usable."""
+        try:
+            yield
+        except BaseException:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+
+    def create_job(self, kind: str, options: Dict, chunks: Iterable[List[Dict]]) -> str:
+        """
+        Store a new job and all of its input chunks.
+
+        Args:
+            kind: Job kind (see ``batch_tasks.KINDS``)
+            options: Kind-specific options, e.g. ``job_description``
+            chunks: Iterable of record lists
+
+        Returns:
+            The new job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        total_items = 0
+        total_chunks = 0
+        with self._lock, self._rollback_on_error():
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, options, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(options), now, now)
+            )
+            for idx, chunk in enumerate(chunks):
+                self._conn.execute(
+                    "INSERT INTO job_chunks (job_id, idx, status, size, input) VALUES (?, ?, 'pending', ?, ?)",
+                    (job_id, idx, len(chunk), json.dumps(chunk))
+                )
+                total_items += len(chunk)
+                total_chunks += 1
+            self._conn.execute(
+                "UPDATE jobs SET total_items = ?, total_chunks = ? WHERE id = ?",
+                (total_items, total_chunks, job_id)
+            )
+            self._conn.execute("COMMIT")
+        return job_id
+
+    def claim_chunks(self, limit: int) -> List[Tuple[str, int, str, Dict, List[Dict]]]:
+        """Mark up to ``limit`` pending chunks of active jobs as running and return them."""
+        with self._lock, self._rollback_on_error():
+            # IMMEDIATE takes the write lock up front, so dispatchers in other
+            # worker processes cannot claim the same chunks.
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT c.job_id, c.idx, c.input, j.kind, j.options FROM job_chunks c "
+                "JOIN jobs j ON j.id = c.job_id "
+                "WHERE c.status = 'pending' AND j.status IN ('queued', 'running') "
+                "ORDER BY j.created_at, c.idx LIMIT ?",
+                (limit,)
+            ).fetchall()
+            now = time.time()
+            for row in rows:
+                self._conn.execute(
+                    "UPDATE job_chunks SET status = 'running', lease_until = ? WHERE job_id = ? AND idx = ?",
+                    (now + self.lease_seconds, row["job_id"], row["idx"])
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                    (now, row["job_id"])
+                )
+            self._conn.execute("COMMIT")
+        return [
+            (row["job_id"], row["idx"], row["kind"], json.loads(row["options"]), json.loads(row["input"]))
+            for row in rows
+        ]
+
+    def complete_chunk(self, job_id: str, idx: int, results: List[Dict]) -> bool:
+        """
+        Checkpoint a finished chunk.
+
+        Only a chunk that is still running counts; a duplicate completion
+        (the chunk was reclaimed and finished elsewhere) is ignored.
+
+        Returns:
+            True if this was the job's last outstanding chunk
+        """
+        with self._lock, self._rollback_on_error():
+            self._conn.execute("BEGIN")
+            cursor = self._conn.execute(
+                "UPDATE job_chunks SET status = 'done', result = ?, input = NULL, lease_until = NULL "
+                "WHERE job_id = ? AND idx = ? AND status = 'running'",
+                (json.dumps(results), job_id, idx)
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute("COMMIT")
+                return False
+            cursor = self._conn.execute(
+                "UPDATE jobs SET completed_chunks = completed_chunks + 1, updated_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id)
+            )
+            if cursor.rowcount == 0:
+                # Job failed or was purged while this chunk was in flight
+                self._conn.execute("ROLLBACK")
+                return False
+            row = self._conn.execute(
+                "SELECT completed_chunks, total_chunks FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            self._conn.execute("COMMIT")
+        return row["completed_chunks"] >= row["total_chunks"]
+
+    def finish_job(self, job_id: str, status: str, retention_seconds: float, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?, expires_at = ? WHERE id = ?",
+                (status, error, now, now + retention_seconds, job_id)
+            )
+
+    def replace_results(self, job_id: str, results: List[Dict], chunk_size: int) -> None:
+        """Rewrite a job's results (e.g. after global ranking), re-chunked in order."""
+        with self._lock, self._rollback_on_error():
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM job_chunks WHERE job_id = ?", (job_id,))
+            for idx, start in enumerate(range(0, len(results), chunk_size)):
+                chunk = results[start:start + chunk_size]
+                self._conn.execute(
+                    "INSERT INTO job_chunks (job_id, idx, status, size, result) VALUES (?, ?, 'done', ?, ?)",
+                    (job_id, idx, len(chunk), json.dumps(chunk))
+                )
+            self._conn.execute("COMMIT")
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def get_results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """
+        Read results of completed chunks, in input (or final rank) order.
+
+        Returns:
+            Tuple of (results page, number of results available)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT size, result FROM job_chunks WHERE job_id = ? AND status = 'done' ORDER BY idx",
+                (job_id,)
+            ).fetchall()
+        available = sum(row["size"] for row in rows)
+        end = available if limit is None else offset + limit
+        page: List[Dict] = []
+        position = 0
+        for row in rows:
+            if position + row["size"] > offset and position < end:
+                chunk = json.loads(row["result"])
+                page.extend(chunk[max(0, offset - position):end - position])
+            position += row["size"]
+            if position >= end:
+                break
+        return page, available
+
+    def all_results(self, job_id: str) -> List[Dict]:
+        return self.get_results(job_id)[0]
+
+    def renew_leases(self, chunks: Iterable[Tuple[str, int]]) -> None:
+        """Extend the leases of chunks this dispatcher is still scoring."""
+        lease_until = time.time() + self.lease_seconds
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE job_chunks SET lease_until = ? WHERE job_id = ? AND idx = ? AND status = 'running'",
+                [(lease_until, job_id, idx) for job_id, idx in chunks]
+            )
+
+    def release(self, chunks: Iterable[Tuple[str, int]]) -> None:
+        """Return chunks this dispatcher will not finish to the pending state."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE job_chunks SET status = 'pending', lease_until = NULL "
+                "WHERE job_id = ? AND idx = ? AND status = 'running'",
+                list(chunks)
+            )
+
+    def reclaim_expired(self) -> int:
+        """Return running chunks whose lease expired (their dispatcher died) to the pending state."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE job_chunks SET status = 'pending', lease_until = NULL "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    def incomplete_finished_jobs(self) -> List[str]:
+        """Jobs whose chunks are all done but which were not finalized before a restart."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') AND completed_chunks >= total_chunks"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Delete jobs whose retention period has passed."""
+        now = now or time.time()
+        with self._lock, self._rollback_on_error():
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM job_chunks WHERE job_id IN (SELECT id FROM jobs WHERE expires_at < ?)", (now,)
+            )
+            cursor = self._conn.execute("DELETE FROM jobs WHERE expires_at < ?", (now,))
+            self._conn.execute("COMMIT")
+        return cursor.rowcount
+
+
+class JobManager:
+    """Dispatches stored job chunks to the worker pool and checkpoints results."""
+
+    def __init__(self, store: JobStore, workers: int, chunk_size: int, retention_seconds: float):
+        self.store = store
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.retention_seconds = retention_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    def submit(self, kind: str, chunks: Iterable[List[Dict]], options: Optional[Dict] = None) -> str:
+        """Persist a job and wake the dispatcher."""
+        job_id = self.store.create_job(kind, options or {}, chunks)
+        if self.store.get_job(job_id)["total_chunks"] == 0:
+            self.store.finish_job(job_id, "completed", self.retention_seconds)
+        self._wakeup.set()
+        return job_id
+
+    def start(self) -> None:
+        """Resume interrupted jobs and start the dispatcher thread."""
+        if self._thread is not None:
+            return
+        resumed = self.store.reclaim_expired()
+        if resumed:
+            logger.info("Resuming %d interrupted job chunks", resumed)
+        for job_id in self.store.incomplete_finished_jobs():
+            self._finalize(job_id)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="nlpb-job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _finalize(self, job_id: str) -> None:
+        job = self.store.get_job(job_id)
+        if job is None:
+            return
+        if job["kind"] == "resume_rank":
+            self.store.replace_results(job_id, rank_results(self.store.all_results(job_id)), self.chunk_size)
+        self.store.finish_job(job_id, "completed", self.retention_seconds)
+
+    def _step(
+        self, pool, in_flight: Dict[Future, Tuple[str, int]], last_purge: float, last_renewal: float
+    ) -> Tuple[float, float]:
+        """One dispatcher iteration; returns the updated purge and lease renewal times."""
+        if time.time() - last_purge > 60:
+            self.store.purge_expired()
+            last_purge = time.time()
+
+        if time.time() - last_renewal > self.store.lease_seconds / 3:
+            self.store.renew_leases(in_flight.values())
+            reclaimed = self.store.reclaim_expired()
+            if reclaimed:
+                logger.info("Reclaimed %d job chunks from a stopped worker", reclaimed)
+            last_renewal = time.time()
+
+        capacity = self.workers * 2 - len(in_flight)
+        if capacity > 0:
+            for job_id, idx, kind, options, records in self.store.claim_chunks(capacity):
+                in_flight[pool.submit(process_chunk, kind, records, options)] = (job_id, idx)
+
+        if not in_flight:
+            self._wakeup.wait(1.0)
+            self._wakeup.clear()
+            return last_purge, last_renewal
+
+        done, _ = wait(list(in_flight), timeout=0.5, return_when=FIRST_COMPLETED)
+        for future in done:
+            # Popped only once stored, so a store error retries the chunk next iteration
+            job_id, idx = in_flight[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.exception("Job %s chunk %d failed", job_id, idx)
+                self.store.finish_job(job_id, "failed", self.retention_seconds, error=str(e))
+                del in_flight[future]
+                continue
+            last = self.store.complete_chunk(job_id, idx, results)
+            del in_flight[future]
+            if last:
+                self._finalize(job_id)
+        return last_purge, last_renewal
+
+    def _run(self) -> None:
+        pool = get_pool("jobs", self.workers)
+        in_flight: Dict[Future, Tuple[str, int]] = {}
+        last_purge = 0.0
+        last_renewal = time.time()
+        errors = 0
+        while not self._stop.is_set():
+            try:
+                if errors:
+                    # A failure may have hit between a job's last chunk and its finalization
+                    for job_id in self.store.incomplete_finished_jobs():
+                        self._finalize(job_id)
+                last_purge, last_renewal = self._step(pool, in_flight, last_purge, last_renewal)
+                errors = 0
+            except Exception:
+                # E.g. "database is locked" with several workers on one store:
+                # keep dispatching (and renewing leases) once the store is back
+                errors += 1
+                backoff = min(DISPATCH_ERROR_BACKOFF * 2 ** (errors - 1), DISPATCH_ERROR_BACKOFF_MAX)
+                logger.exception("Job dispatcher failed; retrying in %.1fs", backoff)
+                self._stop.wait(backoff)
+
+        # Hand unfinished chunks back at once instead of waiting for their leases to expire
+        try:
+            self.store.release(in_flight.values())
+        except Exception:
+            logger.exception("Could not release %d job chunks; they are reclaimed once their leases expire",
+                             len(in_flight))
@@ -0,0 +1,109 @@
+"""
+Long-document mode for the analyzers.
+
+Texts longer than ``LONG_DOCUMENT_THRESHOLD`` are truncated to
+``LONG_DOCUMENT_MAX_LENGTH`` characters at a sentence boundary and split into
+sentence-aligned windows of about ``LONG_DOCUMENT_WINDOW`` characters. Each
+analyzer extracts additive per-window features (``window_features``), the
+windows are scored in parallel in the ``documents`` process pool, and the
+analyzer folds the features back into its usual response fields.
+"""
+import multiprocessing
+import re
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.config import settings
+from backend.core.pool import get_pool
+
+
+# Whitespace after sentence-ending punctuation, or a blank line
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def is_long(text: str) -> bool:
+    return len(text) > settings.LONG_DOCUMENT_THRESHOLD
+
+
+def cache_parts(text: str) -> Tuple[str, ...]:
+    """Extra cache key parts, so windowed results are keyed by the window settings."""
+    if not is_long(text):
+        return ()
+    return (f"windowed:{settings.LONG_DOCUMENT_WINDOW}:{settings.LONG_DOCUMENT_MAX_LENGTH}",)
+
+
+def _cut_point(text: str, start: int, end: int) -> int:
+    """Last sentence break in ``text[start:end]``, else the last space, else ``end``."""
+    cut = None
+    for match in _SENTENCE_BREAK.finditer(text, start + 1, end):
+        cut = match.end()
+    if cut is None:
+        cut = text.rfind(" ", start + 1, end) + 1 or end
+    return cut
+
+
+def truncate(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Cap ``text`` at ``LONG_DOCUMENT_MAX_LENGTH`` characters.
+
+    Returns:
+        Tuple of (text to process, note describing the truncation or None)
+    """
+    max_length = settings.LONG_DOCUMENT_MAX_LENGTH
+    if len(text) <= max_length:
+        return text, None
+    kept = text[:_cut_point(text, 0, max_length)]
+    return kept, f"Text truncated to the first {len(kept):,} of {len(text):,} characters for analysis"
+
+
+def split_windows(text: str, window: Optional[int] = None) -> List[str]:
+    """Split ``text`` into consecutive windows that end on sentence breaks where possible."""
+    window = window or settings.LONG_DOCUMENT_WINDOW
+    windows = []
+    start = 0
+    while len(text) - start > window:
+        cut = _cut_point(text, start, start + window)
+        windows.append(text[start:cut])
+        start = cut
+    windows.append(text[start:])
+    return windows
+
+
+def _features(kind: str, windows: List[str], config: Optional[Dict] = None) -> List[Dict]:
+    from backend.services.batch_tasks import get_analyzer
+    analyzer = get_analyzer(kind, config)
+    return [analyzer.window_features(window) for window in windows]
+
+
+def score_windows(kind: str, windows: List[str], config: Optional[Dict] = None) -> List[Dict]:
+    """
+    Extract window features, in parallel when it pays off.
+
+    Windows are split into one contiguous group per worker. Inside worker
+    processes (background jobs, bulk runs) they are scored inline instead,
+    since those already run one chunk per core.
+
+    Args:
+        kind: Analyzer kind (see ``batch_tasks.KINDS``)
+        windows: Windows from ``split_windows``
+        config: Constructor options of the calling analyzer that change its
+            window features, e.g. the sentiment ``engine``
+
+    Returns:
+        Per-window feature dictionaries, in order
+    """
+    workers = min(settings.LONG_DOCUMENT_WORKERS, len(windows))
+    if workers <= 1 or multiprocessing.parent_process() is not None:
+        return _features(kind, windows, config)
+
+    pool = get_pool("documents", settings.LONG_DOCUMENT_WORKERS)
+    size = -(-len(windows) // workers)
+    futures = [pool.submit(_features, kind, windows[i:i + size], config) for i in range(0, len(windows), size)]
+    return [features for future in futures for features in future.result()]
+
+
+def weighted_mean(features: List[Dict], field: str) -> float:
+    """Mean of ``field`` across windows, weighted by window length."""
+    total = sum(f["length"] for f in features)
+    if not total:
+        return 0.0
+    return sum(f[field] * f["length"] for f in features) / total
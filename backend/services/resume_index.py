@@ -0,0 +1,634 @@
+"""
+Sharded resume index for searching a large applicant pool.
+
+Resumes are hashed into a fixed term space (``HashingVectorizer`` over unigrams
+and bigrams, English stop words removed), so shards share one feature space
+without sharing a vocabulary. The index keeps global document frequencies,
+and query weights are computed from them, so IDF is the same whichever shard
+a resume lives in. Scores are TF-IDF cosine similarities (smoothed IDF, as
+``TfidfVectorizer`` computes it).
+
+Layout under ``RESUME_INDEX_DIR``::
+
+    meta.json             generation, shard count, document count, segments per shard
+    df-<generation>.npy   document frequency of every hashed term
+    shard-<i>/<segment>/  term counts as CSR arrays, ids, insertion sequence,
+                          skill bitmasks and experience years
+
+Each ``add`` writes one immutable segment per shard, round-robin, and bumps
+the generation; readers take a consistent snapshot from ``meta.json``. A shard
+with more than ``RESUME_INDEX_MAX_SEGMENTS`` segments is compacted into one,
+and replaced segments are deleted at the next write.
+
+A search scores every shard in parallel in the ``search`` process pool, each
+shard returns its own top-k, and those lists are merged into the global
+ranking. Shard arrays are memory-mapped, so workers share them through the
+page cache.
+
+The top ``RESUME_SEARCH_DEPTH`` hits of a search are kept in a per-process LRU
+keyed by the normalized job description and the index generation. Paging,
+filtering and re-sorting the same job description are served from it, and
+any write to the index starts a new generation, which drops the cached
+rankings. Explanations read count rows of the hits' segments in the API
+process; it keeps at most ``EXPLAIN_SEGMENTS`` of them mapped and unmaps them
+all when the generation changes, so compacted segments do not stay mapped.
+
+Index scores use corpus-wide IDF, so they run well below the two-document
+scores of ``ResumeScreener.screen_resume`` (about half for short resumes,
+two thirds for longer ones, on the benchmark corpus). Recommendations of
+index hits therefore use their own score thresholds,
+``RESUME_SEARCH_RECOMMENDATION_SCORES``, with the screener's skill counts.
+"""
+import fcntl
+import heapq
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from backend.core.cache import MemoryCache, cache_key
+from backend.core.config import settings
+from backend.core.metrics import CACHE_REQUESTS, stage
+from backend.core.pool import WorkerPool, get_pool
+from backend.services.dedup import normalize_text
+from backend.services.resume_service import ResumeScreener
+
+
+META_FILE = "meta.json"
+
+# (score, sequence, id, skills bitmask, experience years, shard, segment, row) per hit
+Hit = Tuple[float, int, str, int, int, int, str, int]
+
+SORT_KEYS = ("match_score", "experience_years", "skills_count")
+
+# Segments kept memory-mapped for explanations in the API process
+EXPLAIN_SEGMENTS = 16
+
+
+def make_vectorizer(n_features: int) -> HashingVectorizer:
+    """Term-count vectorizer shared by indexing and queries."""
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words="english",
+        ngram_range=(1, 2),
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32
+    )
+
+
+def term_names(vectorizer: HashingVectorizer, text: str) -> Dict[int, str]:
+    """Hashed index of every term ``vectorizer`` extracts from ``text``, mapped back to the term."""
+    terms = list(dict.fromkeys(vectorizer.build_analyzer()(text)))
+    if not terms:
+        return {}
+    hasher = FeatureHasher(n_features=vectorizer.n_features, input_type="string", alternate_sign=False)
+    indices = hasher.transform([[term] for term in terms]).indices
+    names: Dict[int, str] = {}
+    for index, term in zip(indices.tolist(), terms):
+        names.setdefault(index, term)
+    return names
+
+
+def idf_from_df(df: np.ndarray, documents: int) -> np.ndarray:
+    """Smoothed IDF, ``ln((1 + n) / (1 + df)) + 1``."""
+    return (np.log((1 + documents) / (1 + df.astype(np.float64))) + 1).astype(np.float32)
+
+
+class _Segment:
+    """Memory-mapped arrays of one immutable segment."""
+
+    def __init__(self, path: str, n_features: int):
+        def load(name):
+            return np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+
+        indptr = load("indptr")
+        self.counts = sparse.csr_matrix(
+            (load("data"), load("indices"), indptr), shape=(len(indptr) - 1, n_features)
+        )
+        self.ids = load("ids")
+        self.seq = load("seq")
+        self.skills = load("skills")
+        self.experience = load("experience")
+        self.norms_generation = None
+        self.norms = None
+
+    def close(self) -> None:
+        """Drop the arrays; the files are unmapped once no caller still uses them."""
+        self.counts = self.ids = self.seq = self.skills = self.experience = self.norms = None
+
+    def doc_norms(self, generation: int, idf: np.ndarray) -> np.ndarray:
+        """L2 norms of the TF-IDF rows; IDF changes with the generation, so they are cached per generation."""
+        if self.norms_generation != generation:
+            squared = self.counts.multiply(self.counts) @ (idf.astype(np.float64) ** 2)
+            self.norms = np.sqrt(squared)
+            self.norms[self.norms == 0] = 1.0
+            self.norms_generation = generation
+        return self.norms
+
+
+# Per-process caches, used by pool workers and inline searches alike
+_segments: Dict[str, _Segment] = {}
+_idf: Dict[str, Tuple[int, np.ndarray]] = {}
+
+
+def _segment(path: str, n_features: int) -> _Segment:
+    segment = _segments.get(path)
+    if segment is None:
+        segment = _segments[path] = _Segment(path, n_features)
+    return segment
+
+
+def _load_idf(directory: str, generation: int, documents: int) -> np.ndarray:
+    cached = _idf.get(directory)
+    if cached is None or cached[0] != generation:
+        df = np.load(os.path.join(directory, f"df-{generation}.npy"))
+        cached = _idf[directory] = (generation, idf_from_df(df, documents))
+    return cached[1]
+
+
+def search_shard(
+    directory: str,
+    shard: int,
+    segments: Sequence[str],
+    generation: int,
+    documents: int,
+    n_features: int,
+    terms: np.ndarray,
+    weights: np.ndarray,
+    k: int
+) -> List[Hit]:
+    """
+    Top ``k`` resumes of one shard for a query.
+
+    Args:
+        directory: Index directory
+        shard: Shard number
+        segments: Segment names of the shard in this generation
+        generation: Index generation the query was planned against
+        documents: Documents in the index at that generation
+        n_features: Hashed term space size
+        terms: Query term indices
+        weights: Query weight per term (normalized query TF-IDF times IDF)
+        k: Number of hits to return
+
+    Returns:
+        Hits sorted by descending score, ties in insertion order
+    """
+    idf = _load_idf(directory, generation, documents)
+    query = np.zeros(n_features, dtype=np.float32)
+    query[terms] = weights
+
+    # Forget segments of this shard that were compacted away
+    shard_dir = os.path.join(directory, f"shard-{shard}")
+    for path in [p for p in _segments if os.path.dirname(p) == shard_dir and os.path.basename(p) not in segments]:
+        del _segments[path]
+
+    hits: List[Hit] = []
+    for name in segments:
+        segment = _segment(os.path.join(shard_dir, name), n_features)
+        scores = (segment.counts @ query) / segment.doc_norms(generation, idf)
+        top = min(k, len(scores))
+        if top == 0:
+            continue
+        rows = np.argpartition(-scores, top - 1)[:top]
+        hits.extend(
+            (float(scores[row]), int(segment.seq[row]), str(segment.ids[row]),
+             int(segment.skills[row]), int(segment.experience[row]), shard, name, int(row))
+            for row in rows
+        )
+    return heapq.nsmallest(k, hits, key=lambda hit: (-hit[0], hit[1]))
+
+
+class ResumeIndex:
+    """Sharded, append-only TF-IDF index of resumes."""
+
+    def __init__(self, directory: str, shards: Optional[int] = None, screener: Optional[ResumeScreener] = None):
+        """
+        Open the index in ``directory``, creating it if needed.
+
+        Args:
+            directory: Index directory
+            shards: Shard count for a new index (default ``RESUME_INDEX_SHARDS``);
+                an existing index keeps its own
+            screener: Screener used for skill and experience extraction
+        """
+        self.directory = directory
+        self.screener = screener or ResumeScreener()
+        self._lock = threading.Lock()
+        self._ids: Optional[set] = None
+        self._ids_generation = None
+        self._cache = MemoryCache(settings.RESUME_SEARCH_CACHE_ITEMS, name="resume_search")
+        self._cache_generation = None
+        self._explain_segments: "OrderedDict[str, _Segment]" = OrderedDict()
+        self._explain_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock():
+            if not os.path.exists(os.path.join(directory, META_FILE)):
+                shards = shards or settings.RESUME_INDEX_SHARDS
+                n_features = settings.RESUME_INDEX_FEATURES
+                np.save(os.path.join(directory, "df-0.npy"), np.zeros(n_features, dtype=np.int32))
+                self._write_meta({
+                    "generation": 0,
+                    "documents": 0,
+                    "shards": shards,
+                    "n_features": n_features,
+                    "segments": [[] for _ in range(shards)],
+                    "retired": []
+                })
+        self.vectorizer = make_vectorizer(self.meta()["n_features"])
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialize writers across threads and processes."""
+        with self._lock, open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def meta(self) -> Dict:
+        """Current index metadata snapshot."""
+        with open(os.path.join(self.directory, META_FILE)) as f:
+            return json.load(f)
+
+    def _write_meta(self, meta: Dict) -> None:
+        path = os.path.join(self.directory, META_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def _known_ids(self, meta: Dict) -> set:
+        if self._ids_generation != meta["generation"]:
+            ids = set()
+            for shard, names in enumerate(meta["segments"]):
+                for name in names:
+                    ids.update(np.load(os.path.join(self._segment_dir(shard, name), "ids.npy")).tolist())
+            self._ids, self._ids_generation = ids, meta["generation"]
+        return self._ids
+
+    def _skills_mask(self, skills: List[str]) -> int:
+        mask = 0
+        for skill in skills:
+            mask |= 1 << self.screener.tech_skills.index(skill)
+        return mask
+
+    def add(self, resumes: List[Dict[str, str]]) -> Dict[str, int]:
+        """
+        Index resumes.
+
+        Resumes whose id is already indexed (or repeated in the batch) are skipped.
+
+        Args:
+            resumes: List of dictionaries with 'id' and 'text' keys
+
+        Returns:
+            Dictionary with 'indexed', 'skipped', 'documents' and 'generation'
+        """
+        with self._write_lock():
+            meta = self.meta()
+            known = self._known_ids(meta)
+            fresh, seen = [], set()
+            for resume in resumes:
+                if resume["id"] not in known and resume["id"] not in seen:
+                    seen.add(resume["id"])
+                    fresh.append(resume)
+            if not fresh:
+                return {"indexed": 0, "skipped": len(resumes), "documents": meta["documents"],
+                        "generation": meta["generation"]}
+
+            with stage("resume_index.vectorize"):
+                texts = [resume["text"] for resume in fresh]
+                counts = self.vectorizer.transform(texts).tocsr()
+                counts.sum_duplicates()
+                skills = np.array([self._skills_mask(self.screener.extract_skills(t)) for t in texts], dtype=np.int64)
+                experience = self.screener.extract_experience_years_batch(texts)
+
+            generation = meta["generation"] + 1
+            seq = meta["documents"] + np.arange(len(fresh), dtype=np.int64)
+            ids = np.array([resume["id"] for resume in fresh])
+            shards = meta["shards"]
+            # Segments replaced by the previous write are no longer referenced
+            self._delete_retired(meta)
+            with stage("resume_index.write"):
+                for shard in range(shards):
+                    rows = np.flatnonzero(seq % shards == shard)
+                    if not len(rows):
+                        continue
+                    self._write_segment(shard, f"seg-{generation:08d}", {
+                        "counts": counts[rows], "ids": ids[rows], "seq": seq[rows],
+                        "skills": skills[rows], "experience": experience[rows]
+                    })
+                    meta["segments"][shard].append(f"seg-{generation:08d}")
+                    if len(meta["segments"][shard]) > settings.RESUME_INDEX_MAX_SEGMENTS:
+                        self._compact(meta, shard, f"cmp-{generation:08d}")
+
+                df = np.load(os.path.join(self.directory, f"df-{meta['generation']}.npy"))
+                df += np.bincount(counts.indices, minlength=len(df)).astype(df.dtype)
+                np.save(os.path.join(self.directory, f"df-{generation}.npy"), df)
+
+            previous = meta["generation"]
+            meta["generation"] = generation
+            meta["documents"] += len(fresh)
+            self._write_meta(meta)
+            # Keep the previous generation's frequencies for searches planned against it
+            self._remove_df(keep=(previous, generation))
+            known.update(ids.tolist())
+            self._ids_generation = generation
+            return {"indexed": len(fresh), "skipped": len(resumes) - len(fresh),
+                    "documents": meta["documents"], "generation": generation}
+
+    def _segment_dir(self, shard: int, name: str) -> str:
+        return os.path.join(self.directory, f"shard-{shard}", name)
+
+    def _write_segment(self, shard: int, name: str, columns: Dict) -> None:
+        """Write a segment to a temporary directory, then rename it into place."""
+        counts = columns.pop("counts")
+        columns.update(
+            data=counts.data.astype(np.float32),
+            indices=counts.indices.astype(np.int32),
+            indptr=counts.indptr.astype(np.int64)
+        )
+        path = self._segment_dir(shard, name)
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for key, array in columns.items():
+            np.save(os.path.join(tmp, key + ".npy"), array)
+        os.replace(tmp, path)
+
+    def _compact(self, meta: Dict, shard: int, name: str) -> None:
+        """Merge every segment of a shard into one; the old ones are retired."""
+        old = meta["segments"][shard]
+        segments = [_Segment(self._segment_dir(shard, n), meta["n_features"]) for n in old]
+        self._write_segment(shard, name, {
+            "counts": sparse.vstack([s.counts for s in segments], format="csr"),
+            **{key: np.concatenate([getattr(s, key) for s in segments])
+               for key in ("ids", "seq", "skills", "experience")}
+        })
+        meta["segments"][shard] = [name]
+        meta["retired"].extend([shard, n] for n in old)
+
+    def _delete_retired(self, meta: Dict) -> None:
+        for shard, name in meta["retired"]:
+            shutil.rmtree(self._segment_dir(shard, name), ignore_errors=True)
+        meta["retired"] = []
+
+    def _remove_df(self, keep: Tuple[int, ...]) -> None:
+        for name in os.listdir(self.directory):
+            if name.startswith("df-") and name.endswith(".npy") and int(name[3:-4]) not in keep:
+                os.remove(os.path.join(self.directory, name))
+
+    def clear(self) -> Dict:
+        """Remove every indexed resume; the generation keeps increasing."""
+        with self._write_lock():
+            meta = self.meta()
+            for shard in range(meta["shards"]):
+                shutil.rmtree(os.path.join(self.directory, f"shard-{shard}"), ignore_errors=True)
+            generation = meta["generation"] + 1
+            np.save(os.path.join(self.directory, f"df-{generation}.npy"), np.zeros(meta["n_features"], dtype=np.int32))
+            meta.update(generation=generation, documents=0, segments=[[] for _ in range(meta["shards"])], retired=[])
+            self._write_meta(meta)
+            self._remove_df(keep=(generation,))
+            return meta
+
+    def _query(self, meta: Dict, job_description: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Query term indices and weights; terms no indexed resume contains are dropped."""
+        counts = self.vectorizer.transform([job_description]).tocsr()
+        idf = _load_idf(self.directory, meta["generation"], meta["documents"])
+        df_known = np.load(os.path.join(self.directory, f"df-{meta['generation']}.npy"), mmap_mode="r")
+        keep = df_known[counts.indices] > 0
+        terms = counts.indices[keep].astype(np.int32)
+        tfidf = counts.data[keep] * idf[terms]
+        norm = np.linalg.norm(tfidf)
+        if norm == 0:
+            return terms[:0], tfidf[:0]
+        return terms, (tfidf / norm * idf[terms]).astype(np.float32)
+
+    def rank(self, job_description: str, depth: int, pool: Optional[WorkerPool] = None) -> Tuple[Dict, List[Hit]]:
+        """
+        Score every indexed resume against a job description, uncached.
+
+        Args:
+            job_description: The job description
+            depth: Number of hits to return
+            pool: Process pool to score shards in (default: the ``search`` pool,
+                or inline when ``RESUME_SEARCH_WORKERS`` is 1)
+
+        Returns:
+            Tuple of (index metadata, hits sorted by descending score)
+        """
+        meta = self.meta()
+        return meta, self._rank(meta, *self._query(meta, job_description), depth, pool)
+
+    def _rank(self, meta: Dict, terms: np.ndarray, weights: np.ndarray, depth: int,
+              pool: Optional[WorkerPool]) -> List[Hit]:
+        args = [
+            (self.directory, shard, names, meta["generation"], meta["documents"], meta["n_features"],
+             terms, weights, depth)
+            for shard, names in enumerate(meta["segments"]) if names
+        ]
+        if not args:
+            return []
+        if pool is None and settings.RESUME_SEARCH_WORKERS > 1:
+            pool = get_pool("search", settings.RESUME_SEARCH_WORKERS)
+        with stage("resume_index.search"):
+            if pool is None:
+                shard_hits = [search_shard(*a) for a in args]
+            else:
+                shard_hits = [f.result() for f in [pool.submit(search_shard, *a) for a in args]]
+        with stage("resume_index.merge"):
+            return list(heapq.merge(*shard_hits, key=lambda hit: (-hit[0], hit[1])))[:depth]
+
+    def _candidates(self, job_description: str, pool: Optional[WorkerPool]) -> Tuple[Dict, bool]:
+        """Columns of the top ``RESUME_SEARCH_DEPTH`` hits, from the cache when possible."""
+        meta = self.meta()
+        if self._cache_generation != meta["generation"]:
+            # The pool changed: every cached ranking is stale, and segments
+            # mapped for explanations may have been compacted away
+            self._cache.clear()
+            self._close_explain_segments()
+            self._cache_generation = meta["generation"]
+        key = cache_key(
+            "resume_search", str(meta["generation"]), self.directory, str(settings.RESUME_SEARCH_DEPTH),
+            normalize_text(job_description).lower()
+        )
+        if settings.RESUME_SEARCH_CACHE_ITEMS:
+            candidates = self._cache.get(key)
+            if candidates is not None:
+                CACHE_REQUESTS.labels("resume_search", "hit").inc()
+                return candidates, True
+            CACHE_REQUESTS.labels("resume_search", "miss").inc()
+
+        terms, weights = self._query(meta, job_description)
+        hits = self._rank(meta, terms, weights, settings.RESUME_SEARCH_DEPTH, pool)
+        skills = np.array([hit[3] for hit in hits], dtype=np.int64)
+        skills_count = np.array([bin(mask).count("1") for mask in skills.tolist()], dtype=np.int32)
+        match_score = np.round(np.array([hit[0] for hit in hits], dtype=np.float64) * 100, 2)
+        candidates = {
+            "generation": meta["generation"],
+            "documents": meta["documents"],
+            "n_features": meta["n_features"],
+            "terms": terms,
+            "weights": weights,
+            "ids": np.array([hit[2] for hit in hits], dtype=str),
+            "match_score": match_score,
+            "skills": skills,
+            "skills_count": skills_count,
+            "experience_years": np.array([hit[4] for hit in hits], dtype=np.int32),
+            "recommendation": np.array(
+                [ResumeScreener.recommendation(score, count, settings.RESUME_SEARCH_RECOMMENDATION_SCORES)
+                 for score, count in zip(match_score.tolist(), skills_count.tolist())],
+                dtype=str
+            ),
+            "shard": np.array([hit[5] for hit in hits], dtype=np.int32),
+            "segment": np.array([hit[6] for hit in hits], dtype=str),
+            "row": np.array([hit[7] for hit in hits], dtype=np.int64)
+        }
+        if settings.RESUME_SEARCH_CACHE_ITEMS:
+            self._cache.set(key, candidates)
+        return candidates, False
+
+    def search(
+        self,
+        job_description: str,
+        offset: int = 0,
+        limit: int = 10,
+        min_score: Optional[float] = None,
+        min_experience: Optional[int] = None,
+        skills: Optional[List[str]] = None,
+        recommendations: Optional[List[str]] = None,
+        sort_by: str = "match_score",
+        explain: int = 0,
+        pool: Optional[WorkerPool] = None
+    ) -> Dict:
+        """
+        Rank indexed resumes against a job description.
+
+        The top ``RESUME_SEARCH_DEPTH`` resumes are cached per job description
+        and index generation, so later pages, filters and sorts of the same
+        job description do not rescore the pool.
+
+        Args:
+            job_description: The job description
+            offset: Matching resumes to skip
+            limit: Number of resumes to return
+            min_score: Minimum match score (0-100)
+            min_experience: Minimum years of experience
+            skills: Skills every returned resume must have
+            recommendations: Recommendations to keep
+            sort_by: 'match_score', 'experience_years' or 'skills_count';
+                ties are ordered by match score
+            explain: Number of top contributing terms to add to each returned
+                resume as 'explanation' (0 for none)
+            pool: Process pool to score shards in on a cache miss
+
+        Returns:
+            Dictionary with 'generation', 'documents', 'candidates' (resumes
+            filtered and sorted), 'exhaustive' (whether those are the whole
+            pool), 'total' matching, 'offset', 'cached' and the page of
+            'results' shaped like ``rank_resumes`` output
+
+        Raises:
+            ValueError: If ``sort_by`` or a skill is unknown
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Cannot sort by {sort_by!r}; expected one of {', '.join(SORT_KEYS)}")
+        unknown = [skill for skill in skills or [] if skill not in self.screener.tech_skills]
+        if unknown:
+            raise ValueError(f"Unknown skills: {', '.join(unknown)}")
+
+        candidates, cached = self._candidates(job_description, pool)
+        keep = np.ones(len(candidates["ids"]), dtype=bool)
+        if min_score is not None:
+            keep &= candidates["match_score"] >= min_score
+        if min_experience is not None:
+            keep &= candidates["experience_years"] >= min_experience
+        if skills:
+            required = self._skills_mask(skills)
+            keep &= (candidates["skills"] & required) == required
+        if recommendations:
+            keep &= np.isin(candidates["recommendation"], recommendations)
+        rows = np.flatnonzero(keep)
+        if sort_by != "match_score":
+            # Candidates are in score order, so a stable sort breaks ties by score
+            rows = rows[np.argsort(-candidates[sort_by][rows], kind="stable")]
+
+        page = rows[offset:offset + limit]
+        results = [self._result(rank, candidates, int(row)) for rank, row in enumerate(page, offset + 1)]
+        if explain and len(page):
+            with stage("resume_index.explain"):
+                names = term_names(self.vectorizer, job_description)
+                for result, row in zip(results, page.tolist()):
+                    result["explanation"] = self._explain(candidates, row, names, explain)
+
+        return {
+            "generation": candidates["generation"],
+            "documents": candidates["documents"],
+            "candidates": len(candidates["ids"]),
+            "exhaustive": len(candidates["ids"]) == candidates["documents"],
+            "total": len(rows),
+            "offset": offset,
+            "cached": cached,
+            "results": results
+        }
+
+    def _explain(self, candidates: Dict, row: int, names: Dict[int, str], n_terms: int) -> List[Dict]:
+        """
+        Terms contributing most to one candidate's score.
+
+        A score is the sum over shared terms of resume count times query
+        weight, divided by the resume's TF-IDF norm, so each term's share is
+        read off the resume's stored count row without rescoring.
+        """
+        segment = self._explain_segment(
+            self._segment_dir(int(candidates["shard"][row]), str(candidates["segment"][row])),
+            candidates["n_features"]
+        )
+        counts = segment.counts[int(candidates["row"][row])]
+        idf = _load_idf(self.directory, candidates["generation"], candidates["documents"])
+        norm = np.linalg.norm(counts.data * idf[counts.indices]) or 1.0
+        terms, doc_pos, query_pos = np.intersect1d(counts.indices, candidates["terms"], return_indices=True)
+        contributions = counts.data[doc_pos] * candidates["weights"][query_pos] / norm * 100
+        top = np.argsort(-contributions, kind="stable")[:n_terms]
+        return [
+            {"term": names.get(int(terms[i]), f"#{terms[i]}"), "contribution": round(float(contributions[i]), 2)}
+            for i in top
+        ]
+
+    def _explain_segment(self, path: str, n_features: int) -> _Segment:
+        """Segment for explanations: one mapped by inline searches, else from a bounded LRU."""
+        segment = _segments.get(path)
+        if segment is not None:
+            return segment
+        with self._explain_lock:
+            segment = self._explain_segments.pop(path, None) or _Segment(path, n_features)
+            self._explain_segments[path] = segment
+            while len(self._explain_segments) > EXPLAIN_SEGMENTS:
+                self._explain_segments.popitem(last=False)[1].close()
+        return segment
+
+    def _close_explain_segments(self) -> None:
+        with self._explain_lock:
+            for segment in self._explain_segments.values():
+                segment.close()
+            self._explain_segments.clear()
+
+    def _result(self, rank: int, candidates: Dict, row: int) -> Dict:
+        skills_mask = int(candidates["skills"][row])
+        skills_found = [skill for i, skill in enumerate(self.screener.tech_skills) if skills_mask >> i & 1]
+        return {
+            "resume_id": str(candidates["ids"][row]),
+            "rank": rank,
+            "match_score": float(candidates["match_score"][row]),
+            "skills_found": skills_found,
+            "skills_count": len(skills_found),
+            "experience_years": int(candidates["experience_years"][row]),
+            "recommendation": str(candidates["recommendation"][row])
+        }
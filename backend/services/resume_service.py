@@ -1,18 +1,53 @@
 """
 Resume Screening Service for HR automation.
 """
+import datetime
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
 
+from backend.core.cache import ResultCache, cache_key
+from backend.core.cancellation import CancelToken, take_until_stopped
+from backend.core.metrics import stage
+from backend.services import long_document
+from backend.services.dedup import completed, dedupe, normalize_text, record_stats
+
+
+# Patterns over lowercased UTF-8 bytes. A number stated before "experience"
+# ("5+ years of experience") or an employment date range ("2015-2021",
+# "2019 to present") is matched where a run of digits starts; a number stated
+# after it ("experience: 3 years") is found from the literal "experience".
+NUMBER_PATTERN = re.compile(
+    rb"(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?experience"
+    rb"|(?<![a-z_])((?:19|20)\d\d)\s*(?:-|\xe2\x80\x93|\xe2\x80\x94|to)\s*((?:19|20)\d\d|present|current|now)\b"
+)
+EXPERIENCE_PATTERN = re.compile(rb"experience[:\s]+(\d+)\+?\s*years?")
+# Date ranges starting earlier than this are not employment
+MIN_RANGE_YEAR = 1950
+# Stated figures are capped so they fit the int32 result
+MAX_STATED_YEARS = 2 ** 31 - 1
+# Resumes scanned per joined buffer, to bound memory on large batches
+EXPERIENCE_BLOCK = 10000
+
 
 class ResumeScreener:
     """Resume screening and ranking system."""
     
-    def __init__(self):
-        """Initialize the resume screener."""
+    # Bump when scoring changes so cached results are not reused
+    VERSION = "3"
+    
+    def __init__(self, cache: Optional[ResultCache] = None):
+        """
+        Initialize the resume screener.
+        
+        Args:
+            cache: Optional result cache consulted before scoring
+        """
+        self.cache = cache
         self.vectorizer = TfidfVectorizer(
             stop_words='english',
             max_features=500,
@@ -58,21 +93,76 @@ class ResumeScreener:
         Returns:
             Estimated years of experience
         """
-        # Simple regex patterns for experience
-        patterns = [
-            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-            r'experience[:\s]+(\d+)\+?\s*years?',
-            r'(\d+)\+?\s*yrs?\s+(?:of\s+)?experience'
-        ]
+        return int(self.extract_experience_years_batch([text])[0])
+    
+    def extract_experience_years_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Extract years of experience from many resumes at once.
         
-        years = []
-        text_lower = text.lower()
+        Resumes are joined into one byte buffer, digit runs are located with
+        NumPy, and the combined pattern is only tried where a run starts,
+        instead of running three patterns over every resume. A resume's
+        estimate is the larger of the most years it states ("5+ years of
+        experience", "experience: 3 years") and the years covered by its date
+        ranges ("2015-2021", "2019 to present"), overlapping ranges counted once.
         
-        for pattern in patterns:
-            matches = re.findall(pattern, text_lower)
-            years.extend([int(match) for match in matches])
+        Args:
+            texts: Resume texts
+            
+        Returns:
+            Estimated years of experience per resume (int32 array)
+        """
+        years = np.zeros(len(texts), dtype=np.int32)
+        this_year = datetime.date.today().year
+        stated_doc, stated = [], []
+        range_doc, range_start, range_end = [], [], []
         
-        return max(years) if years else 0
+        for first in range(0, len(texts), EXPERIENCE_BLOCK):
+            parts = [text.encode("utf-8", "surrogatepass") for text in texts[first:first + EXPERIENCE_BLOCK]]
+            # Joined with a separator that no pattern can match across
+            buffer = b"\x00".join(parts).lower()
+            starts = np.cumsum([0] + [len(part) + 1 for part in parts[:-1]])
+            
+            data = np.frombuffer(buffer, dtype=np.uint8)
+            digit = (data - ord("0")) < 10
+            runs = np.flatnonzero(digit & ~np.concatenate(([False], digit[:-1])))
+            
+            positions = []
+            for pos in runs.tolist():
+                match = NUMBER_PATTERN.match(buffer, pos)
+                if match is None:
+                    continue
+                count, start, end = match.groups()
+                if count is not None:
+                    positions.append(pos)
+                    stated.append(min(int(count), MAX_STATED_YEARS))
+                    continue
+                start = int(start)
+                end = int(end) if end.isdigit() else this_year
+                if MIN_RANGE_YEAR <= start <= end <= this_year:
+                    range_doc.append(first + np.searchsorted(starts, pos, side="right") - 1)
+                    range_start.append(start)
+                    range_end.append(end)
+            for match in EXPERIENCE_PATTERN.finditer(buffer):
+                positions.append(match.start())
+                stated.append(min(int(match.group(1)), MAX_STATED_YEARS))
+            stated_doc.extend((first + np.searchsorted(starts, positions, side="right") - 1).tolist())
+        
+        if stated:
+            np.maximum.at(years, stated_doc, stated)
+        if range_start:
+            docs = np.array(range_doc, dtype=np.int64)
+            # Offset years by resume so one sort orders ranges per resume and the
+            # running maximum end never carries over into the next resume
+            order = np.lexsort((range_start, docs))
+            start_key = (docs * 10000 + range_start)[order]
+            end_key = (docs * 10000 + range_end)[order]
+            covered = np.maximum.accumulate(end_key)
+            previous = np.concatenate(([0], covered[:-1]))
+            spans = np.zeros(len(texts), dtype=np.int64)
+            np.add.at(spans, docs[order], np.maximum(0, end_key - np.maximum(start_key, previous)))
+            np.maximum(years, spans.astype(np.int32), out=years)
+        return years
     
     def screen_resume(self, resume_text: str, job_description: str) -> Dict[str, any]:
         """
@@ -93,60 +183,155 @@ class ResumeScreener:
                 "recommendation": "reject"
             }
         
-        # Calculate similarity score using TF-IDF
+        if self.cache is not None:
+            key = cache_key(
+                "resume", self.VERSION, resume_text, job_description, *long_document.cache_parts(resume_text)
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        notes = None
+        long = long_document.is_long(resume_text)
+        if long:
+            resume_text, note = long_document.truncate(resume_text)
+            notes = [note] if note else None
+        
+        # Calculate similarity score using TF-IDF. Batches are screened from
+        # several threads, so each call fits its own copy of the vectorizer.
+        scored = True
         try:
-            vectors = self.vectorizer.fit_transform([job_description, resume_text])
-            similarity = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
+            with stage("resume.tfidf"):
+                vectors = clone(self.vectorizer).fit_transform([job_description, resume_text])
+                similarity = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
             match_score = round(similarity * 100, 2)
-        except:
+        except ValueError:
+            # No terms left after stop word removal; the fallback is not cached
+            scored = False
             match_score = 0.0
         
-        # Extract skills
-        skills_found = self.extract_skills(resume_text)
-        
-        # Extract experience
-        experience_years = self.extract_experience_years(resume_text)
-        
-        # Make recommendation
-        if match_score >= 70 and len(skills_found) >= 5:
-            recommendation = "highly_recommended"
-        elif match_score >= 50 and len(skills_found) >= 3:
-            recommendation = "recommended"
-        elif match_score >= 30:
-            recommendation = "maybe"
+        if long:
+            # Skills and experience from sentence-aligned windows
+            with stage("resume.long_document"):
+                features = long_document.score_windows("resume_rank", long_document.split_windows(resume_text))
+            found = set().union(*(f["skills"] for f in features))
+            skills_found = [skill for skill in self.tech_skills if skill in found]
+            experience_years = max(f["experience_years"] for f in features)
         else:
-            recommendation = "reject"
+            # Extract skills
+            with stage("resume.skill_extraction"):
+                skills_found = self.extract_skills(resume_text)
+            
+            # Extract experience
+            with stage("resume.experience_regex"):
+                experience_years = self.extract_experience_years(resume_text)
         
-        return {
+        recommendation = self.recommendation(match_score, len(skills_found))
+        
+        result = {
             "match_score": match_score,
             "skills_found": skills_found,
             "skills_count": len(skills_found),
             "experience_years": experience_years,
             "recommendation": recommendation
         }
+        if notes:
+            result["notes"] = notes
+        if self.cache is not None and scored:
+            self.cache.set(key, result)
+        return result
     
-    def rank_resumes(self, resumes: List[Dict[str, str]], job_description: str) -> List[Dict[str, any]]:
+    @staticmethod
+    def recommendation(
+        match_score: float, skills_count: int, thresholds: Tuple[float, float, float] = (70, 50, 30)
+    ) -> str:
         """
-        Rank multiple resumes against a job description.
+        Recommendation for a match score and number of skills found.
+        
+        Args:
+            match_score: Match score (0-100)
+            skills_count: Number of skills found
+            thresholds: Minimum scores for 'highly_recommended', 'recommended'
+                and 'maybe'; the defaults are calibrated for ``screen_resume``
+            
+        Returns:
+            'highly_recommended', 'recommended', 'maybe' or 'reject'
+        """
+        highly, recommended, maybe = thresholds
+        if match_score >= highly and skills_count >= 5:
+            return "highly_recommended"
+        elif match_score >= recommended and skills_count >= 3:
+            return "recommended"
+        elif match_score >= maybe:
+            return "maybe"
+        else:
+            return "reject"
+    
+    def window_features(self, text: str) -> Dict[str, any]:
+        """
+        Skills and experience found in one long-document window.
+        
+        Args:
+            text: Window text
+            
+        Returns:
+            Dictionary with 'skills' and 'experience_years'
+        """
+        return {"skills": self.extract_skills(text), "experience_years": self.extract_experience_years(text)}
+    
+    def screen_batch(
+        self,
+        resumes: List[Dict[str, str]],
+        job_description: str,
+        stats: Optional[Dict] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> List[Dict[str, any]]:
+        """
+        Screen multiple resumes against a job description, without ranking.
+        
+        Resumes whose texts differ only in whitespace are screened once.
         
         Args:
             resumes: List of dictionaries with 'id' and 'text' keys
             job_description: The job description
+            stats: Optional dictionary that receives dedup figures
+            cancel: Optional token; once it stops, no further resumes are screened
             
         Returns:
-            List of ranked resumes with scores
+            List of screening results with 'resume_id', in input order. If
+            ``cancel`` stopped, only the leading results that were finished
         """
-        results = []
+        texts = [resume.get('text', '') for resume in resumes]
+        unique, positions = dedupe([normalize_text(text) for text in texts])
+        record_stats(stats, len(resumes), len(unique))
+        scored = take_until_stopped((self.screen_resume(texts[i], job_description) for i in unique), cancel)
+        done = completed(unique, len(scored), len(resumes))
+        
+        return [
+            {"resume_id": resume.get('id', 'unknown'), **scored[slot]}
+            for resume, slot in zip(resumes[:done], positions)
+        ]
+    
+    def rank_resumes(
+        self,
+        resumes: List[Dict[str, str]],
+        job_description: str,
+        stats: Optional[Dict] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> List[Dict[str, any]]:
+        """
+        Rank multiple resumes against a job description.
         
-        for resume in resumes:
-            resume_id = resume.get('id', 'unknown')
-            resume_text = resume.get('text', '')
+        Args:
+            resumes: List of dictionaries with 'id' and 'text' keys
+            job_description: The job description
+            stats: Optional dictionary that receives dedup figures
+            cancel: Optional token; once it stops, only the resumes screened so far are ranked
             
-            analysis = self.screen_resume(resume_text, job_description)
-            results.append({
-                "resume_id": resume_id,
-                **analysis
-            })
+        Returns:
+            List of ranked resumes with scores
+        """
+        results = self.screen_batch(resumes, job_description, stats, cancel)
         
         # Sort by match score
         results.sort(key=lambda x: x['match_score'], reverse=True)
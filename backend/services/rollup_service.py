@@ -0,0 +1,196 @@
+"""
+Time-bucketed sentiment rollups backed by a local SQLite store.
+
+Scored reviews are stored once per item id, and every newly stored item is
+added to minute, hour and day rollups of the ``get_statistics`` metrics.
+Rollups are kept for each (product, channel) pair and for the ``*`` wildcard
+on either key, so a dashboard query for any key and time range reads only
+one row per bucket.
+"""
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+GRANULARITIES = {"minute": 60, "hour": 3600, "day": 86400}
+ANY = "*"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sentiment_items (
+    item_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    product TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    polarity REAL NOT NULL,
+    subjectivity REAL NOT NULL,
+    confidence REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sentiment_items_ts ON sentiment_items (ts);
+CREATE TABLE IF NOT EXISTS sentiment_rollups (
+    granularity TEXT NOT NULL,
+    product TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    positive INTEGER NOT NULL,
+    neutral INTEGER NOT NULL,
+    negative INTEGER NOT NULL,
+    polarity_sum REAL NOT NULL,
+    subjectivity_sum REAL NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (granularity, product, channel, bucket)
+);
+"""
+
+# Column order of the rollup sums, after the key columns
+_SUMS = ("total", "positive", "neutral", "negative", "polarity_sum", "subjectivity_sum", "confidence_sum")
+
+
+def pick_granularity(start: float, end: float) -> str:
+    """Finest granularity that keeps a query under a few hundred buckets."""
+    span = end - start
+    if span <= 6 * 3600:
+        return "minute"
+    if span <= 14 * 86400:
+        return "hour"
+    return "day"
+
+
+def statistics_from_sums(sums: Tuple) -> Dict[str, float]:
+    """Build a ``SentimentAnalyzer.get_statistics``-shaped dictionary from rollup sums."""
+    total, positive, neutral, negative, polarity_sum, subjectivity_sum, confidence_sum = sums
+    if not total:
+        return {
+            "total_reviews": 0, "positive_count": 0, "neutral_count": 0, "negative_count": 0,
+            "positive_percentage": 0.0, "neutral_percentage": 0.0, "negative_percentage": 0.0,
+            "average_polarity": 0.0, "average_subjectivity": 0.0, "average_confidence": 0.0
+        }
+    return {
+        "total_reviews": total,
+        "positive_count": positive,
+        "neutral_count": neutral,
+        "negative_count": negative,
+        "positive_percentage": round(positive / total * 100, 2),
+        "neutral_percentage": round(neutral / total * 100, 2),
+        "negative_percentage": round(negative / total * 100, 2),
+        "average_polarity": round(polarity_sum / total, 3),
+        "average_subjectivity": round(subjectivity_sum / total, 3),
+        "average_confidence": round(confidence_sum / total, 3)
+    }
+
+
+class RollupStore:
+    """SQLite persistence for per-item sentiment scores and their rollups."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def add(self, items: Iterable[Dict]) -> int:
+        """
+        Store scored items and fold new ones into the rollups.
+
+        Items whose ``item_id`` is already stored are skipped, so re-sending a
+        batch does not double count.
+
+        Args:
+            items: Dictionaries with ``item_id``, ``ts`` (epoch seconds),
+                optional ``product``/``channel`` and the sentiment result fields
+
+        Returns:
+            Number of items that were new
+        """
+        deltas: Dict[Tuple[str, str, str, int], List[float]] = defaultdict(lambda: [0] * len(_SUMS))
+        added = 0
+        with self._lock:
+            # IMMEDIATE so concurrent writers (other workers, the streaming
+            # daemon) queue on the lock instead of failing to upgrade it
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for item in items:
+                    product = item.get("product") or ""
+                    channel = item.get("channel") or ""
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO sentiment_items "
+                        "(item_id, ts, product, channel, sentiment, polarity, subjectivity, confidence) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (item["item_id"], item["ts"], product, channel, item["sentiment"],
+                         item["polarity"], item["subjectivity"], item["confidence"])
+                    )
+                    if cursor.rowcount == 0:
+                        continue
+                    added += 1
+                    values = (
+                        1,
+                        item["sentiment"] == "positive",
+                        item["sentiment"] == "neutral",
+                        item["sentiment"] == "negative",
+                        item["polarity"],
+                        item["subjectivity"],
+                        item["confidence"]
+                    )
+                    for granularity, seconds in GRANULARITIES.items():
+                        bucket = int(item["ts"] // seconds * seconds)
+                        for key in ((product, channel), (product, ANY), (ANY, channel), (ANY, ANY)):
+                            delta = deltas[(granularity, *key, bucket)]
+                            for i, value in enumerate(values):
+                                delta[i] += value
+
+                self._conn.executemany(
+                    f"INSERT INTO sentiment_rollups (granularity, product, channel, bucket, {', '.join(_SUMS)}) "
+                    f"VALUES (?, ?, ?, ?, {', '.join('?' * len(_SUMS))}) "
+                    f"ON CONFLICT (granularity, product, channel, bucket) DO UPDATE SET "
+                    + ", ".join(f"{column} = {column} + excluded.{column}" for column in _SUMS),
+                    [(*key, *delta) for key, delta in deltas.items()]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        granularity: Optional[str] = None,
+        product: Optional[str] = None,
+        channel: Optional[str] = None
+    ) -> Dict:
+        """
+        Read rollups for a time range and key.
+
+        Buckets are included when their start lies in ``[start, end)``.
+
+        Args:
+            start: Range start, epoch seconds
+            end: Range end, epoch seconds
+            granularity: ``minute``, ``hour`` or ``day``; picked from the range if None
+            product: Product key, or None for all products
+            channel: Channel key, or None for all channels
+
+        Returns:
+            Dictionary with the granularity, overall ``summary`` statistics and
+            per-bucket statistics
+        """
+        granularity = granularity or pick_granularity(start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT bucket, {', '.join(_SUMS)} FROM sentiment_rollups "
+                "WHERE granularity = ? AND product = ? AND channel = ? AND bucket >= ? AND bucket < ? "
+                "ORDER BY bucket",
+                (granularity, product or ANY, channel or ANY, start, end)
+            ).fetchall()
+
+        totals = [sum(row[i + 1] for row in rows) for i in range(len(_SUMS))]
+        return {
+            "granularity": granularity,
+            "summary": statistics_from_sums(totals),
+            "buckets": [{"bucket_start": row[0], **statistics_from_sums(row[1:])} for row in rows]
+        }
@@ -1,16 +1,79 @@
 """
 Sentiment Analysis Service for customer reviews and feedback.
 """
+import re
 from textblob import TextBlob
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
+from backend.core.cache import ResultCache, cache_key
+from backend.core.cancellation import CancelToken, take_until_stopped
+from backend.core.metrics import stage
+from backend.services import long_document
+from backend.services.dedup import completed, dedupe, normalize_text, record_stats
+
+
+ENGINES = ("textblob", "lexicon")
+
+_WORD = re.compile(r"[a-z']+")
+# word -> (polarity, subjectivity), and negation words, from TextBlob's lexicon
+_lexicon: Optional[Tuple[Dict[str, Tuple[float, float]], frozenset]] = None
+
+
+def lexicon_sentiment(text: str) -> Tuple[float, float]:
+    """
+    Polarity and subjectivity as the mean of TextBlob's word scores.
+    
+    Skips TextBlob's tokenizer, tagger and intensifier handling; a negation
+    flips the next scored word to -0.5 times its polarity, as TextBlob does.
+    Several times faster than ``TextBlob(text).sentiment``, and close to it on
+    short reviews.
+    """
+    global _lexicon
+    if _lexicon is None:
+        from textblob.en import sentiment as pattern_sentiment
+        pattern_sentiment.load()
+        words = {word: tuple(senses[None][:2]) for word, senses in pattern_sentiment.items() if None in senses}
+        _lexicon = (words, frozenset(pattern_sentiment.negations))
+    words, negations = _lexicon
+    
+    polarity = subjectivity = 0.0
+    scored = 0
+    negate = False
+    for word in _WORD.findall(text.lower()):
+        if word in negations:
+            negate = True
+            continue
+        score = words.get(word)
+        if score is None:
+            continue
+        polarity += score[0] * (-0.5 if negate else 1.0)
+        subjectivity += score[1]
+        scored += 1
+        negate = False
+    if not scored:
+        return 0.0, 0.0
+    return polarity / scored, subjectivity / scored
+
 
 class SentimentAnalyzer:
     """Sentiment analysis using TextBlob for MVP."""
     
-    def __init__(self):
-        """Initialize the sentiment analyzer."""
+    # Bump when scoring changes so cached results are not reused
+    VERSION = "2"
+    
+    def __init__(self, cache: Optional[ResultCache] = None, engine: str = "textblob"):
+        """
+        Initialize the sentiment analyzer.
+        
+        Args:
+            cache: Optional result cache consulted before scoring
+            engine: 'textblob' (pattern analyzer) or 'lexicon' (``lexicon_sentiment``)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown sentiment engine '{engine}', expected one of {ENGINES}")
+        self.cache = cache
+        self.engine = engine
         self.sentiment_labels = {
             "positive": (0.1, 1.0),
             "neutral": (-0.1, 0.1),
@@ -36,10 +99,31 @@ class SentimentAnalyzer:
                 "confidence": 0.0
             }
         
-        # Analyze using TextBlob
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
+        if self.cache is not None:
+            key = cache_key("sentiment", self.VERSION, self.engine, text, *long_document.cache_parts(text))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        notes = None
+        if long_document.is_long(text):
+            # Score sentence-aligned windows and weight them by length
+            processed, note = long_document.truncate(text)
+            notes = [note] if note else None
+            with stage("sentiment.long_document"):
+                features = long_document.score_windows(
+                    "sentiment", long_document.split_windows(processed), {"engine": self.engine}
+                )
+            polarity = long_document.weighted_mean(features, "polarity")
+            subjectivity = long_document.weighted_mean(features, "subjectivity")
+        elif self.engine == "lexicon":
+            with stage("sentiment.lexicon"):
+                polarity, subjectivity = lexicon_sentiment(text)
+        else:
+            # Analyze using TextBlob
+            with stage("sentiment.textblob"):
+                blob = TextBlob(text)
+                polarity, subjectivity = blob.sentiment
         
         # Determine sentiment label
         if polarity > 0.1:
@@ -52,25 +136,57 @@ class SentimentAnalyzer:
         # Calculate confidence (using absolute polarity as proxy)
         confidence = abs(polarity)
         
-        return {
+        result = {
             "text": text,
             "sentiment": sentiment,
             "polarity": round(polarity, 3),
             "subjectivity": round(subjectivity, 3),
             "confidence": round(confidence, 3)
         }
+        if notes:
+            result["notes"] = notes
+        if self.cache is not None:
+            self.cache.set(key, result)
+        return result
+    
+    def window_features(self, text: str) -> Dict[str, float]:
+        """
+        Polarity and subjectivity of one long-document window.
+        
+        Args:
+            text: Window text
+            
+        Returns:
+            Dictionary with 'length', 'polarity' and 'subjectivity'
+        """
+        if self.engine == "lexicon":
+            polarity, subjectivity = lexicon_sentiment(text)
+        else:
+            polarity, subjectivity = TextBlob(text).sentiment
+        return {"length": len(text), "polarity": polarity, "subjectivity": subjectivity}
     
-    def analyze_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+    def analyze_batch(
+        self, texts: List[str], stats: Optional[Dict] = None, cancel: Optional[CancelToken] = None
+    ) -> List[Dict[str, any]]:
         """
         Analyze sentiment of multiple texts.
         
+        Texts that differ only in whitespace are scored once.
+        
         Args:
             texts: List of texts to analyze
+            stats: Optional dictionary that receives dedup figures
+            cancel: Optional token; once it stops, no further texts are scored
             
         Returns:
-            List of sentiment analysis results
+            List of sentiment analysis results, in input order. If ``cancel``
+            stopped, only the leading results that were finished
         """
-        return [self.analyze_text(text) for text in texts]
+        unique, positions = dedupe([normalize_text(text) for text in texts])
+        record_stats(stats, len(texts), len(unique))
+        scored = take_until_stopped((self.analyze_text(texts[i]) for i in unique), cancel)
+        done = completed(unique, len(scored), len(texts))
+        return [{**scored[slot], "text": text} for text, slot in zip(texts[:done], positions)]
     
     def get_statistics(self, results: List[Dict[str, any]]) -> Dict[str, any]:
         """
@@ -0,0 +1,427 @@
+"""
+Streaming ingestion of social posts.
+
+``StreamDaemon`` tails a source, micro-batches posts through the sentiment
+and fake news analyzers in a process pool, appends results in source order
+and adds sentiment to the rollup store. Two sources are supported:
+
+- ``FileSource``: an append-only NDJSON file, one post per line
+- ``QueueSource``: a ``LocalQueue``, a SQLite table standing in for a
+  message broker until one is deployed
+
+Posts are ``{"text", "id"?, "source"?, "timestamp"?, "product"?, "channel"?}``.
+
+Restarts neither lose nor duplicate posts: after each batch the results are
+written and fsynced, the rollups are updated (idempotently, keyed by post
+id), and only then is the source offset committed together with the output
+size. On startup the output is truncated back to the committed size and
+reading resumes at the committed offset.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, wait
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.core.metrics import registry
+from backend.core.pool import get_pool
+from backend.services.batch_tasks import process_chunk
+
+
+logger = logging.getLogger("nlpb.stream")
+
+ANALYZERS = ("sentiment", "fakenews")
+
+# Result fields kept per analyzer; texts and nested details are not repeated
+RESULT_FIELDS = {
+    "sentiment": ("sentiment", "polarity", "subjectivity", "confidence"),
+    "fakenews": ("is_fake_news", "fake_news_probability", "credibility_score", "clickbait_score",
+                 "hate_score", "warnings"),
+}
+
+STREAM_ITEMS = registry.counter(
+    "nlpb_stream_items_total", "Posts read by the streaming daemon, by result (scored/invalid).", ("result",)
+)
+STREAM_BATCHES = registry.counter("nlpb_stream_batches_total", "Micro-batches committed.")
+STREAM_LAG = registry.gauge("nlpb_stream_lag", "Unprocessed backlog at the source (bytes or messages).", ("unit",))
+STREAM_IN_FLIGHT = registry.gauge("nlpb_stream_batches_in_flight", "Micro-batches being scored.")
+STREAM_THROUGHPUT = registry.gauge("nlpb_stream_items_per_second", "Posts committed per second, 10s average.")
+STREAM_BATCH_SIZE = registry.gauge("nlpb_stream_batch_size", "Current micro-batch size.")
+
+
+def _parse_timestamp(value) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_post(line: str, default_id: str) -> Optional[Dict]:
+    """
+    Parse one NDJSON post.
+
+    Returns:
+        Normalized post, or None if the line is not a valid post
+    """
+    try:
+        row = json.loads(line)
+        text = row.get("text") if isinstance(row, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            return None
+        return {
+            "id": str(row.get("id") or default_id),
+            "text": text,
+            "source": str(row.get("source") or ""),
+            "timestamp": _parse_timestamp(row.get("timestamp")),
+            "product": row.get("product"),
+            "channel": row.get("channel"),
+        }
+    except (ValueError, TypeError):
+        return None
+
+
+class FileSource:
+    """Tails an append-only NDJSON file; offsets are byte positions."""
+
+    unit = "bytes"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._file = None
+        self._bytes_read = 0
+        self._lines_read = 0
+
+    def read(self, offset: int, limit: int) -> Tuple[List[Optional[Dict]], int]:
+        """
+        Read up to ``limit`` complete lines after ``offset``.
+
+        A trailing line without a newline is still being written and is left
+        for the next read.
+
+        Returns:
+            Tuple of (parsed posts, None for invalid lines; offset after them)
+        """
+        if self._file is None:
+            if not os.path.exists(self.path):
+                return [], offset
+            self._file = open(self.path, "rb")
+        if os.fstat(self._file.fileno()).st_size < offset:
+            raise ValueError(f"{self.path} shrank below the committed offset {offset}; it must be append-only")
+
+        self._file.seek(offset)
+        posts = []
+        while len(posts) < limit:
+            line = self._file.readline()
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                posts.append(parse_post(line.decode("utf-8", "replace"), f"{self.name}:{offset}"))
+            offset += len(line)
+            self._bytes_read += len(line)
+            self._lines_read += 1
+        return posts, offset
+
+    def lag(self, offset: int) -> int:
+        return max(0, os.path.getsize(self.path) - offset) if os.path.exists(self.path) else 0
+
+    def backlog(self, offset: int) -> int:
+        """Estimated posts not yet read, from the average line length so far."""
+        return self.lag(offset) * self._lines_read // max(self._bytes_read, 1)
+
+    def commit(self, offset: int) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LocalQueue:
+    """
+    A durable FIFO in SQLite, standing in for a message broker.
+
+    Messages get increasing sequence numbers and are deleted once a consumer
+    acknowledges them. ``publish`` blocks while the queue holds ``max_depth``
+    unacknowledged messages, which pushes backpressure onto producers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages (seq INTEGER PRIMARY KEY AUTOINCREMENT, body TEXT NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def publish(self, bodies: Sequence[str], max_depth: int = 0, poll_interval: float = 0.2) -> None:
+        """
+        Append messages, waiting first while the queue is at ``max_depth`` (0 = unbounded).
+        """
+        while max_depth and self.depth() >= max_depth:
+            time.sleep(poll_interval)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("INSERT INTO messages (body) VALUES (?)", [(body,) for body in bodies])
+            self._conn.execute("COMMIT")
+
+    def read(self, after: int, limit: int) -> List[Tuple[int, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, body FROM messages WHERE seq > ? ORDER BY seq LIMIT ?", (after, limit)
+            ).fetchall()
+
+    def pending(self, after: int) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages WHERE seq > ?", (after,)).fetchone()[0]
+
+    def ack(self, upto: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE seq <= ?", (upto,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class QueueSource:
+    """Consumes a ``LocalQueue``; offsets are the last consumed sequence number."""
+
+    unit = "messages"
+
+    def __init__(self, path: str):
+        self.queue = LocalQueue(path)
+        self.name = os.path.basename(path)
+
+    def read(self, offset: int, limit: int) -> Tuple[List[Optional[Dict]], int]:
+        rows = self.queue.read(offset, limit)
+        posts = [parse_post(body, f"{self.name}:{seq}") for seq, body in rows]
+        return posts, rows[-1][0] if rows else offset
+
+    def lag(self, offset: int) -> int:
+        return self.queue.pending(offset)
+
+    def backlog(self, offset: int) -> int:
+        return self.lag(offset)
+
+    def commit(self, offset: int) -> None:
+        self.queue.ack(offset)
+
+    def close(self) -> None:
+        self.queue.close()
+
+
+def score_posts(posts: List[Dict], analyzers: Sequence[str]) -> List[Dict]:
+    """
+    Score a micro-batch with each analyzer (runs in a worker process).
+
+    Returns:
+        One flat result per post with its id, timestamp, keys and the
+        ``RESULT_FIELDS`` of each analyzer
+    """
+    results = [
+        {key: post[key] for key in ("id", "timestamp", "source", "product", "channel")}
+        for post in posts
+    ]
+    for analyzer in analyzers:
+        if analyzer == "fakenews":
+            records = [{"text": post["text"], "source": post["source"]} for post in posts]
+        else:
+            records = [{"text": post["text"]} for post in posts]
+        scored = process_chunk(analyzer, records)
+        fields = RESULT_FIELDS[analyzer]
+        for result, score in zip(results, scored):
+            result.update((field, score.get(field)) for field in fields)
+    return results
+
+
+class StreamDaemon:
+    """Micro-batches posts from a source through the analyzers with committed offsets."""
+
+    def __init__(
+        self,
+        source,
+        writer,
+        checkpoint,
+        analyzers: Sequence[str] = ANALYZERS,
+        batch_size: int = 256,
+        max_batch_size: int = 4096,
+        max_wait: float = 1.0,
+        workers: int = 2,
+        rollups=None,
+        poll_interval: float = 0.25
+    ):
+        """
+        Args:
+            source: ``FileSource`` or ``QueueSource``
+            writer: ``cli.ResultWriter`` for the output
+            checkpoint: ``cli.Checkpoint`` holding the committed offset
+            analyzers: Subset of ``ANALYZERS``
+            batch_size: Posts per micro-batch when keeping up
+            max_batch_size: Upper bound when the batch size grows to catch up
+            max_wait: Seconds a partial batch may wait for more posts
+            workers: Scoring processes
+            rollups: Optional ``RollupStore`` receiving sentiment results
+            poll_interval: Seconds between reads when the source is idle
+        """
+        unknown = set(analyzers) - set(ANALYZERS)
+        if unknown or not analyzers:
+            raise ValueError(f"Analyzers must be a subset of {ANALYZERS}")
+        self.source = source
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.analyzers = tuple(analyzers)
+        self.min_batch_size = batch_size
+        self.batch_size = batch_size
+        self.max_batch_size = max(batch_size, max_batch_size)
+        self.max_wait = max_wait
+        self.workers = workers
+        self.rollups = rollups if "sentiment" in self.analyzers else None
+        self.poll_interval = poll_interval
+        self._committed: List[Tuple[float, int]] = []
+
+    def _adapt_batch_size(self, backlog: int) -> None:
+        # Backpressure: never more than workers * 2 batches are in flight, so
+        # when the source outpaces scoring the backlog stays at the source.
+        # Larger batches then amortize per-batch overhead until we catch up.
+        if backlog > self.batch_size * self.workers * 2:
+            self.batch_size = min(self.batch_size * 2, self.max_batch_size)
+        elif backlog < self.batch_size:
+            self.batch_size = max(self.batch_size // 2, self.min_batch_size)
+        STREAM_BATCH_SIZE.set(self.batch_size)
+
+    def _commit(self, index: int, end_offset: int, results: List[Dict]) -> None:
+        state = self.checkpoint.state
+        size = self.writer.write(results, index) if results else state["output_bytes"]
+        if self.rollups is not None and results:
+            now = time.time()
+            self.rollups.add(
+                {
+                    "item_id": result["id"],
+                    "ts": result["timestamp"] if result["timestamp"] is not None else now,
+                    **result
+                }
+                for result in results
+            )
+        state.update(
+            chunks_done=index + 1,
+            rows_done=state["rows_done"] + len(results),
+            output_bytes=size,
+            offset=end_offset
+        )
+        self.checkpoint.save()
+        self.source.commit(end_offset)
+        STREAM_BATCHES.inc()
+
+        now = time.monotonic()
+        self._committed.append((now, len(results)))
+        while self._committed and now - self._committed[0][0] > 10:
+            self._committed.pop(0)
+        window = max(now - self._committed[0][0], 1.0)
+        STREAM_THROUGHPUT.set(sum(n for _, n in self._committed) / window)
+
+    def run(self, stop: Optional[threading.Event] = None, follow: bool = True, progress=None) -> int:
+        """
+        Process the source until ``stop`` is set (or, without ``follow``, until caught up).
+
+        Args:
+            stop: Event that ends the loop; batches in flight are committed first
+            follow: Keep waiting for new posts once caught up
+            progress: Optional callback receiving ``(rows_done, lag, unit)`` after each commit
+
+        Returns:
+            Number of posts committed during this run
+        """
+        stop = stop or threading.Event()
+        state = self.checkpoint.state
+        state.setdefault("offset", 0)
+        self.writer.truncate(state["output_bytes"], state["chunks_done"])
+        rows_at_start = state["rows_done"]
+
+        pool = get_pool("stream", self.workers)
+        capacity = self.workers * 2
+        # Batch index -> (scoring future or None for a batch of only invalid lines, end offset)
+        in_flight: Dict[int, Tuple[Optional[Future], int]] = {}
+        next_commit = state["chunks_done"]
+        next_submit = next_commit
+        read_offset = submitted_offset = state["offset"]
+        pending: List[Dict] = []
+        pending_since = 0.0
+        caught_up = False
+        last_lag_check = 0.0
+
+        try:
+            while True:
+                stopping = stop.is_set()
+
+                # Read and submit, unless enough batches are already in flight
+                if not stopping and len(in_flight) < capacity:
+                    wanted = self.batch_size - len(pending)
+                    posts, read_offset = self.source.read(read_offset, wanted)
+                    caught_up = len(posts) < wanted
+                    invalid = sum(1 for post in posts if post is None)
+                    if invalid:
+                        STREAM_ITEMS.labels("invalid").inc(invalid)
+                        logger.warning("Skipped %d invalid posts", invalid)
+                    pending.extend(post for post in posts if post is not None)
+
+                    if read_offset != submitted_offset:
+                        now = time.monotonic()
+                        pending_since = pending_since or now
+                        if (len(pending) >= self.batch_size or now - pending_since >= self.max_wait
+                                or (caught_up and not follow)):
+                            future = pool.submit(score_posts, pending, self.analyzers) if pending else None
+                            in_flight[next_submit] = (future, read_offset)
+                            next_submit += 1
+                            submitted_offset = read_offset
+                            pending = []
+                            pending_since = 0.0
+                STREAM_IN_FLIGHT.set(len(in_flight))
+
+                # Commit finished batches in order; block on the oldest when full or stopping
+                if next_commit in in_flight:
+                    future, end_offset = in_flight[next_commit]
+                    if future is None or future.done() or len(in_flight) >= capacity or stopping:
+                        results = future.result() if future is not None else []
+                        del in_flight[next_commit]
+                        self._commit(next_commit, end_offset, results)
+                        STREAM_ITEMS.labels("scored").inc(len(results))
+                        next_commit += 1
+                        if progress is not None:
+                            progress(state["rows_done"], self.source.lag(end_offset), self.source.unit)
+                        continue
+
+                if stopping and not in_flight:
+                    break
+                if caught_up and not in_flight and not pending and not follow:
+                    break
+                if caught_up or len(in_flight) >= capacity:
+                    oldest = in_flight.get(next_commit)
+                    if oldest is not None and oldest[0] is not None:
+                        wait([oldest[0]], timeout=self.poll_interval)
+                    else:
+                        stop.wait(self.poll_interval)
+
+                if time.monotonic() - last_lag_check >= 1.0:
+                    lag = self.source.lag(state["offset"])
+                    STREAM_LAG.labels(self.source.unit).set(lag)
+                    self._adapt_batch_size(self.source.backlog(state["offset"]))
+                    last_lag_check = time.monotonic()
+        finally:
+            STREAM_IN_FLIGHT.set(0)
+        return state["rows_done"] - rows_at_start
@@ -0,0 +1,138 @@
+"""
+Deterministic synthetic corpora for benchmarking the NLP services.
+
+Every generator takes a seed, so the same arguments always produce the same
+texts and benchmark runs stay comparable across machines and commits.
+"""
+import random
+from typing import Dict, List
+
+
+REVIEW_OPENERS = [
+    "Great product!", "Terrible experience.", "It's okay.", "Absolutely love it.",
+    "Not worth the money.", "Good value overall.", "Disappointed with the quality.",
+    "Exceeded my expectations.", "Average at best.", "Would buy again."
+]
+REVIEW_WORDS = [
+    "delivery", "quality", "price", "support", "battery", "screen", "fast", "slow",
+    "broken", "excellent", "poor", "amazing", "bad", "good", "happy", "unhappy",
+    "recommend", "refund", "sturdy", "cheap", "reliable", "awful", "nice", "the",
+    "was", "very", "really", "not", "and", "but", "with", "product", "service"
+]
+
+RESUME_SKILLS = [
+    "python", "java", "javascript", "react", "sql", "mongodb", "aws", "docker",
+    "kubernetes", "machine learning", "nlp", "fastapi", "django", "git", "agile",
+    "scrum", "ci/cd", "devops", "postgresql", "azure"
+]
+RESUME_WORDS = [
+    "developed", "designed", "led", "team", "project", "system", "built", "scalable",
+    "services", "data", "pipeline", "improved", "performance", "customers", "managed",
+    "deployed", "production", "analysis", "engineer", "software", "backend", "frontend",
+    "responsible", "for", "the", "and", "with", "using", "applications", "platform"
+]
+
+ARTICLE_WORDS = [
+    "government", "report", "officials", "said", "study", "university", "research",
+    "according", "data", "people", "new", "year", "policy", "market", "health",
+    "announced", "sources", "claims", "evidence", "experts", "the", "and", "of",
+    "in", "to", "that", "shocking", "secret", "breaking", "exposed", "leaked"
+]
+ARTICLE_SOURCES = ["Reuters", "BBC", "Daily Buzz", "Unknown Blog", "NPR", ""]
+
+LENGTHS = {
+    "short": 1,
+    "medium": 4,
+    "long": 16,
+}
+
+
+def _words(rng: random.Random, vocabulary: List[str], count: int) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(count))
+
+
+def generate_reviews(n: int, length: str = "short", seed: int = 42) -> List[str]:
+    """
+    Generate customer reviews.
+
+    Args:
+        n: Number of reviews
+        length: ``short`` (~15 words), ``medium`` (~60) or ``long`` (~240)
+        seed: Random seed
+
+    Returns:
+        List of review texts
+    """
+    rng = random.Random(seed)
+    scale = LENGTHS[length]
+    return [
+        f"{rng.choice(REVIEW_OPENERS)} {_words(rng, REVIEW_WORDS, 15 * scale - 2)}."
+        for _ in range(n)
+    ]
+
+
+def generate_resumes(n: int, length: str = "short", seed: int = 42) -> List[Dict[str, str]]:
+    """
+    Generate resumes in the ``{"id", "text"}`` shape used by ``rank_resumes``.
+
+    Args:
+        n: Number of resumes
+        length: ``short`` (~80 words), ``medium`` (~320) or ``long`` (~1280)
+        seed: Random seed
+
+    Returns:
+        List of resume dictionaries
+    """
+    rng = random.Random(seed)
+    scale = LENGTHS[length]
+    resumes = []
+    for i in range(n):
+        skills = ", ".join(rng.sample(RESUME_SKILLS, rng.randint(2, 10)))
+        years = rng.randint(0, 20)
+        body = " ".join(
+            f"{_words(rng, RESUME_WORDS, 15)}."
+            for _ in range(5 * scale)
+        )
+        resumes.append({
+            "id": f"resume-{i}",
+            "text": f"Software engineer with {years} years of experience. Skills: {skills}. {body}"
+        })
+    return resumes
+
+
+def generate_job_description(seed: int = 42) -> str:
+    """Generate a job description mentioning a handful of skills."""
+    rng = random.Random(seed)
+    skills = ", ".join(rng.sample(RESUME_SKILLS, 6))
+    return (
+        f"We are hiring a backend engineer. Required: {skills}. "
+        f"5+ years experience. {_words(rng, RESUME_WORDS, 40)}."
+    )
+
+
+def generate_articles(n: int, length: str = "short", seed: int = 42) -> List[Dict[str, str]]:
+    """
+    Generate news articles with a ``source``.
+
+    Args:
+        n: Number of articles
+        length: ``short`` (~50 words), ``medium`` (~200) or ``long`` (~800)
+        seed: Random seed
+
+    Returns:
+        List of dictionaries with ``text`` and ``source`` keys
+    """
+    rng = random.Random(seed)
+    scale = LENGTHS[length]
+    articles = []
+    for _ in range(n):
+        sentences = []
+        for _ in range(5 * scale):
+            sentence = _words(rng, ARTICLE_WORDS, 10).capitalize()
+            if rng.random() < 0.1:
+                sentence = sentence.upper()
+            sentences.append(sentence + rng.choice([".", ".", ".", "!", "?"]))
+        if rng.random() < 0.3:
+            sentences.append(f'"We have evidence," the study ({rng.randint(1990, 2024)}) said.')
+        articles.append({"text": " ".join(sentences), "source": rng.choice(ARTICLE_SOURCES)})
+    return articles
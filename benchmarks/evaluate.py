@@ -0,0 +1,319 @@
+"""
+Accuracy-versus-throughput evaluation of analyzer configurations.
+
+Runs a labeled CSV dataset per analyzer through every configuration of that
+analyzer and reports, in one table, what a faster configuration costs in
+quality:
+
+- throughput (median of ``--repeat`` batch runs) and per-item latency
+  p50/p95/p99 (per query for resume ranking)
+- peak memory allocated while scoring one batch (tracemalloc); tracemalloc
+  only sees this process, so the search and long-document pools are disabled
+  for the evaluation and all configurations score inline
+- agreement with the ``default`` configuration: share of equal labels for
+  sentiment and fake news, overlap of the top ``--top-k`` for resume ranking
+- accuracy and macro F1 against the dataset's labels, where it has them
+- Spearman rank correlation of resume scores with the ``default`` ranking
+  and with the dataset's relevance labels
+
+Configurations are ``default`` plus the candidates in ``ANALYZER_VERSIONS``
+for sentiment and fake news, and the exact per-resume TF-IDF screening
+(``default``) against the hashed, sharded index (``hashed``) for resumes.
+
+Datasets are CSV files with a ``text`` column and an optional ``label``:
+
+    sentiment   label: positive / negative / neutral
+    fakenews    label: fake / real (or 1 / 0, true / false); optional source
+    resume      label: numeric relevance to --job-description; optional id
+
+An analyzer without a dataset is evaluated on a synthetic corpus, which has
+no labels, so only agreement and rank correlation with ``default`` apply.
+Results are also written as JSON.
+
+Usage:
+    uv run python -m benchmarks.evaluate
+    uv run python -m benchmarks.evaluate --sentiment data/eval/reviews.csv --fakenews data/eval/articles.csv
+    uv run python -m benchmarks.evaluate --resume data/eval/resumes.csv --job-description data/eval/job.txt
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr
+from sklearn.metrics import accuracy_score, f1_score
+
+from backend.core.config import settings
+from backend.services.analyzer_registry import DEFAULT_VERSION, AnalyzerVersion
+from backend.services.fake_news_service import FakeNewsDetector
+from backend.services.resume_index import ResumeIndex
+from backend.services.resume_service import ResumeScreener
+from backend.services.sentiment_service import SentimentAnalyzer
+from benchmarks.corpus import LENGTHS, generate_articles, generate_job_description, generate_resumes, generate_reviews
+
+
+DEFAULT_OUTPUT = "benchmarks/results/evaluation.json"
+KINDS = ("sentiment", "fakenews", "resume")
+
+FAKE_LABELS = {"fake": True, "1": True, "true": True, "yes": True,
+               "real": False, "0": False, "false": False, "no": False}
+
+
+def load_dataset(path: str, kind: str) -> Dict:
+    """
+    Read a labeled CSV dataset.
+
+    Returns:
+        Dictionary with the ``records`` to score and their ``labels`` (None
+        when the file has no ``label`` column)
+
+    Raises:
+        ValueError: If the file has no ``text`` column or a label is invalid
+    """
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    if "text" not in frame.columns:
+        raise ValueError(f"{path} has no 'text' column")
+    records = [
+        {"id": row.get("id") or f"row-{i}", "text": row["text"], "source": row.get("source", "")}
+        for i, row in enumerate(frame.to_dict("records"))
+    ]
+    labels = None
+    if "label" in frame.columns:
+        raw = [value.strip().lower() for value in frame["label"]]
+        if kind == "fakenews":
+            unknown = sorted(set(raw) - set(FAKE_LABELS))
+            if unknown:
+                raise ValueError(f"{path}: unknown fake news labels {unknown}")
+            labels = [FAKE_LABELS[value] for value in raw]
+        elif kind == "resume":
+            labels = [float(value) for value in raw]
+        else:
+            labels = raw
+    return {"records": records, "labels": labels}
+
+
+def synthetic_dataset(kind: str, size: int, length: str, seed: int) -> Dict:
+    if kind == "sentiment":
+        records = [{"text": text} for text in generate_reviews(size, length, seed)]
+    elif kind == "fakenews":
+        records = generate_articles(size, length, seed)
+    else:
+        records = generate_resumes(size, length, seed)
+    return {"records": records, "labels": None}
+
+
+# ==================== Configurations ====================
+# Each configuration maps records to one result per record, in input order:
+# a dictionary with a "label" and a numeric "score".
+
+def analyzer_configs(kind: str) -> Dict[str, Callable[[List[Dict]], List[Dict]]]:
+    """``default`` and every ``ANALYZER_VERSIONS`` candidate of a registry-served analyzer."""
+    factory = SentimentAnalyzer if kind == "sentiment" else FakeNewsDetector
+    variants = {DEFAULT_VERSION: {}, **settings.ANALYZER_VERSIONS.get(kind, {})}
+    configs = {}
+    for name, options in variants.items():
+        analyzer = AnalyzerVersion(kind, name, factory, options).analyzer
+        if kind == "sentiment":
+            configs[name] = lambda records, a=analyzer: [
+                {"label": r["sentiment"], "score": r["polarity"]}
+                for r in a.analyze_batch([record["text"] for record in records])
+            ]
+        else:
+            configs[name] = lambda records, a=analyzer: [
+                {"label": r["is_fake_news"], "score": r["fake_news_probability"]}
+                for r in a.analyze_batch(records)
+            ]
+    return configs
+
+
+def resume_configs(records: List[Dict], job_description: str, directory: str) -> Dict[str, Callable]:
+    """Exact TF-IDF screening and the hashed index, ranking ``records`` against ``job_description``."""
+    screener = ResumeScreener()
+
+    def exact(batch):
+        scores = {r["resume_id"]: r["match_score"] for r in screener.screen_batch(batch, job_description)}
+        return [{"label": None, "score": scores[record["id"]]} for record in batch]
+
+    # Indexing is a one-off cost, so it is done here and only ranking is timed
+    index = ResumeIndex(directory)
+    index.add(records)
+
+    def hashed(batch):
+        _, hits = index.rank(job_description, len(batch))
+        scores = {hit[2]: hit[0] for hit in hits}
+        return [{"label": None, "score": scores.get(record["id"], 0.0)} for record in batch]
+
+    return {DEFAULT_VERSION: exact, "hashed": hashed}
+
+
+# ==================== Measurement ====================
+
+def measure(run: Callable[[List[Dict]], List[Dict]], records: List[Dict], repeat: int, per_item: bool) -> Dict:
+    """
+    Time and profile one configuration.
+
+    Args:
+        run: Configuration to measure
+        records: Records to score
+        repeat: Timed batch runs; the median is reported
+        per_item: Time every record on its own for the latency percentiles;
+            otherwise each batch run counts as one latency sample
+
+    Returns:
+        Results of the last run and the performance figures
+    """
+    # Warm up lazy resources (TextBlob lexicon, regex caches, index segments)
+    run(records[:1])
+
+    batch_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = run(records)
+        batch_times.append(time.perf_counter() - start)
+
+    if per_item:
+        latencies = []
+        for record in records:
+            start = time.perf_counter()
+            run([record])
+            latencies.append(time.perf_counter() - start)
+    else:
+        latencies = batch_times
+
+    tracemalloc.start()
+    try:
+        run(records)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "results": results,
+        "items_per_sec": round(len(records) / statistics.median(batch_times), 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+def _spearman(a: List[float], b: List[float]) -> Optional[float]:
+    rho = spearmanr(a, b).statistic
+    return None if np.isnan(rho) else round(float(rho), 4)
+
+
+def quality(kind: str, results: List[Dict], baseline: List[Dict], labels: Optional[List], top_k: int) -> Dict:
+    """Quality figures of one configuration's results against the baseline and the labels."""
+    scores = [r["score"] for r in results]
+    base_scores = [r["score"] for r in baseline]
+    figures = {"agreement": None, "accuracy": None, "f1": None, "spearman_baseline": None, "spearman_labels": None}
+
+    if kind == "resume":
+        order = np.argsort(scores, kind="stable")[::-1][:top_k]
+        base_order = np.argsort(base_scores, kind="stable")[::-1][:top_k]
+        figures["agreement"] = round(len(set(order.tolist()) & set(base_order.tolist())) / len(order), 4)
+        figures["spearman_baseline"] = _spearman(scores, base_scores)
+        if labels is not None:
+            figures["spearman_labels"] = _spearman(scores, labels)
+        return figures
+
+    predicted = [r["label"] for r in results]
+    figures["agreement"] = round(float(np.mean([p == b["label"] for p, b in zip(predicted, baseline)])), 4)
+    figures["spearman_baseline"] = _spearman(scores, base_scores)
+    if labels is not None:
+        figures["accuracy"] = round(float(accuracy_score(labels, predicted)), 4)
+        figures["f1"] = round(float(f1_score(labels, predicted, average="macro", zero_division=0)), 4)
+    return figures
+
+
+def evaluate(kind: str, dataset: Dict, job_description: str, repeat: int, top_k: int) -> List[Dict]:
+    """Measure every configuration of one analyzer on one dataset."""
+    records, labels = dataset["records"], dataset["labels"]
+    with tempfile.TemporaryDirectory() as tmp:
+        if kind == "resume":
+            configs = resume_configs(records, job_description, os.path.join(tmp, "index"))
+        else:
+            configs = analyzer_configs(kind)
+
+        rows = []
+        baseline = None
+        for name, run in configs.items():
+            row = measure(run, records, repeat, per_item=kind != "resume")
+            results = row.pop("results")
+            if baseline is None:
+                baseline = results
+            rows.append({"analyzer": kind, "config": name, "items": len(records), **row,
+                         **quality(kind, results, baseline, labels, top_k)})
+    return rows
+
+
+def _cell(value, fmt: str) -> str:
+    return "-" if value is None else format(value, fmt)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure quality against speed for every analyzer configuration")
+    for kind in KINDS:
+        parser.add_argument(f"--{kind}", default=None, help=f"Labeled {kind} CSV (default: synthetic corpus)")
+    parser.add_argument("--job-description", default=None,
+                        help="Text file with the job description resumes are ranked against")
+    parser.add_argument("--analyzers", default=",".join(KINDS), help="Comma-separated analyzers to evaluate")
+    parser.add_argument("--size", type=int, default=1000, help="Synthetic corpus size")
+    parser.add_argument("--length", choices=LENGTHS, default="short", help="Synthetic document length")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed batch runs per configuration")
+    parser.add_argument("--top-k", type=int, default=10, help="Resumes compared for ranking agreement")
+    parser.add_argument("--seed", type=int, default=42, help="Synthetic corpus seed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write results JSON")
+    args = parser.parse_args(argv)
+
+    # Pool workers allocate outside tracemalloc's view, so score everything inline
+    settings.RESUME_SEARCH_WORKERS = 1
+    settings.LONG_DOCUMENT_WORKERS = 1
+
+    job_description = generate_job_description(args.seed)
+    if args.job_description:
+        with open(args.job_description, encoding="utf-8") as f:
+            job_description = f.read()
+
+    rows = []
+    sources = {}
+    for kind in args.analyzers.split(","):
+        path = getattr(args, kind)
+        dataset = load_dataset(path, kind) if path else synthetic_dataset(kind, args.size, args.length, args.seed)
+        sources[kind] = path or f"synthetic/size={args.size}/length={args.length}/seed={args.seed}"
+        rows.extend(evaluate(kind, dataset, job_description, args.repeat, args.top_k))
+
+    print(f"{'analyzer':<10} {'config':<10} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'peak MB':>8} {'agree':>7} {'acc':>7} {'F1':>7} {'rho base':>9} {'rho label':>9}")
+    for row in rows:
+        print(f"{row['analyzer']:<10} {row['config']:<10} {row['items_per_sec']:>10,.1f} {row['p50_ms']:>9.3f} "
+              f"{row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f} {row['peak_mb']:>8.2f} "
+              f"{_cell(row['agreement'], '.1%'):>7} {_cell(row['accuracy'], '.1%'):>7} {_cell(row['f1'], '.3f'):>7} "
+              f"{_cell(row['spearman_baseline'], '.3f'):>9} {_cell(row['spearman_labels'], '.3f'):>9}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "sources": sources,
+                "repeat": args.repeat,
+                "top_k": args.top_k,
+                "analyzer_versions": settings.ANALYZER_VERSIONS,
+            },
+            "results": rows,
+        }, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
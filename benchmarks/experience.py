@@ -0,0 +1,109 @@
+"""
+Experience extraction benchmark.
+
+Compares the per-resume loop that ``extract_experience_years`` used to run
+(three regex patterns, one ``findall`` each per resume) with
+``extract_experience_years_batch``, which scans the whole batch once with a
+single combined pattern. Half of the synthetic resumes get an employment
+history with date ranges so that path is exercised too; the loop ignores
+ranges, so only resumes without them are checked for agreement.
+
+Usage:
+    uv run python -m benchmarks.experience
+    uv run python -m benchmarks.experience --size 100000 --length medium --repeat 5
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from backend.services.resume_service import ResumeScreener
+from benchmarks.corpus import LENGTHS, generate_resumes
+
+
+LOOP_PATTERNS = [
+    r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
+    r'experience[:\s]+(\d+)\+?\s*years?',
+    r'(\d+)\+?\s*yrs?\s+(?:of\s+)?experience'
+]
+
+
+def extract_loop(text: str) -> int:
+    """The original per-resume extraction."""
+    years = []
+    text_lower = text.lower()
+    for pattern in LOOP_PATTERNS:
+        years.extend(int(match) for match in re.findall(pattern, text_lower))
+    return max(years) if years else 0
+
+
+def with_history(texts: List[str], seed: int) -> List[str]:
+    """Append an employment history with date ranges to every other resume."""
+    rng = random.Random(seed)
+    out = []
+    for i, text in enumerate(texts):
+        if i % 2:
+            start = rng.randint(2000, 2018)
+            middle = rng.randint(start, 2022)
+            text += f" Employment: Acme {start}–{middle}, Globex {middle} - present."
+        out.append(text)
+    return out
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(size: int, length: str, repeat: int, seed: int) -> Dict:
+    texts = with_history([r["text"] for r in generate_resumes(size, length, seed)], seed)
+    screener = ResumeScreener()
+
+    loop_seconds = _time(lambda: [extract_loop(text) for text in texts], repeat)
+    batch_seconds = _time(lambda: screener.extract_experience_years_batch(texts), repeat)
+
+    batch = screener.extract_experience_years_batch(texts)
+    plain = range(0, size, 2)
+    return {
+        "size": size,
+        "length": length,
+        "loop_per_sec": round(size / loop_seconds),
+        "batch_per_sec": round(size / batch_seconds),
+        "speedup": round(loop_seconds / batch_seconds, 2),
+        "agree_without_ranges": all(int(batch[i]) == extract_loop(texts[i]) for i in plain),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-resume and batch experience extraction")
+    parser.add_argument("--size", type=int, default=20000, help="Resumes per run")
+    parser.add_argument("--length", choices=LENGTHS, default=None, help="Resume length (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per method; the median is reported")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus random seed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    lengths = [args.length] if args.length else list(LENGTHS)
+    rows = [run(args.size, length, args.repeat, args.seed) for length in lengths]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    print(f"{'length':<8} {'size':>8} {'loop/s':>10} {'batch/s':>10} {'speedup':>8} {'agree':>6}")
+    for row in rows:
+        print(f"{row['length']:<8} {row['size']:>8} {row['loop_per_sec']:>10,} {row['batch_per_sec']:>10,} "
+              f"{row['speedup']:>7.2f}x {str(row['agree_without_ranges']):>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Open-loop load generator for the FastAPI backend.
+
+Requests arrive on a Poisson schedule at each offered rate regardless of
+whether earlier requests have finished, so queueing shows up as latency
+instead of silently lowering the load. Latency is measured from each
+request's scheduled arrival time, which also corrects for the generator
+itself falling behind (coordinated omission).
+
+Targets either the app in-process (``--target inprocess``, the default) or a
+running server (``--target http://127.0.0.1:8000``). Every run is stored in
+the results file under ``--label`` so saturation knees of different
+worker/pool configurations can be compared.
+
+Usage:
+    uv run python -m benchmarks.loadtest --rates 5,10,20,40 --duration 10
+    uv run python -m benchmarks.loadtest --target http://127.0.0.1:8000 \\
+        --label "workers=4" --mix analyze=0.7,batch=0.1,rank=0.1,detect=0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.corpus import (
+    generate_articles, generate_job_description, generate_resumes, generate_reviews
+)
+
+
+DEFAULT_OUTPUT = "benchmarks/results/loadtest.json"
+
+ENDPOINTS = {
+    "analyze": "/api/sentiment/analyze",
+    "batch": "/api/sentiment/batch",
+    "rank": "/api/resume/rank",
+    "detect": "/api/fakenews/detect",
+}
+
+
+class PayloadFactory:
+    """Pre-generates request bodies for each endpoint from the synthetic corpus."""
+
+    def __init__(self, batch_size: int, rank_size: int, seed: int):
+        rng = random.Random(seed)
+        reviews = generate_reviews(500, "short", seed)
+        articles = generate_articles(200, "medium", seed)
+        resumes = generate_resumes(max(rank_size * 5, 50), "short", seed)
+        job = generate_job_description(seed)
+        self.bodies: Dict[str, List[bytes]] = {
+            "analyze": [json.dumps({"text": t}).encode() for t in reviews],
+            "batch": [
+                json.dumps({"texts": rng.sample(reviews, batch_size)}).encode()
+                for _ in range(20)
+            ],
+            "rank": [
+                json.dumps({"resumes": rng.sample(resumes, rank_size), "job_description": job}).encode()
+                for _ in range(20)
+            ],
+            "detect": [json.dumps(a).encode() for a in articles],
+        }
+        self._rng = rng
+
+    def body(self, kind: str) -> bytes:
+        return self._rng.choice(self.bodies[kind])
+
+
+class InProcessClient:
+    """Drives the ASGI app directly, without a network hop."""
+
+    def __init__(self):
+        from backend.main import app
+        self.app = app
+
+    async def post(self, path: str, body: bytes) -> int:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "root_path": "", "query_string": b"", "client": ("loadtest", 0),
+            "server": ("inprocess", 80),
+            "headers": [(b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode())],
+        }
+        sent = False
+        status = 0
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()  # Never disconnect
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+
+class HTTPClient:
+    """Minimal HTTP/1.1 client (one connection per request) for a running server."""
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+
+    async def post(self, path: str, body: bytes) -> int:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            await reader.read()
+            return status
+        finally:
+            writer.close()
+
+
+def parse_mix(spec: str) -> Tuple[List[str], List[float]]:
+    kinds, weights = [], []
+    for part in spec.split(","):
+        kind, weight = part.split("=")
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{kind}', expected one of {list(ENDPOINTS)}")
+        kinds.append(kind)
+        weights.append(float(weight))
+    return kinds, weights
+
+
+async def run_rate(client, payloads: PayloadFactory, kinds: List[str], weights: List[float],
+                   rate: float, duration: float, timeout: float, seed: int) -> Dict[str, object]:
+    """
+    Offer ``rate`` requests/second for ``duration`` seconds and collect outcomes.
+
+    Returns:
+        Dictionary with throughput, latency percentiles and error/429 rates
+    """
+    rng = random.Random(seed)
+    outcomes: List[Tuple[str, int, float]] = []
+
+    async def fire(kind: str, scheduled: float):
+        try:
+            status = await asyncio.wait_for(client.post(ENDPOINTS[kind], payloads.body(kind)), timeout)
+        except asyncio.TimeoutError:
+            status = -1
+        except Exception:
+            status = 0
+        outcomes.append((kind, status, time.perf_counter() - scheduled))
+
+    tasks = []
+    start = time.perf_counter()
+    next_arrival = start
+    while next_arrival < start + duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = rng.choices(kinds, weights)[0]
+        tasks.append(asyncio.ensure_future(fire(kind, next_arrival)))
+        next_arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for _, status, latency in outcomes if 200 <= status < 300]) * 1000
+    total = len(outcomes)
+    ok = int(len(latencies))
+    throttled = sum(1 for _, status, _ in outcomes if status == 429)
+    per_endpoint = {}
+    for kind in kinds:
+        kind_latencies = [lat * 1000 for k, s, lat in outcomes if k == kind and 200 <= s < 300]
+        if kind_latencies:
+            per_endpoint[kind] = {
+                "count": len(kind_latencies),
+                "p50_ms": round(float(np.percentile(kind_latencies, 50)), 2),
+                "p99_ms": round(float(np.percentile(kind_latencies, 99)), 2),
+            }
+    return {
+        "offered_rps": rate,
+        "arrival_rps": round(total / duration, 2),
+        "sent": total,
+        "throughput_rps": round(ok / elapsed, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if ok else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2) if ok else None,
+        "error_rate": round((total - ok - throttled) / total, 4) if total else 0.0,
+        "throttled_rate": round(throttled / total, 4) if total else 0.0,
+        "per_endpoint": per_endpoint,
+    }
+
+
+def find_knee(points: List[Dict[str, object]], latency_factor: float = 3.0,
+              throughput_ratio: float = 0.9) -> Optional[float]:
+    """
+    Find the knee of the saturation curve.
+
+    The knee is the highest offered rate still served well: throughput keeps up
+    with at least ``throughput_ratio`` of the actual Poisson arrival rate, and
+    p99 latency stays within ``latency_factor`` of the p99 at the lowest rate.
+
+    Returns:
+        Offered rate at the knee, or None if even the lowest rate saturates
+    """
+    points = sorted(points, key=lambda p: p["offered_rps"])
+    if not points or points[0]["p99_ms"] is None:
+        return None
+    base_p99 = points[0]["p99_ms"]
+    knee = None
+    for point in points:
+        healthy = (
+            point["p99_ms"] is not None
+            and point["throughput_rps"] >= point["arrival_rps"] * throughput_ratio
+            and point["p99_ms"] <= base_p99 * latency_factor
+        )
+        if not healthy:
+            break
+        knee = point["offered_rps"]
+    return knee
+
+
+async def run(args) -> Dict[str, object]:
+    kinds, weights = parse_mix(args.mix)
+    payloads = PayloadFactory(args.batch_size, args.rank_size, args.seed)
+    client = InProcessClient() if args.target == "inprocess" else HTTPClient(args.target)
+
+    # Warm up lazy resources so the lowest rate is not skewed by first calls
+    for kind in kinds:
+        for _ in range(3):
+            await client.post(ENDPOINTS[kind], payloads.body(kind))
+
+    points = []
+    print(f"{'rps':>8} {'sent':>6} {'tput':>8} {'p50 ms':>9} {'p99 ms':>9} {'err':>7} {'429':>7}")
+    for i, rate in enumerate(float(r) for r in args.rates.split(",")):
+        point = await run_rate(client, payloads, kinds, weights, rate, args.duration,
+                               args.timeout, args.seed + i)
+        points.append(point)
+        print(f"{point['offered_rps']:>8.1f} {point['sent']:>6} {point['throughput_rps']:>8.1f} "
+              f"{point['p50_ms'] or float('nan'):>9.1f} {point['p99_ms'] or float('nan'):>9.1f} "
+              f"{point['error_rate']:>7.2%} {point['throttled_rate']:>7.2%}")
+    return {
+        "target": args.target,
+        "mix": args.mix,
+        "duration": args.duration,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "knee_rps": find_knee(points, args.knee_latency_factor),
+        "points": points,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop load test for the NLPB API")
+    parser.add_argument("--target", default="inprocess", help="'inprocess' or a base URL")
+    parser.add_argument("--label", default="default", help="Name of the worker/pool configuration")
+    parser.add_argument("--mix", default="analyze=0.6,batch=0.15,rank=0.1,detect=0.15",
+                        help="Endpoint weights, e.g. analyze=0.7,batch=0.3")
+    parser.add_argument("--rates", default="5,10,20,40,80", help="Comma-separated offered rates (req/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per rate")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--batch-size", type=int, default=50, help="Texts per /sentiment/batch call")
+    parser.add_argument("--rank-size", type=int, default=20, help="Resumes per /resume/rank call")
+    parser.add_argument("--knee-latency-factor", type=float, default=3.0,
+                        help="p99 growth over the lowest rate that marks saturation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results JSON (runs keyed by label)")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+
+    runs = {}
+    if os.path.exists(args.output):
+        with open(args.output) as f:
+            runs = json.load(f)
+    runs[args.label] = result
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(runs, f, indent=2)
+
+    print(f"\nKnee for '{args.label}': {result['knee_rps']} req/s")
+    if len(runs) > 1:
+        print("\nSaturation knees by configuration:")
+        for label, run_result in runs.items():
+            print(f"  {label:<30} {run_result['knee_rps']} req/s  ({run_result['target']}, {run_result['mix']})")
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
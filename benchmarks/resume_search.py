@@ -0,0 +1,115 @@
+"""
+Sharded resume search scaling benchmark.
+
+Indexes a synthetic applicant pool once, then runs the same job descriptions
+against it with search pools of increasing size and reports latency,
+throughput and speedup over one worker. Shards are scored in parallel, so
+with at least as many shards as workers the speedup should stay close to the
+worker count until the machine runs out of cores.
+
+Usage:
+    uv run python -m benchmarks.resume_search
+    uv run python -m benchmarks.resume_search --size 500000 --shards 16 --workers 1,2,4,8,16
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from backend.core.pool import WorkerPool
+from backend.services.resume_index import ResumeIndex
+from benchmarks.corpus import LENGTHS, generate_job_description, generate_resumes
+
+
+def build_index(directory: str, size: int, shards: int, length: str, seed: int, batch: int = 20000) -> float:
+    """Index ``size`` synthetic resumes; returns the seconds it took."""
+    index = ResumeIndex(directory, shards=shards)
+    start = time.perf_counter()
+    for offset in range(0, size, batch):
+        resumes = generate_resumes(min(batch, size - offset), length, seed + offset)
+        for i, resume in enumerate(resumes):
+            resume["id"] = f"resume-{offset + i}"
+        index.add(resumes)
+    return time.perf_counter() - start
+
+
+def run_workers(index: ResumeIndex, workers: int, queries: List[str], top_k: int) -> Dict:
+    """Search every query with a pool of ``workers`` processes."""
+    pool = WorkerPool(f"search-bench-{workers}", workers)
+    try:
+        # Warm up: start workers and map the shards in each of them
+        for query in queries[:workers]:
+            index.rank(query, top_k, pool=pool)
+
+        latencies = []
+        start = time.perf_counter()
+        for query in queries:
+            query_start = time.perf_counter()
+            index.rank(query, top_k, pool=pool)
+            latencies.append(time.perf_counter() - query_start)
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+    latencies.sort()
+    return {
+        "workers": workers,
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+        "queries_per_sec": round(len(queries) / elapsed, 2),
+    }
+
+
+def main() -> int:
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(w) for w in (1, 2, 4, 8, 16, 32) if w <= cpus) or "1"
+    parser = argparse.ArgumentParser(description="Measure sharded resume search scaling")
+    parser.add_argument("--size", type=int, default=200000, help="Resumes in the pool")
+    parser.add_argument("--shards", type=int, default=max(8, cpus), help="Index shards")
+    parser.add_argument("--workers", default=default_workers, help="Comma-separated search pool sizes")
+    parser.add_argument("--queries", type=int, default=50, help="Job descriptions searched per pool size")
+    parser.add_argument("--top-k", type=int, default=50, help="Resumes returned per search")
+    parser.add_argument("--length", choices=LENGTHS, default="short", help="Resume length")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus random seed")
+    parser.add_argument("--index-dir", default=None, help="Reuse or keep the index here (default: temporary)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.index_dir or os.path.join(tmp, "index")
+        index_seconds = None
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            index_seconds = build_index(directory, args.size, args.shards, args.length, args.seed)
+        index = ResumeIndex(directory)
+        meta = index.meta()
+        queries = [generate_job_description(args.seed + i) for i in range(args.queries)]
+
+        rows = [run_workers(index, int(w), queries, args.top_k) for w in args.workers.split(",")]
+
+    # Throughput of one worker, as measured by the first pool size
+    base = rows[0]["queries_per_sec"] / rows[0]["workers"]
+    for row in rows:
+        row["speedup"] = round(row["queries_per_sec"] / rows[0]["queries_per_sec"], 2)
+        row["efficiency"] = round(row["queries_per_sec"] / (base * row["workers"]), 2)
+
+    if args.json:
+        print(json.dumps({"documents": meta["documents"], "shards": meta["shards"],
+                          "index_seconds": index_seconds, "rows": rows}, indent=2))
+        return 0
+
+    print(f"documents: {meta['documents']:,}  shards: {meta['shards']}  cpus: {cpus}")
+    if index_seconds is not None:
+        print(f"indexed in {index_seconds:.1f}s ({meta['documents'] / index_seconds:,.0f} resumes/s)")
+    print(f"{'workers':>7} {'p50 ms':>8} {'p95 ms':>8} {'queries/s':>10} {'speedup':>8} {'efficiency':>11}")
+    for row in rows:
+        print(f"{row['workers']:>7} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['queries_per_sec']:>10.2f} "
+              f"{row['speedup']:>7.2f}x {row['efficiency']:>10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Benchmark suite for the NLP services.
+
+Runs ``SentimentAnalyzer``, ``ResumeScreener`` and ``FakeNewsDetector`` over
+synthetic corpora at several input sizes and document lengths, reports
+throughput and per-item p50/p95/p99 latency, saves the results as JSON and
+compares them against a stored baseline.
+
+Usage:
+    uv run python -m benchmarks.run_benchmarks
+    uv run python -m benchmarks.run_benchmarks --sizes 100,1000 --lengths short,long
+    uv run python -m benchmarks.run_benchmarks --save-baseline
+    uv run python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --threshold 0.1
+
+Exits with status 1 when any case regresses beyond the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from backend.services.fake_news_service import FakeNewsDetector
+from backend.services.resume_service import ResumeScreener
+from backend.services.sentiment_service import SentimentAnalyzer
+from benchmarks.corpus import (
+    LENGTHS, generate_articles, generate_job_description, generate_resumes, generate_reviews
+)
+
+
+DEFAULT_OUTPUT = "benchmarks/results/latest.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+# A case yields per-item callables (for latency) and one batch callable (for throughput)
+Case = Tuple[List[Callable[[], object]], Callable[[], object]]
+
+
+def sentiment_case(size: int, length: str, seed: int) -> Case:
+    analyzer = SentimentAnalyzer()
+    texts = generate_reviews(size, length, seed)
+    items = [lambda t=t: analyzer.analyze_text(t) for t in texts]
+    return items, lambda: analyzer.get_statistics(analyzer.analyze_batch(texts))
+
+
+def resume_case(size: int, length: str, seed: int) -> Case:
+    screener = ResumeScreener()
+    resumes = generate_resumes(size, length, seed)
+    job = generate_job_description(seed)
+    items = [lambda r=r: screener.screen_resume(r["text"], job) for r in resumes]
+    return items, lambda: screener.rank_resumes(resumes, job)
+
+
+def fakenews_case(size: int, length: str, seed: int) -> Case:
+    detector = FakeNewsDetector()
+    articles = generate_articles(size, length, seed)
+    items = [lambda a=a: detector.analyze(a["text"], a["source"]) for a in articles]
+    return items, lambda: detector.analyze_batch(articles)
+
+
+SERVICES = {
+    "sentiment": sentiment_case,
+    "resume": resume_case,
+    "fakenews": fakenews_case,
+}
+
+
+def run_case(service: str, size: int, length: str, repeat: int, seed: int) -> Dict[str, float]:
+    """
+    Benchmark one service at one size and document length.
+
+    Returns:
+        Dictionary with throughput (items/s from the batch path) and per-item
+        latency percentiles in milliseconds
+    """
+    items, batch = SERVICES[service](size, length, seed)
+
+    # Warm up lazy resources (TextBlob lexicon, regex caches)
+    items[0]()
+
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        item()
+        latencies.append(time.perf_counter() - start)
+
+    batch_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        batch()
+        batch_times.append(time.perf_counter() - start)
+
+    latencies_ms = np.array(latencies) * 1000
+    batch_seconds = statistics.median(batch_times)
+    return {
+        "service": service,
+        "size": size,
+        "length": length,
+        "throughput": round(size / batch_seconds, 2),
+        "batch_seconds": round(batch_seconds, 6),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    A case regresses when throughput drops, or p95 latency rises, by more than
+    ``threshold`` (a fraction, e.g. 0.2 for 20%).
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for case_id, current in results.items():
+        previous = baseline.get(case_id)
+        if previous is None:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - threshold):
+            regressions.append(
+                f"{case_id}: throughput {previous['throughput']} -> {current['throughput']} items/s"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{case_id}: p95 latency {previous['p95_ms']} -> {current['p95_ms']} ms"
+            )
+    return regressions
+
+
+def _write_json(path: str, payload: Dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the NLPB services")
+    parser.add_argument("--services", default=",".join(SERVICES), help="Comma-separated services")
+    parser.add_argument("--sizes", default="10,100,500", help="Comma-separated corpus sizes")
+    parser.add_argument("--lengths", default=",".join(LENGTHS), help="Comma-separated document lengths")
+    parser.add_argument("--repeat", type=int, default=3, help="Batch repetitions per case")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus seed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative regression before failing (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write results to --baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<40} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for service in args.services.split(","):
+        for length in args.lengths.split(","):
+            for size in (int(s) for s in args.sizes.split(",")):
+                case_id = f"{service}/size={size}/length={length}"
+                result = run_case(service, size, length, args.repeat, args.seed)
+                results[case_id] = result
+                print(f"{case_id:<40} {result['throughput']:>10.1f} {result['p50_ms']:>9.3f} "
+                      f"{result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f}")
+
+    payload = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    _write_json(args.output, payload)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        _write_json(args.baseline, payload)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Response serialization benchmark.
+
+Scores a synthetic corpus once per service, then measures what it costs to
+turn the results into a response body in each ``?format=`` shape: response
+bytes and CPU time per 10k items. ``full`` reproduces FastAPI's path for a
+``response_model`` (pydantic validation and serialization, then
+``JSONResponse``); the compact shapes use ``backend.api.responses``.
+
+Usage:
+    uv run python -m benchmarks.serialization
+    uv run python -m benchmarks.serialization --size 10000 --length medium --repeat 5
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from backend.api.responses import compact_response, orjson
+from backend.models.schemas import FakeNewsResponse, ResumeRankingResponse, SentimentResponse
+from backend.services.fake_news_service import FakeNewsDetector
+from backend.services.resume_service import ResumeScreener
+from backend.services.sentiment_service import SentimentAnalyzer
+from benchmarks.corpus import LENGTHS, generate_articles, generate_job_description, generate_resumes, generate_reviews
+
+
+FORMATS = ("full", "columnar", "ids")
+
+
+def _results(service: str, size: int, length: str, seed: int) -> List[Dict]:
+    if service == "sentiment":
+        return SentimentAnalyzer().analyze_batch(generate_reviews(size, length, seed))
+    if service == "fakenews":
+        return FakeNewsDetector().analyze_batch(generate_articles(size, length, seed))
+    return ResumeScreener().rank_resumes(generate_resumes(size, length, seed), generate_job_description(seed))
+
+
+SERVICES = {
+    "sentiment": ("sentiment", SentimentResponse),
+    "fakenews": ("fakenews", FakeNewsResponse),
+    "resume": ("resume_rank", ResumeRankingResponse),
+}
+
+
+def _renderer(kind: str, model, results: List[Dict], response_format: str) -> Callable[[], bytes]:
+    if response_format == "full":
+        adapter = TypeAdapter(List[model])
+
+        def render() -> bytes:
+            validated = adapter.validate_python(results)
+            return JSONResponse(adapter.dump_python(validated, mode="json", exclude_none=True)).body
+        return render
+    return lambda: compact_response(kind, results, response_format).body
+
+
+def run_service(service: str, size: int, length: str, repeat: int, seed: int) -> List[Dict]:
+    """
+    Measure every response format for one service.
+
+    Returns:
+        One row per format with bytes and CPU milliseconds per 10k items, plus
+        the savings relative to ``full``
+    """
+    kind, model = SERVICES[service]
+    results = _results(service, size, length, seed)
+    scale = 10000 / size
+
+    rows = []
+    for response_format in FORMATS:
+        render = _renderer(kind, model, results, response_format)
+        body = render()
+        cpu_times = []
+        for _ in range(repeat):
+            start = time.process_time()
+            render()
+            cpu_times.append(time.process_time() - start)
+        rows.append({
+            "service": service,
+            "format": response_format,
+            "bytes_per_10k": round(len(body) * scale),
+            "cpu_ms_per_10k": round(statistics.median(cpu_times) * 1000 * scale, 2),
+        })
+
+    full = rows[0]
+    for row in rows:
+        row["bytes_saved"] = round(1 - row["bytes_per_10k"] / full["bytes_per_10k"], 3)
+        row["cpu_saved"] = (
+            round(1 - row["cpu_ms_per_10k"] / full["cpu_ms_per_10k"], 3) if full["cpu_ms_per_10k"] else 0.0
+        )
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure response bytes and CPU per format")
+    parser.add_argument("--services", default=",".join(SERVICES), help="Comma-separated services")
+    parser.add_argument("--size", type=int, default=10000, help="Items per batch")
+    parser.add_argument("--length", choices=LENGTHS, default="short", help="Document length")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders per format (median is reported)")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus random seed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = []
+    for service in args.services.split(","):
+        rows.extend(run_service(service, args.size, args.length, args.repeat, args.seed))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'service':<10} {'format':<9} {'bytes/10k':>12} {'cpu ms/10k':>11} {'bytes saved':>12} {'cpu saved':>10}")
+    for row in rows:
+        print(f"{row['service']:<10} {row['format']:<9} {row['bytes_per_10k']:>12,} {row['cpu_ms_per_10k']:>11.1f} "
+              f"{row['bytes_saved']:>11.1%} {row['cpu_saved']:>9.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
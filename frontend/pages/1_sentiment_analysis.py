@@ -6,8 +6,11 @@ import requests
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from datetime import datetime, time, timedelta
 from io import StringIO
 
+from sse import iter_events
+
 
 st.set_page_config(page_title="Sentiment Analysis", page_icon="💬", layout="wide")
 
@@ -18,7 +21,7 @@ st.title("💬 Sentiment Analysis")
 st.markdown("Analyze customer reviews and feedback to understand sentiment trends.")
 
 # Tabs for different input methods
-tab1, tab2 = st.tabs(["📝 Single Text", "📊 Batch Analysis"])
+tab1, tab2, tab3 = st.tabs(["📝 Single Text", "📊 Batch Analysis", "📈 Trends"])
 
 # Tab 1: Single Text Analysis
 with tab1:
@@ -145,19 +148,44 @@ Worst product I've ever bought.
                 st.write(f"Loaded {len(df)} reviews")
                 st.dataframe(df.head(), use_container_width=True)
                 
+                stream_results = st.checkbox(
+                    "Show results as they arrive",
+                    help="Streams results chunk by chunk; useful for large files"
+                )
+                
                 if st.button("🔍 Analyze All", key="batch_analyze", type="primary"):
                     with st.spinner(f"Analyzing {len(df)} reviews..."):
                         try:
                             texts = df['text'].tolist()
+                            results = None
                             
-                            # Get batch results
-                            response = requests.post(
-                                f"{API_URL}/sentiment/batch",
-                                json={"texts": texts}
-                            )
+                            if stream_results:
+                                # Render each chunk as soon as the API has scored it
+                                progress = st.progress(0.0, text="Starting...")
+                                live_table = st.empty()
+                                results = []
+                                for event, data in iter_events(f"{API_URL}/sentiment/batch/stream", {"texts": texts}):
+                                    if event == "chunk":
+                                        results.extend(data["results"])
+                                        progress.progress(
+                                            len(results) / len(texts),
+                                            text=f"Analyzed {len(results)} of {len(texts)} reviews"
+                                        )
+                                        live_table.dataframe(pd.DataFrame(results), use_container_width=True)
+                                progress.empty()
+                                live_table.empty()
+                            else:
+                                # Get batch results
+                                response = requests.post(
+                                    f"{API_URL}/sentiment/batch",
+                                    json={"texts": texts}
+                                )
+                                if response.status_code == 200:
+                                    results = response.json()
+                                else:
+                                    st.error(f"API Error: {response.status_code}")
                             
-                            if response.status_code == 200:
-                                results = response.json()
+                            if results is not None:
                                 results_df = pd.DataFrame(results)
                                 
                                 # Get statistics
@@ -225,9 +253,6 @@ Worst product I've ever bought.
                                         file_name="sentiment_analysis_results.csv",
                                         mime="text/csv"
                                     )
-                            
-                            else:
-                                st.error(f"API Error: {response.status_code}")
                         
                         except Exception as e:
                             st.error(f"Error: {str(e)}")
@@ -235,6 +260,86 @@ Worst product I've ever bought.
         except Exception as e:
             st.error(f"Error reading file: {str(e)}")
 
+# Tab 3: Trends from ingested reviews
+with tab3:
+    st.subheader("Sentiment Over Time")
+    st.caption("Answered from pre-aggregated rollups of reviews sent to /api/sentiment/ingest.")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        date_range = st.date_input(
+            "Date range",
+            value=(datetime.utcnow().date() - timedelta(days=7), datetime.utcnow().date())
+        )
+    with col2:
+        granularity = st.selectbox("Granularity", ["auto", "minute", "hour", "day"])
+    with col3:
+        product = st.text_input("Product", placeholder="All products")
+    with col4:
+        channel = st.text_input("Channel", placeholder="All channels")
+    
+    if st.button("📈 Show Trends", key="trends", type="primary"):
+        if not isinstance(date_range, tuple) or len(date_range) != 2:
+            st.error("Select a start and end date")
+        else:
+            params = {
+                "start": datetime.combine(date_range[0], time.min).isoformat(),
+                "end": datetime.combine(date_range[1] + timedelta(days=1), time.min).isoformat()
+            }
+            if granularity != "auto":
+                params["granularity"] = granularity
+            if product:
+                params["product"] = product
+            if channel:
+                params["channel"] = channel
+            
+            try:
+                response = requests.get(f"{API_URL}/sentiment/trends", params=params)
+                
+                if response.status_code == 200:
+                    trends = response.json()
+                    summary = trends["summary"]
+                    
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("Total Reviews", summary["total_reviews"])
+                    with col2:
+                        st.metric("🟢 Positive", f"{summary['positive_percentage']:.1f}%")
+                    with col3:
+                        st.metric("🟡 Neutral", f"{summary['neutral_percentage']:.1f}%")
+                    with col4:
+                        st.metric("🔴 Negative", f"{summary['negative_percentage']:.1f}%")
+                    
+                    if trends["buckets"]:
+                        trends_df = pd.DataFrame(trends["buckets"])
+                        trends_df["bucket_start"] = pd.to_datetime(trends_df["bucket_start"])
+                        
+                        fig_counts = px.bar(
+                            trends_df,
+                            x="bucket_start",
+                            y=["positive_count", "neutral_count", "negative_count"],
+                            title=f"Reviews per {trends['granularity']}",
+                            labels={"bucket_start": "Time", "value": "Reviews", "variable": "Sentiment"},
+                            color_discrete_sequence=['#4CAF50', '#FFC107', '#F44336']
+                        )
+                        st.plotly_chart(fig_counts, use_container_width=True)
+                        
+                        fig_polarity = px.line(
+                            trends_df,
+                            x="bucket_start",
+                            y="average_polarity",
+                            title="Average Polarity",
+                            labels={"bucket_start": "Time", "average_polarity": "Polarity"}
+                        )
+                        st.plotly_chart(fig_polarity, use_container_width=True)
+                    else:
+                        st.info("No reviews in this range.")
+                else:
+                    st.error(f"API Error: {response.status_code} - {response.text}")
+            
+            except Exception as e:
+                st.error(f"Error connecting to API: {str(e)}")
+
 # Sidebar
 with st.sidebar:
     st.header("ℹ️ About Sentiment Analysis")
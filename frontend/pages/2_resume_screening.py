@@ -7,6 +7,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from sse import iter_events
+
 
 st.set_page_config(page_title="Resume Screening", page_icon="📄", layout="wide")
 
@@ -174,6 +176,11 @@ Senior ML Engineer with 8 years experience in Python, TensorFlow, PyTorch. Led m
         Must have: Python, FastAPI, Machine Learning, NLP, Docker, AWS.
         Nice to have: PyTorch, TensorFlow, CI/CD experience."""
     
+    stream_results = st.checkbox(
+        "Show top candidates as they are scored",
+        help="Streams results chunk by chunk; useful for large batches"
+    )
+    
     if st.button("🔍 Rank All Resumes", key="rank_batch", type="primary"):
         if job_description_batch and resumes_input:
             # Split resumes
@@ -188,16 +195,44 @@ Senior ML Engineer with 8 years experience in Python, TensorFlow, PyTorch. Led m
                             for i, text in enumerate(resume_texts)
                         ]
                         
-                        response = requests.post(
-                            f"{API_URL}/resume/rank",
-                            json={
-                                "resumes": resumes_data,
-                                "job_description": job_description_batch
-                            }
-                        )
+                        payload = {
+                            "resumes": resumes_data,
+                            "job_description": job_description_batch
+                        }
+                        results = None
                         
-                        if response.status_code == 200:
-                            results = response.json()
+                        if stream_results:
+                            # Show the best candidates so far while the rest are scored
+                            progress = st.progress(0.0, text="Starting...")
+                            live_top = st.empty()
+                            results = []
+                            for event, data in iter_events(f"{API_URL}/resume/rank/stream", payload):
+                                if event == "chunk":
+                                    results.extend(data["results"])
+                                    progress.progress(
+                                        len(results) / len(resumes_data),
+                                        text=f"Scored {len(results)} of {len(resumes_data)} resumes"
+                                    )
+                                elif event == "top_k":
+                                    live_top.dataframe(
+                                        pd.DataFrame(data["results"])[['rank', 'resume_id', 'match_score', 'recommendation']],
+                                        use_container_width=True
+                                    )
+                            progress.empty()
+                            live_top.empty()
+                            
+                            # Same ordering as /resume/rank: by match score, ties in input order
+                            results.sort(key=lambda r: r['match_score'], reverse=True)
+                            for idx, result in enumerate(results, 1):
+                                result['rank'] = idx
+                        else:
+                            response = requests.post(f"{API_URL}/resume/rank", json=payload)
+                            if response.status_code == 200:
+                                results = response.json()
+                            else:
+                                st.error(f"API Error: {response.status_code}")
+                        
+                        if results:
                             results_df = pd.DataFrame(results)
                             
                             st.markdown("---")
@@ -263,9 +298,6 @@ Senior ML Engineer with 8 years experience in Python, TensorFlow, PyTorch. Led m
                                 file_name="resume_rankings.csv",
                                 mime="text/csv"
                             )
-                        
-                        else:
-                            st.error(f"API Error: {response.status_code}")
                     
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
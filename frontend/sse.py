@@ -0,0 +1,28 @@
+"""
+Client for the API's Server-Sent Events batch endpoints.
+"""
+import json
+
+import requests
+
+
+def iter_events(url, payload, params=None, timeout=60):
+    """
+    POST ``payload`` to a streaming endpoint and yield ``(event, data)`` pairs.
+
+    Heartbeat comments are skipped; ``timeout`` is the longest wait between lines.
+    Raises ``RuntimeError`` on an HTTP error or an ``error`` event.
+    """
+    with requests.post(url, json=payload, params=params, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"API Error: {response.status_code} - {response.text}")
+
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+                if event == "error":
+                    raise RuntimeError(data["detail"])
+                yield event, data
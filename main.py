@@ -1,5 +1,10 @@
+import sys
+
+from backend.cli import run_cli
+
+
 def main():
-    print("Hello from nlpb!")
+    sys.exit(run_cli())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+
+client = TestClient(app)
+
+
+def test_batch_with_blank_article():
+    response = client.post(
+        "/api/fakenews/batch",
+        json={"articles": [{"text": "SHOCKING news!!!"}, {"text": "   "}]}
+    )
+    assert response.status_code == 200
+    blank = response.json()[1]
+    assert blank["is_fake_news"] is False
+    assert blank["fake_news_probability"] == 0.0
+    assert blank["details"] == {}
+
+
+def test_columnar_batch_with_blank_article():
+    response = client.post(
+        "/api/fakenews/batch?format=columnar",
+        json={"articles": [{"text": "SHOCKING news!!!"}, {"text": "   "}]}
+    )
+    assert response.status_code == 200